@@ -0,0 +1,202 @@
+"""
+Batch Analysis Module
+Analyze many save exports in parallel, without Streamlit
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from analysis.profit_loss import PL_COLUMNS
+from analysis.session import AnalysisSession
+from core.data_loader import clean_export
+
+
+EXPORT_PATTERNS = ["*.csv", "*.xlsx", "*.xlsm"]
+
+
+@dataclass
+class SaveResult:
+    """Analysis of one save export."""
+    save: str
+    path: str
+    rows: int = 0
+    pl_df: Optional[pd.DataFrame] = None
+    periods_df: Optional[pd.DataFrame] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def find_exports(sources: Iterable[str]) -> List[Path]:
+    """
+    Expand directories, glob patterns and file paths into export files.
+
+    Args:
+        sources: Directories (every export inside), glob patterns or files
+
+    Returns:
+        Sorted list of unique files
+    """
+    files = set()
+
+    for source in sources:
+        path = Path(source)
+
+        if path.is_dir():
+            for pattern in EXPORT_PATTERNS:
+                files.update(p for p in path.glob(pattern) if p.is_file())
+        elif path.is_file():
+            files.add(path)
+        else:
+            files.update(Path(p) for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+
+    return sorted(files)
+
+
+def save_labels(paths: List[os.PathLike]) -> List[str]:
+    """
+    A distinct save label per export file.
+
+    The file stem when no two files share it; otherwise (e.g. every save
+    directory holds a Transactions.csv) the path relative to the common
+    parent directory, without suffix unless two files differ only by it.
+
+    Args:
+        paths: Export files (unique)
+
+    Returns:
+        Labels in the same order as paths
+    """
+    paths = [Path(p) for p in paths]
+    stems = [p.stem for p in paths]
+    if len(set(stems)) == len(stems):
+        return stems
+
+    resolved = [p.resolve() for p in paths]
+    root = Path(os.path.commonpath([str(p.parent) for p in resolved]))
+    relative = [p.relative_to(root) for p in resolved]
+
+    labels = [r.with_suffix("").as_posix() for r in relative]
+    if len(set(labels)) < len(labels):
+        labels = [r.as_posix() for r in relative]
+
+    return labels
+
+
+def analyze_export(path: os.PathLike, granularity: str = "auto", save: Optional[str] = None) -> SaveResult:
+    """
+    Clean one export and compute its P&L and per-period P&L.
+
+    Never raises: errors are returned in SaveResult.error, so that one bad
+    file does not stop a batch.
+
+    Args:
+        path: Export file
+        granularity: Granularity passed to TemporalAnalyzer.aggregate_by_period
+        save: Label of the save (None = file stem)
+    """
+    path = Path(path)
+    result = SaveResult(save=save or path.stem, path=str(path))
+    start = time.perf_counter()
+
+    try:
+        # STEP 1: Pulizia
+        with open(path, "rb") as f:
+            df, error = clean_export(f.read())
+        result.timings["clean"] = time.perf_counter() - start
+
+        if error:
+            result.error = error
+            return result
+        result.rows = len(df)
+
+        # STEP 2: P&L complessivo (categorizzazione e employee index restano nella sessione)
+        session = AnalysisSession(df)
+        step = time.perf_counter()
+        result.pl_df = session.profit_loss
+        result.timings["profit_loss"] = time.perf_counter() - step
+
+        # STEP 3: P&L per periodo
+        step = time.perf_counter()
+        result.periods_df = session.period_profit_loss(granularity)
+        result.timings["temporal"] = time.perf_counter() - step
+
+    except Exception as e:
+        result.error = f"Analysis error: {str(e)}"
+
+    finally:
+        result.timings["total"] = time.perf_counter() - start
+
+    return result
+
+
+def run_batch(paths: List[os.PathLike], granularity: str = "auto", workers: Optional[int] = None,
+              on_result: Optional[Callable[[SaveResult], None]] = None) -> List[SaveResult]:
+    """
+    Analyze exports on a process pool, one file per task.
+
+    Args:
+        paths: Export files
+        granularity: Granularity passed to TemporalAnalyzer.aggregate_by_period
+        workers: Number of processes (None = all cores, 1 = in this process)
+        on_result: Called with each result as soon as it is ready
+
+    Returns:
+        Results in the same order as paths, labelled by save_labels
+    """
+    labels = save_labels(paths)
+
+    if workers == 1 or len(paths) <= 1:
+        results = []
+        for path, save in zip(paths, labels):
+            results.append(analyze_export(path, granularity, save))
+            if on_result:
+                on_result(results[-1])
+        return results
+
+    results: List[Optional[SaveResult]] = [None] * len(paths)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(analyze_export, path, granularity, save): i
+                   for i, (path, save) in enumerate(zip(paths, labels))}
+
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result:
+                on_result(result)
+
+    return results
+
+
+def combine_profit_loss(results: List[SaveResult]) -> pd.DataFrame:
+    """One P&L table for all saves: save column + PL_COLUMNS."""
+    frames = [r.pl_df.assign(save=r.save) for r in results if r.pl_df is not None and not r.pl_df.empty]
+
+    if not frames:
+        return pd.DataFrame(columns=["save"] + PL_COLUMNS)
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined["business"] = combined["business"].astype(str)
+
+    return combined[["save"] + PL_COLUMNS]
+
+
+def combine_periods(results: List[SaveResult]) -> pd.DataFrame:
+    """Per-period P&L of all saves, with a leading save column."""
+    frames = [r.periods_df.assign(save=r.save) for r in results if r.periods_df is not None and not r.periods_df.empty]
+
+    if not frames:
+        return pd.DataFrame(columns=["save", "period", "period_label"] + PL_COLUMNS)
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined["business"] = combined["business"].astype(str)
+    columns = ["save"] + [c for c in combined.columns if c != "save"]
+
+    return combined[columns]
@@ -1,7 +1,153 @@
 """
-cost_analyzer module
-TODO: Implement functionality
+Cost Analyzer Module
+Per-employee, per-supplier and per-type cost breakdowns from one pass
 """
 
-# Implementation goes here
-pass
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from analysis.employees import EmployeeAssignmentIndex
+from analysis.profit_loss import (
+    DIRECT_COST_COLUMNS,
+    DIRECT_COST_FIELDS,
+    _sum_direct_costs,
+    resolve_direct_businesses,
+)
+from core.transaction_categories import description_lookup
+from utils.constants import BUSINESS_DTYPE
+from utils.helpers import profiler
+
+
+EMPLOYEE_COST_FIELDS = ['wages', 'health_insurance', 'hr_training']
+
+
+class CostAnalyzer:
+    """
+    Tidy table of every cost row with its business already resolved.
+
+    costs has one row per transaction with price < 0 and the columns
+    day, type, category, amount, business, employee and supplier.
+
+    The rows are categorized once through description_lookup and the
+    Health Insurance / HR Training rows get the business the employee
+    worked for on the day of the cost (EmployeeAssignmentIndex, as in the
+    P&L). All
+    breakdowns are groupbys on this table, so nothing rescans the raw
+    descriptions.
+
+    Example:
+        costs = CostAnalyzer(df)
+        costs.employee_costs()   # one row per employee
+        costs.supplier_costs()   # Delivery Contract spend per supplier
+        calculate_profit_loss(df, costs=costs)
+    """
+
+    def __init__(self, df: pd.DataFrame, employees: Optional[EmployeeAssignmentIndex] = None):
+        # STEP 1: Solo le righe di costo, risolte una volta
+        cost_rows = df[(df['price'] < 0).to_numpy()]
+        resolved = description_lookup.resolve(cost_rows)
+
+        # STEP 2: Business dei benefit dal dipendente nel giorno del costo
+        self.employees = employees if employees is not None else EmployeeAssignmentIndex.from_transactions(df)
+        business = resolve_direct_businesses(cost_rows.assign(business=resolved['business']), self.employees)
+
+        self.costs = pd.DataFrame({
+            'day': cost_rows['day'],
+            'type': cost_rows['type'],
+            'category': resolved['category'],
+            'amount': cost_rows['price'].abs(),
+            'business': business.astype(BUSINESS_DTYPE),
+            'employee': resolved['employee'],
+            'supplier': resolved['supplier'],
+        }).reset_index(drop=True)
+
+    def employee_costs(self) -> pd.DataFrame:
+        """
+        Wage and benefit totals per employee.
+
+        Returns:
+            DataFrame with employee, business (current one, NaN for
+            employees without wage rows), wages, health_insurance,
+            hr_training, total_costs and rows, sorted by total_costs
+        """
+        rows = self.costs[self.costs['employee'].notna().to_numpy()]
+        cost_field = rows['type'].map(DIRECT_COST_COLUMNS)
+
+        totals = (
+            rows.groupby([rows['employee'], cost_field.rename('field')], observed=True)['amount'].sum()
+            .unstack('field', fill_value=0.0)
+            .reindex(columns=EMPLOYEE_COST_FIELDS, fill_value=0.0)
+        )
+        totals.columns.name = None
+        totals['total_costs'] = totals[EMPLOYEE_COST_FIELDS].sum(axis=1)
+        totals['rows'] = rows.groupby('employee', observed=True).size()
+
+        totals.index = totals.index.astype(object)
+        current = self.employees.current_businesses()
+        totals.insert(0, 'business', totals.index.map(current).astype(BUSINESS_DTYPE))
+
+        return totals.rename_axis('employee').reset_index().sort_values(
+            'total_costs', ascending=False, kind='stable', ignore_index=True
+        )
+
+    def supplier_costs(self) -> pd.DataFrame:
+        """
+        Delivery Contract spend per (supplier, business).
+
+        Returns:
+            DataFrame with supplier, business, spend and deliveries, sorted
+            by spend
+        """
+        rows = self.costs[self.costs['supplier'].notna().to_numpy()]
+
+        grouped = rows.groupby(['supplier', 'business'], observed=True)['amount']
+        spend = pd.DataFrame({'spend': grouped.sum(), 'deliveries': grouped.size()}).reset_index()
+
+        return spend.sort_values('spend', ascending=False, kind='stable', ignore_index=True)
+
+    def daily_costs(self) -> pd.DataFrame:
+        """
+        Cost per day and transaction type.
+
+        Returns:
+            DataFrame with day, type, category and amount (one row per
+            day and type that has costs)
+        """
+        daily = self.costs.groupby(['day', 'type', 'category'], observed=True)['amount'].sum()
+
+        return daily.reset_index()
+
+    def daily_cost_matrix(self) -> pd.DataFrame:
+        """daily_costs() as a dense day × type frame (0 on days without costs)."""
+        if self.costs.empty:
+            return pd.DataFrame(index=pd.RangeIndex(0, name='day'))
+
+        matrix = self.costs.pivot_table(index='day', columns='type', values='amount',
+                                        aggfunc='sum', fill_value=0.0, observed=True)
+        days = pd.RangeIndex(int(self.costs['day'].min()), int(self.costs['day'].max()) + 1, name='day')
+
+        return matrix.reindex(days, fill_value=0.0)
+
+    @profiler.timed("direct_costs", rows=len)
+    def direct_costs(self) -> pd.DataFrame:
+        """
+        Direct costs per business, as extract_direct_costs with the
+        employee index of the whole frame.
+        """
+        direct = self.costs[(self.costs['category'] == 'direct_cost').to_numpy()]
+        if direct['business'].notna().sum() == 0:
+            return pd.DataFrame(columns=['business'] + DIRECT_COST_FIELDS + ['total_direct_costs'])
+
+        return _sum_direct_costs(direct.assign(price=direct['amount']), direct['business'], [])
+
+    @profiler.timed("shared_costs")
+    def shared_totals(self) -> Tuple[float, float]:
+        """Revenue-based and equal-split shared cost pools (as calculate_shared_costs)."""
+        category = self.costs['category'].to_numpy()
+        amount = self.costs['amount'].to_numpy()
+
+        return (
+            float(amount[category == 'shared_revenue_based'].sum()),
+            float(amount[category == 'shared_equal_split'].sum()),
+        )
@@ -0,0 +1,177 @@
+"""
+Employee Assignments Module
+Time-aware employee → business resolution from the Wage rows
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from core.transaction_categories import WAGE_TYPES, description_lookup
+from utils.constants import BUSINESS_DTYPE
+
+
+ASSIGNMENT_COLUMNS = ["employee", "start_day", "business"]
+
+
+def empty_assignments() -> pd.DataFrame:
+    return pd.DataFrame({
+        "employee": pd.Series(dtype="category"),
+        "start_day": pd.Series(dtype=np.int32),
+        "business": pd.Series(dtype=BUSINESS_DTYPE),
+    })
+
+
+def compact_assignments(assignments: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce (employee, day, business) rows to intervals.
+
+    The rows must be in file order: when an employee has Wage rows for two
+    businesses on the same day, the last row wins (as in the flat map).
+    A new interval starts only where the business changes.
+
+    Args:
+        assignments: DataFrame with employee, start_day (the day of the
+            row) and business
+
+    Returns:
+        DataFrame with ASSIGNMENT_COLUMNS sorted by employee and start_day
+    """
+    if assignments.empty:
+        return empty_assignments()
+
+    employee = assignments["employee"].astype(object).to_numpy()
+    day = assignments["start_day"].to_numpy().astype(np.int64)
+    business = assignments["business"].astype(object).to_numpy()
+
+    # STEP 1: Ordine per (employee, day), stabile sull'ordine del file
+    employee_codes, employees = pd.factorize(employee, sort=True)
+    order = np.lexsort((np.arange(len(day)), day, employee_codes))
+    employee_codes, day, business = employee_codes[order], day[order], business[order]
+
+    # STEP 2: Ultima riga di ogni (employee, day)
+    last_of_day = np.ones(len(day), dtype=bool)
+    last_of_day[:-1] = (employee_codes[1:] != employee_codes[:-1]) | (day[1:] != day[:-1])
+    employee_codes, day, business = employee_codes[last_of_day], day[last_of_day], business[last_of_day]
+
+    # STEP 3: Un intervallo nuovo solo quando cambia il business
+    starts = np.ones(len(day), dtype=bool)
+    starts[1:] = (employee_codes[1:] != employee_codes[:-1]) | (business[1:] != business[:-1])
+
+    return pd.DataFrame({
+        "employee": pd.Categorical.from_codes(employee_codes[starts], categories=employees),
+        "start_day": day[starts].astype(np.int32),
+        "business": pd.Series(business[starts], dtype=object).astype(BUSINESS_DTYPE),
+    })
+
+
+def extract_wage_assignments(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    (employee, day, business) of every valid Wage / Replacement Wage row.
+
+    Returns:
+        DataFrame with ASSIGNMENT_COLUMNS in file order (not compacted)
+    """
+    wage_df = df[df["type"].isin(WAGE_TYPES).to_numpy()]
+    resolved = description_lookup.resolve(wage_df)
+    valid = resolved["employer"].notna().to_numpy()
+
+    return pd.DataFrame({
+        "employee": resolved["employee"][valid],
+        "start_day": wage_df["day"][valid],
+        "business": resolved["employer"][valid],
+    })
+
+
+class EmployeeAssignmentIndex:
+    """
+    Per employee, sorted day intervals → business.
+
+    An interval starts on the day of the first Wage row for a business and
+    lasts until the employee is paid by another one, so a benefit is
+    charged to the business the employee worked for on the day of the
+    cost. Benefits dated before the first Wage row go to the first
+    business.
+
+    The intervals are one row per change of business (employee and
+    business categorical, day int32) and a lookup is a binary search on
+    (employee code, day) keys, so the index stays small and fast also
+    with thousands of employees.
+
+    Example:
+        employees = EmployeeAssignmentIndex.from_transactions(df)
+        employees.resolve(benefits["employee"], benefits["day"])
+    """
+
+    def __init__(self, assignments: pd.DataFrame):
+        # Anche da un frame letto dalla cache (o vuoto): stesso schema compatto
+        self.assignments = assignments[ASSIGNMENT_COLUMNS].reset_index(drop=True).astype(
+            {"employee": "category", "start_day": np.int32, "business": BUSINESS_DTYPE}
+        )
+
+        self._employees = self.assignments["employee"].cat.categories
+        codes = self.assignments["employee"].cat.codes.to_numpy().astype(np.int64)
+        self._keys = (codes << 32) + self.assignments["start_day"].to_numpy().astype(np.int64)
+        self._codes = codes
+
+        # Primo intervallo di ogni dipendente (per i benefit prima del primo Wage)
+        self._first = np.searchsorted(codes, np.arange(len(self._employees)), side="left")
+
+    @classmethod
+    def from_transactions(cls, df: pd.DataFrame) -> "EmployeeAssignmentIndex":
+        """Build the index from the Wage rows of df."""
+        return cls(compact_assignments(extract_wage_assignments(df)))
+
+    def __len__(self) -> int:
+        return len(self.assignments)
+
+    def append(self, other: "EmployeeAssignmentIndex") -> "EmployeeAssignmentIndex":
+        """Index of the Wage rows of self followed by those of other."""
+        combined = pd.concat([
+            self.assignments.astype({"employee": object, "business": object}),
+            other.assignments.astype({"employee": object, "business": object}),
+        ], ignore_index=True)
+
+        return EmployeeAssignmentIndex(compact_assignments(combined))
+
+    def resolve(self, employee: pd.Series, day: pd.Series) -> pd.Series:
+        """
+        Business of each (employee, day).
+
+        Args:
+            employee: Employee names
+            day: Day of each row (same length)
+
+        Returns:
+            Categorical Series (same index as employee), NaN for unknown
+            employees
+        """
+        business = self.assignments["business"]
+        codes = self._employees.get_indexer(employee.astype(object))
+        known = codes >= 0
+        if not known.any():
+            return pd.Series(pd.Categorical.from_codes(np.full(len(codes), -1), categories=business.cat.categories),
+                             index=employee.index, name="business")
+
+        # STEP 1: Ultimo intervallo iniziato entro il giorno
+        days = np.clip(np.asarray(day, dtype=np.int64), 0, (1 << 32) - 1)
+        keys = (codes.astype(np.int64) << 32) + days
+        position = np.searchsorted(self._keys, keys, side="right") - 1
+
+        # STEP 2: Prima del primo Wage → primo intervallo del dipendente
+        before_first = (position < 0) | (self._codes[np.maximum(position, 0)] != codes)
+        position = np.where(before_first, self._first[np.maximum(codes, 0)], position)
+
+        result = pd.Categorical.from_codes(
+            np.where(known, business.cat.codes.to_numpy()[position], -1),
+            categories=business.cat.categories,
+        )
+
+        return pd.Series(result, index=employee.index, name="business")
+
+    def current_businesses(self) -> Dict[str, str]:
+        """Business of the latest interval of every employee."""
+        latest = self.assignments.drop_duplicates("employee", keep="last")
+
+        return dict(zip(latest["employee"].astype(object), latest["business"].astype(object)))
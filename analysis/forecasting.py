@@ -0,0 +1,157 @@
+"""
+Forecasting Module
+Batched revenue/profit forecasts for all businesses at once (NumPy only)
+"""
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.revenue_analyzer import extract_business_from_revenue
+from analysis.trends import TrendAnalyzer
+
+
+# Ciclo settimanale del gioco
+SEASON_DAYS = 7
+
+DEFAULT_HORIZON = 30
+
+
+def daily_revenue_matrix(df: pd.DataFrame, revenue_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Daily revenue per business on a dense day grid.
+
+    Args:
+        df: Cleaned DataFrame with transactions
+        revenue_df: Revenue rows from extract_business_from_revenue(df),
+            if already computed
+
+    Returns:
+        DataFrame day × business (days without sales are 0)
+    """
+    if revenue_df is None:
+        _, _, revenue_df = extract_business_from_revenue(df)
+    if revenue_df.empty:
+        return pd.DataFrame(index=pd.RangeIndex(0, name="day"))
+
+    matrix = revenue_df.pivot_table(index="day", columns="business", values="price",
+                                    aggfunc="sum", fill_value=0.0, observed=True)
+    days = pd.RangeIndex(int(df["day"].min()), int(df["day"].max()) + 1, name="day")
+
+    return matrix.reindex(days, fill_value=0.0).rename_axis(columns="business")
+
+
+def daily_profit_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """Daily profit per business (0 on days where the business is not in the P&L)."""
+    return TrendAnalyzer.from_transactions(df).rolling(1)["profit"].fillna(0.0)
+
+
+def linear_trend(values: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Least-squares line per column, extended over the horizon.
+
+    Args:
+        values: Array (days, series)
+        horizon: Days to forecast
+
+    Returns:
+        Array (horizon, series)
+    """
+    n = len(values)
+    t = np.arange(n, dtype=float)
+    t_centered = t - t.mean()
+
+    # Pendenza e intercetta di tutte le serie con un solo prodotto matriciale
+    slope = t_centered @ (values - values.mean(axis=0)) / max((t_centered ** 2).sum(), 1.0)
+    intercept = values.mean(axis=0) - slope * t.mean()
+
+    future = np.arange(n, n + horizon, dtype=float)
+    return intercept + np.outer(future, slope)
+
+
+def seasonal_naive(values: np.ndarray, horizon: int, season: int = SEASON_DAYS) -> np.ndarray:
+    """Repeat the last season of every column over the horizon."""
+    season = min(season, len(values))
+    last_season = values[-season:]
+    repeats = -(-horizon // season)
+
+    return np.tile(last_season, (repeats, 1))[:horizon]
+
+
+def holt_winters(values: np.ndarray, horizon: int, season: int = SEASON_DAYS,
+                 alpha: float = 0.3, beta: float = 0.05, gamma: float = 0.2) -> np.ndarray:
+    """
+    Additive Holt-Winters (level, trend, season) for every column.
+
+    The recursion runs once over time with level, trend and seasonal
+    state held as vectors over the series, so all businesses are fitted
+    together.
+
+    Args:
+        values: Array (days, series)
+        horizon: Days to forecast
+        season: Season length in days
+        alpha, beta, gamma: Smoothing factors of level, trend and season
+
+    Returns:
+        Array (horizon, series)
+    """
+    n = len(values)
+    season = min(season, n)
+
+    # STEP 1: Stato iniziale dalle prime due stagioni
+    level = values[:season].mean(axis=0)
+    if n >= 2 * season:
+        trend = (values[season:2 * season].mean(axis=0) - level) / season
+    else:
+        trend = np.zeros(values.shape[1])
+    seasonal = values[:season] - level
+
+    # STEP 2: Smoothing lungo il tempo, vettoriale sulle serie
+    for t in range(n):
+        s = seasonal[t % season]
+        previous_level = level
+        level = alpha * (values[t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonal[t % season] = gamma * (values[t] - level) + (1 - gamma) * s
+
+    # STEP 3: Proiezione
+    steps = np.arange(1, horizon + 1)
+    season_index = (n + steps - 1) % season
+
+    return level + np.outer(steps, trend) + seasonal[season_index]
+
+
+FORECAST_MODELS: Dict[str, Callable[..., np.ndarray]] = {
+    "linear_trend": linear_trend,
+    "seasonal_naive": seasonal_naive,
+    "holt_winters": holt_winters,
+}
+
+
+def forecast(series: pd.DataFrame, model: str = "holt_winters", horizon: int = DEFAULT_HORIZON,
+             **params) -> pd.DataFrame:
+    """
+    Forecast every column of a day × business frame.
+
+    Args:
+        series: Daily values (e.g. daily_revenue_matrix), one column per business
+        model: Name in FORECAST_MODELS
+        horizon: Days to forecast after the last day
+        **params: Passed to the model (season, alpha, ...)
+
+    Returns:
+        DataFrame indexed by the future days, same columns as series
+    """
+    if model not in FORECAST_MODELS:
+        raise ValueError(f"Unknown model '{model}', expected one of {list(FORECAST_MODELS)}")
+    if series.empty:
+        raise ValueError("Cannot forecast an empty series")
+
+    predicted = FORECAST_MODELS[model](series.to_numpy(dtype=float), horizon, **params)
+
+    last_day = int(series.index[-1])
+    future_days = pd.RangeIndex(last_day + 1, last_day + 1 + horizon, name="day")
+
+    return pd.DataFrame(predicted, index=future_days, columns=series.columns)
@@ -0,0 +1,219 @@
+"""
+Daily Ledger Module
+Per-day, per-business aggregates that can be updated incrementally
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pandas as pd
+
+from analysis.employees import EmployeeAssignmentIndex, empty_assignments
+from analysis.profit_loss import (
+    DIRECT_COST_FIELDS,
+    PL_COLUMNS,
+    add_total_direct_costs,
+    allocate_period_profit_loss,
+    cost_columns,
+    resolve_benefit_employees,
+)
+from analysis.revenue_analyzer import extract_business_names
+from core.transaction_categories import ensure_categorized
+
+
+BUSINESS_DAY_COLUMNS = ["day", "business", "revenue", "revenue_rows"] + DIRECT_COST_FIELDS + ["direct_rows"]
+BENEFIT_COLUMNS = ["day", "employee", "health_insurance", "hr_training", "benefit_rows"]
+SHARED_COLUMNS = ["day", "shared_revenue_based", "shared_equal_split"]
+
+# Colonne sommate quando due ledger vengono uniti
+_BUSINESS_DAY_SUMS = ["revenue", "revenue_rows"] + DIRECT_COST_FIELDS + ["direct_rows"]
+_BENEFIT_SUMS = ["health_insurance", "hr_training", "benefit_rows"]
+_SHARED_SUMS = ["shared_revenue_based", "shared_equal_split"]
+
+
+def _empty(columns) -> pd.DataFrame:
+    return pd.DataFrame({column: pd.Series(dtype=object if column in ("business", "employee") else float)
+                         for column in columns})
+
+
+@dataclass
+class DailyLedger:
+    """
+    Aggregated transactions, one row per (day, business).
+
+    Holds everything calculate_profit_loss needs, so the P&L of any set of
+    days can be computed without the raw transactions:
+    - business_days: revenue and direct costs per (day, business)
+    - benefits: Health Insurance / HR Training per (day, employee), still
+      to be attributed to a business through the employee index
+    - shared: shared-cost pools per day
+    - employees: employee → business intervals (EmployeeAssignmentIndex
+      assignments), benefits are attributed by the day of the cost
+    """
+    business_days: pd.DataFrame = field(default_factory=lambda: _empty(BUSINESS_DAY_COLUMNS))
+    benefits: pd.DataFrame = field(default_factory=lambda: _empty(BENEFIT_COLUMNS))
+    shared: pd.DataFrame = field(default_factory=lambda: _empty(SHARED_COLUMNS))
+    employees: pd.DataFrame = field(default_factory=empty_assignments)
+
+    @property
+    def empty(self) -> bool:
+        return self.business_days.empty and self.benefits.empty and self.shared.empty
+
+    def append(self, other: "DailyLedger") -> "DailyLedger":
+        """
+        Merge the ledger of newer transactions into this one.
+
+        Days present in both (a day split across two ingestions) are summed;
+        on a day with Wage rows in both, the assignment from other wins, as
+        later Wage rows do.
+        """
+        return DailyLedger(
+            business_days=_merge_sums(self.business_days, other.business_days, ["day", "business"], _BUSINESS_DAY_SUMS),
+            benefits=_merge_sums(self.benefits, other.benefits, ["day", "employee"], _BENEFIT_SUMS),
+            shared=_merge_sums(self.shared, other.shared, ["day"], _SHARED_SUMS),
+            employees=self.employee_index().append(other.employee_index()).assignments,
+        )
+
+    def employee_index(self) -> EmployeeAssignmentIndex:
+        return EmployeeAssignmentIndex(self.employees)
+
+    def resolved_costs(self) -> pd.DataFrame:
+        """
+        Direct costs per (day, business) with benefits attributed to the
+        business of the employee on that day.
+        """
+        costs = self.business_days[self.business_days["direct_rows"] > 0]
+        costs = costs[["day", "business"] + DIRECT_COST_FIELDS + ["direct_rows"]]
+
+        business = self.employee_index().resolve(self.benefits["employee"], self.benefits["day"])
+        benefits = self.benefits.assign(business=business.astype(object))
+        benefits = benefits[benefits["business"].notna()].rename(columns={"benefit_rows": "direct_rows"})
+
+        return pd.concat([costs, benefits.reindex(columns=costs.columns, fill_value=0.0)], ignore_index=True)
+
+    def period_profit_loss(self, period_of_day: Optional[pd.Series] = None) -> pd.DataFrame:
+        """
+        P&L per period from the aggregates.
+
+        Args:
+            period_of_day: Series mapping day → period (default: one period
+                covering all days)
+
+        Returns:
+            Same columns as calculate_period_profit_loss
+        """
+        def to_period(days: pd.Series) -> pd.Series:
+            if period_of_day is None:
+                return pd.Series(0, index=days.index, name="period")
+            return days.map(period_of_day).rename("period")
+
+        # Revenue per (periodo, business)
+        revenue_days = self.business_days[self.business_days["revenue_rows"] > 0]
+        revenue_per_business = revenue_days["revenue"].groupby(
+            [to_period(revenue_days["day"]), revenue_days["business"]], observed=True
+        ).sum().reset_index()
+
+        if revenue_per_business.empty:
+            return pd.DataFrame(columns=PL_COLUMNS + ["period"])
+
+        # Direct costs per (periodo, business)
+        costs = self.resolved_costs()
+        direct_costs = costs[DIRECT_COST_FIELDS].groupby(
+            [to_period(costs["day"]), costs["business"]], sort=False, observed=True
+        ).sum().reset_index()
+        direct_costs = add_total_direct_costs(direct_costs)
+
+        # Shared costs per periodo
+        shared_period = to_period(self.shared["day"])
+        total_revenue_based = self.shared["shared_revenue_based"].groupby(shared_period).sum()
+        total_equal_split = self.shared["shared_equal_split"].groupby(shared_period).sum()
+
+        return allocate_period_profit_loss(
+            revenue_per_business, direct_costs, total_revenue_based, total_equal_split
+        )
+
+    def profit_loss(self) -> pd.DataFrame:
+        """Same result as calculate_profit_loss on all ingested transactions."""
+        pl_df = self.period_profit_loss()
+
+        if pl_df.empty:
+            return pd.DataFrame(columns=PL_COLUMNS)
+
+        return pl_df.drop(columns="period")
+
+
+def _merge_sums(old: pd.DataFrame, new: pd.DataFrame, keys: list, sums: list) -> pd.DataFrame:
+    """Concatenate two aggregate frames and re-sum rows with the same keys."""
+    if old.empty:
+        return new.reset_index(drop=True)
+    if new.empty:
+        return old.reset_index(drop=True)
+
+    combined = pd.concat([old, new], ignore_index=True)
+    return combined.groupby(keys, sort=True, as_index=False, observed=True)[sums].sum()
+
+
+def build_daily_ledger(df: pd.DataFrame, employees: Optional[EmployeeAssignmentIndex] = None) -> DailyLedger:
+    """
+    Aggregate transactions into a DailyLedger.
+
+    Args:
+        df: Cleaned DataFrame with transactions
+        employees: Index already built from the Wage rows of df (optional)
+
+    Returns:
+        DailyLedger with per-day aggregates
+    """
+    categorized = ensure_categorized(df).reset_index(drop=True)
+    day = categorized["day"]
+    price = categorized["price"]
+    category = categorized["category"]
+
+    # STEP 1: Revenue per (day, business)
+    revenue_mask = (categorized["type"] == "Revenue").to_numpy()
+    revenue_rows = categorized[revenue_mask]
+    revenue = revenue_rows["price"].groupby([
+        day[revenue_mask],
+        extract_business_names(revenue_rows["description"]).rename("business")
+    ], observed=True).agg(["sum", "size"])
+    revenue.columns = ["revenue", "revenue_rows"]
+
+    # STEP 2: Direct costs con business noto per (day, business)
+    direct_mask = (category == "direct_cost").to_numpy()
+    direct_df = categorized[direct_mask]
+    known = direct_df["business"].notna().to_numpy()
+    direct_known = direct_df[known]
+    direct = cost_columns(direct_known).groupby(
+        [direct_known["day"], direct_known["business"].rename("business")], observed=True
+    ).agg({**{column: "sum" for column in DIRECT_COST_FIELDS}, "direct_rows": "sum"})
+
+    business_days = revenue.join(direct, how="outer").fillna(0.0).reset_index()
+    business_days = business_days[BUSINESS_DAY_COLUMNS]
+
+    # STEP 3: Health Insurance / HR Training per (day, employee)
+    benefit_df = direct_df[~known]
+    employee = resolve_benefit_employees(benefit_df)
+    benefit_costs = cost_columns(benefit_df)[["health_insurance", "hr_training", "direct_rows"]]
+    benefits = benefit_costs.groupby([benefit_df["day"], employee.rename("employee")], observed=True).sum()
+    benefits = benefits.rename(columns={"direct_rows": "benefit_rows"}).reset_index()
+
+    # STEP 4: Shared cost pools per day
+    abs_price = price.abs()
+    shared = pd.DataFrame({
+        "shared_revenue_based": abs_price.where(category == "shared_revenue_based", 0.0),
+        "shared_equal_split": abs_price.where(category == "shared_equal_split", 0.0),
+    })
+    shared_mask = category.isin(["shared_revenue_based", "shared_equal_split"]).to_numpy()
+    shared = shared[shared_mask].groupby(day[shared_mask]).sum().reset_index()
+
+    # STEP 5: Intervalli dipendente → business
+    if employees is None:
+        employees = EmployeeAssignmentIndex.from_transactions(categorized)
+
+    return DailyLedger(
+        business_days=business_days,
+        benefits=benefits[BENEFIT_COLUMNS],
+        shared=shared[SHARED_COLUMNS],
+        employees=employees.assignments,
+    )
+
@@ -1,60 +1,216 @@
+import numpy as np
 import pandas as pd
-from typing import Tuple, List
-from .revenue_analyzer import extract_business_from_revenue
-from core.transaction_categories import categorize_transaction
+from typing import List, Optional, Tuple, Union
+from .employees import EmployeeAssignmentIndex
+from .revenue_analyzer import extract_business_from_revenue, extract_business_names
+from core.transaction_categories import (
+    EMPLOYEE_BENEFIT_TYPES,
+    description_lookup,
+    ensure_categorized,
+)
+from utils.constants import BUSINESS_DTYPE
+from utils.helpers import profiler
 
 
+# Tipo di transazione → colonna del P&L
+DIRECT_COST_COLUMNS = {
+    'Wage': 'wages',
+    'Replacement Wage': 'wages',
+    'Marketing': 'marketing',
+    'Health Insurance': 'health_insurance',
+    'HR Training': 'hr_training'
+}
 
-def calculate_profit_loss(df):
-    # STEP 0: Aggiorna categorizzazione
+DIRECT_COST_FIELDS = ['wages', 'marketing', 'health_insurance', 'hr_training']
+
+PL_COLUMNS = [
+    'business',
+    'revenue',
+    'shared_revenue_based',
+    'shared_equal_split',
+    'wages',
+    'marketing',
+    'health_insurance',
+    'hr_training',
+    'total_direct_costs',
+    'total_shared_costs',
+    'total_costs',
+    'profit',
+    'margin_pct'
+]
+
+
+
+@profiler.timed("profit_loss", rows=len)
+def calculate_profit_loss(df, costs=None, employees: Optional[EmployeeAssignmentIndex] = None):
+    """
+    P&L di tutto il DataFrame.
+    
+    Args:
+        df: DataFrame con le transazioni
+        costs: CostAnalyzer gia' costruito su df (opzionale): direct e
+            shared costs vengono presi dalla sua tabella invece di
+            ricategorizzare le righe (stesse righe, l'ordine dei business
+            puo' cambiare)
+        employees: Indice dipendente → business (default: dalle righe
+            Wage di df)
+    """
+    if costs is not None:
+        period = pd.Series(np.zeros(len(df), dtype=np.int64), name="period")
+        revenue = _period_revenue(df.reset_index(drop=True), period).set_index("business")["revenue"]
+        return profit_loss_from_totals(revenue, costs.direct_costs(), costs.shared_totals())
+    
+    # Un unico periodo che copre tutto il DataFrame
+    period = pd.Series(0, index=df.index)
+    pl_df = calculate_period_profit_loss(df, period, employees)
+    
+    if pl_df.empty:
+        # Nessun revenue in questo periodo, ritorna DataFrame vuoto con struttura corretta
+        return pd.DataFrame(columns=PL_COLUMNS)
+    
+    return pl_df.drop(columns="period")
+
+
+
+
+@profiler.timed("revenue_extraction", rows=len)
+def _period_revenue(df: pd.DataFrame, period: pd.Series) -> pd.DataFrame:
+    """Revenue per (periodo, business); period allineato per posizione."""
+    revenue_mask = (df["type"] == "Revenue").to_numpy()
+    revenue_rows = df[revenue_mask]
+    
+    return revenue_rows["price"].groupby([
+        period[revenue_mask],
+        extract_business_names(revenue_rows["description"]).rename("business")
+    ], observed=True).sum().rename("revenue").reset_index()
+
+
+
+
+def profit_loss_from_totals(revenue_per_business: pd.Series, direct_costs: pd.DataFrame,
+                            shared_totals: Tuple[float, float]) -> pd.DataFrame:
+    """
+    P&L a periodo unico da totali gia' calcolati.
+    
+    Args:
+        revenue_per_business: Revenue per business (index = business)
+        direct_costs: Come extract_direct_costs
+        shared_totals: (revenue-based, equal-split) come calculate_shared_costs
+    
+    Returns:
+        DataFrame con le colonne del P&L
+    """
+    if revenue_per_business.empty:
+        return pd.DataFrame(columns=PL_COLUMNS)
+    
+    revenue = revenue_per_business.rename("revenue").rename_axis("business").reset_index()
+    revenue.insert(0, "period", 0)
+    direct_costs = direct_costs.copy()
+    direct_costs.insert(0, "period", 0)
+    total_revenue_based, total_equal_split = shared_totals
+    
+    pl_df = allocate_period_profit_loss(
+        revenue,
+        direct_costs,
+        pd.Series({0: total_revenue_based}),
+        pd.Series({0: total_equal_split}),
+    )
+    
+    return pl_df.drop(columns="period")
+
+
+
+
+def calculate_period_profit_loss(df: pd.DataFrame, period: pd.Series,
+                                 employees: Optional[EmployeeAssignmentIndex] = None) -> pd.DataFrame:
+    """
+    Calcola il P&L di tutti i periodi in un solo passaggio.
+    
+    Equivale a chiamare calculate_profit_loss(fetta, employees=employees)
+    sulla fetta di ogni periodo e concatenare i risultati: direct costs e
+    shared costs sono calcolati per periodo con groupby invece che con un
+    loop. I benefit vanno al business del dipendente nel giorno del costo.
+    
+    Args:
+        df: DataFrame con le transazioni
+        period: Series con il periodo di ogni riga (stesso index di df)
+        employees: Indice dipendente → business (default: costruito una
+            volta dalle righe Wage di df, non per periodo)
+        
+    Returns:
+        DataFrame con le colonne del P&L piu' 'period', ordinato per
+        periodo e business
+    """
+    # Index posizionale: le righe vengono allineate per posizione
+    period = pd.Series(np.asarray(period), name="period")
+    
+    # STEP 0: Categorizza tutte le transazioni una sola volta
     # Delivery Contract: 'direct_cost' → 'shared_revenue_based' ⚠️
+    categorized = ensure_categorized(df).reset_index(drop=True)
     
-    # STEP 1: Costruisci employee→business mapping da Wage
-    employee_map = build_employee_mapping(df)
+    # STEP 1: Revenue per (periodo, business)
+    revenue_per_business = _period_revenue(categorized, period)
     
-    # STEP 2: Estrai revenue per business
-    revenue_per_business = extract_revenue(df)
+    if revenue_per_business.empty:
+        return pd.DataFrame(columns=PL_COLUMNS + ["period"])
     
+    # STEP 2: Direct costs per (periodo, business)
+    with profiler.stage("direct_costs") as stage:
+        if employees is None:
+            employees = EmployeeAssignmentIndex.from_transactions(categorized)
+        direct_costs = _period_direct_costs(categorized, period, employees)
+        stage.rows = len(direct_costs)
     
-    if revenue_per_business.empty or len(revenue_per_business) == 0:
-        # Nessun revenue in questo periodo, ritorna DataFrame vuoto con struttura corretta
-        return pd.DataFrame(columns=[
-            'business',
-            'revenue',
-            'shared_revenue_based',
-            'shared_equal_split',
-            'wages',
-            'marketing',
-            'health_insurance',
-            'hr_training',
-            'total_direct_costs',
-            'total_shared_costs',
-            'total_costs',
-            'profit',
-            'margin_pct'
-        ])
-    # STEP 3: Estrai direct costs per business
-    direct_costs = extract_direct_costs(df, employee_map)
+    # STEP 3: Shared costs per periodo
+    with profiler.stage("shared_costs"):
+        price = categorized["price"].abs()
+        category = categorized["category"]
+        total_revenue_based = price[category == "shared_revenue_based"].groupby(period).sum()
+        total_equal_split = price[category == "shared_equal_split"].groupby(period).sum()
     
     # STEP 4-5: Alloca shared costs e calcola P&L
-    total_revenue_based, total_equal_split = calculate_shared_costs(df)
+    return allocate_period_profit_loss(
+        revenue_per_business, direct_costs, total_revenue_based, total_equal_split
+    )
+
+
+
+
+@profiler.timed("merge", rows=len)
+def allocate_period_profit_loss(revenue_per_business: pd.DataFrame, direct_costs: pd.DataFrame,
+                                total_revenue_based: pd.Series, total_equal_split: pd.Series) -> pd.DataFrame:
+    """
+    Alloca gli shared costs e completa il P&L di ogni periodo.
+    
+    Args:
+        revenue_per_business: DataFrame con period, business, revenue
+        direct_costs: DataFrame con period, business e le colonne dei direct costs
+        total_revenue_based: Shared costs revenue-based per periodo
+        total_equal_split: Shared costs equal-split per periodo
+        
+    Returns:
+        DataFrame con le colonne del P&L piu' 'period'
+    """
+    revenue_per_business = revenue_per_business.copy()
     
-    total_revenue = revenue_per_business["revenue"].sum()
+    # Allocazione vettoriale dentro ogni periodo
+    period_of_row = revenue_per_business["period"]
+    by_period = revenue_per_business.groupby("period")["revenue"]
+    total_revenue = by_period.transform("sum")
+    num_business = by_period.transform("size")
     
-    # allocazione revenue-based
-    revenue_per_business["shared_revenue_based"] = revenue_per_business["revenue"].apply(
-        lambda rev: total_revenue_based * (rev/total_revenue)
+    revenue_per_business["shared_revenue_based"] = (
+        period_of_row.map(total_revenue_based).fillna(0) * (revenue_per_business["revenue"] / total_revenue)
+    )
+    revenue_per_business["shared_equal_split"] = (
+        period_of_row.map(total_equal_split).fillna(0) / num_business
     )
     
-    # Equal split
-    num_business = len(revenue_per_business)
-    revenue_per_business["shared_equal_split"] = total_equal_split / num_business
-    
-    # STEP 6: Merge revenue e direct costs
+    # Merge revenue e direct costs
     pl_df = pd.merge(
         revenue_per_business,
         direct_costs,
-        on="business",
+        on=["period", "business"],
     )
     
     pl_df = pl_df.fillna(0)
@@ -71,91 +227,142 @@ def calculate_profit_loss(df):
     # Margin
     pl_df["margin_pct"] = (pl_df["profit"] / pl_df["revenue"]) * 100
     
-
-    
-    return pl_df
+    # Il merge tra chiavi categoriche diverse restituisce stringhe
+    pl_df["business"] = pl_df["business"].astype(BUSINESS_DTYPE)
     
+    return pl_df[PL_COLUMNS + ["period"]]
+
+
+
+
+def _period_direct_costs(categorized: pd.DataFrame, period: pd.Series,
+                         employees: EmployeeAssignmentIndex) -> pd.DataFrame:
+    """Direct costs per (periodo, business), benefit attribuiti per giorno."""
+    direct_mask = (categorized['category'] == 'direct_cost').to_numpy()
+    direct_df = categorized[direct_mask]
     
+    business = resolve_direct_businesses(direct_df, employees)
     
+    return _sum_direct_costs(direct_df, business, [period[direct_mask]])
+
+
+
+
+def resolve_direct_businesses(direct_df: pd.DataFrame, employees: EmployeeAssignmentIndex) -> pd.Series:
+    """
+    Business di ogni direct cost.
     
+    Health Insurance / HR Training non hanno il business nella
+    description: lo prende il business del dipendente nel giorno del costo.
     
+    Returns:
+        Series di business (object, NaN se non risolto), stesso index
+    """
+    business = direct_df['business'].astype(object)
+    unresolved = business.isna().to_numpy()
+    if unresolved.any():
+        benefit_df = direct_df[unresolved]
+        employee_name = resolve_benefit_employees(benefit_df)
+        business[unresolved] = employees.resolve(employee_name, benefit_df['day']).astype(object).to_numpy()
+    
+    return business
+
+
+
+
+def _sum_direct_costs(direct_df: pd.DataFrame, business: pd.Series, keys: list) -> pd.DataFrame:
+    """Somma i direct costs per chiavi + business (righe senza business escluse)."""
+    resolved = business.notna().to_numpy()
+    costs = cost_columns(direct_df[resolved])
+    group_keys = [key[resolved] for key in keys] + [business[resolved].rename('business')]
     
+    costs_df = costs.groupby(group_keys, sort=False, observed=True)[DIRECT_COST_FIELDS].sum()
+    costs_df.reset_index(inplace=True)
     
+    return add_total_direct_costs(costs_df)
+
+
+
+
+def cost_columns(direct_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Importo di ogni riga nella colonna del suo tipo di costo.
     
-def build_employee_mapping(df: pd.DataFrame) -> dict:
-    employee_map = {}
+    Gli altri tipi (es. Delivery Contract) hanno tutte le colonne a zero:
+    creano solo la riga del business. 'direct_rows' conta le righe.
+    """
+    price = direct_df['price'].abs()
+    cost_column = direct_df['type'].map(DIRECT_COST_COLUMNS)
     
-    wage_df = df[df['type'].isin(['Wage', 'Replacement Wage'])].copy()
+    costs = pd.DataFrame(
+        {column: price.where(cost_column == column, 0.0) for column in DIRECT_COST_FIELDS},
+        index=direct_df.index
+    )
+    costs['direct_rows'] = np.ones(len(direct_df))
     
-    for _, row in wage_df.iterrows():
-        description = row['description']
-        wage_type = row['type']
-        
+    return costs
 
-        
-        if wage_type == 'Replacement Wage':
-            employee_name = description.split("for")[-1].split("(")[0].strip()
-            business_name = description.split("(")[-1].split("Wage")[0].strip()
-        else:  # Wage normale
-            employee_name = description.split("(")[0].strip()
-            business_name = description.split("(")[1].split("Daily")[0].strip()
-        
-        if employee_name and business_name:
-            employee_map[employee_name] = business_name
+
+
+
+def add_total_direct_costs(costs_df: pd.DataFrame) -> pd.DataFrame:
+    """Aggiunge la colonna total_direct_costs."""
+    costs_df["total_direct_costs"] = (
+        costs_df["wages"] + 
+        costs_df["marketing"] + 
+        costs_df["health_insurance"] + 
+        costs_df["hr_training"]
+    )
     
-    return employee_map
+    return costs_df
 
 
 
 
-def extract_direct_costs(df: pd.DataFrame, employee_map: dict) -> pd.DataFrame:
-    business_costs = {}
+def build_employee_mapping(df: pd.DataFrame) -> dict:
+    """
+    Business attuale di ogni dipendente (quello del Wage piu' recente).
     
+    Per attribuire costi nel tempo usare EmployeeAssignmentIndex: un
+    dipendente che ha cambiato business ha piu' intervalli.
+    """
+    return EmployeeAssignmentIndex.from_transactions(df).current_businesses()
+
+
+
+
+def resolve_benefit_employees(df: pd.DataFrame) -> pd.Series:
+    """
+    Estrae il nome del dipendente da Health Insurance e HR Training.
     
+    Returns:
+        Series con il nome del dipendente (NaN per gli altri tipi)
+    """
+    is_benefit = df['type'].isin(EMPLOYEE_BENEFIT_TYPES).to_numpy()
+    employee_name = description_lookup.resolve(df)['employee'].astype(object)
     
-    # Loop su TUTTO il DataFrame (non più filtrato!)
-    for _, row in df.iterrows():
-        category, business = categorize_transaction(row)
-        description = row["description"]
-        
-        
-        if category != "direct_cost":
-            continue  # Salta se non è direct cost
-        
-        cost_type = row["type"]
-        price = abs(row["price"])
-        
-        if business is None:
-            if cost_type in ["Health Insurance", "HR Training"]:
-                if cost_type == "Health Insurance":
-                    # "Silver Health Insurance (James Rodriguez) - 20 Employees,"
-                    employee_name = description.split("(")[1].split(")")[0].strip()
-                else:
-                    employee_name = description.split("training")[0].strip()
-                    
-                business = employee_map.get(employee_name)
-        
-        if business is None:
-            continue
-    
-        if business  not in business_costs:
-            business_costs[business] = {
-                'wages': 0,
-                'marketing':0,
-                'health_insurance':0,
-                'hr_training':0
-            }
-            
-        if cost_type in ["Wage", "Replacement Wage"]:
-            business_costs[business]['wages'] += price
-        elif cost_type == 'Marketing':
-            business_costs[business]['marketing'] += price
-        elif cost_type == 'Health Insurance':
-            business_costs[business]["health_insurance"] += price 
-        elif cost_type == 'HR Training':
-            business_costs[business]["hr_training"] += price 
-            
-    if not business_costs:
+    return employee_name.where(is_benefit)
+
+
+
+
+def extract_direct_costs(df: pd.DataFrame, employee_map: Union[dict, EmployeeAssignmentIndex]) -> pd.DataFrame:
+    categorized = ensure_categorized(df)
+    
+    direct_df = categorized[categorized['category'] == 'direct_cost']
+    
+    # Health Insurance / HR Training: business dal dipendente
+    if isinstance(employee_map, EmployeeAssignmentIndex):
+        business = resolve_direct_businesses(direct_df, employee_map)
+    else:
+        business = direct_df['business']
+        unresolved = business.isna().to_numpy()
+        if unresolved.any():
+            employee_name = resolve_benefit_employees(direct_df[unresolved])
+            business = business.copy()
+            business[unresolved] = employee_name.map(employee_map).to_numpy()
+    
+    if business.notna().sum() == 0:
         return pd.DataFrame(columns=[
             "business",
             "wages",
@@ -165,36 +372,7 @@ def extract_direct_costs(df: pd.DataFrame, employee_map: dict) -> pd.DataFrame:
             "total_direct_costs"
         ])
     
-    costs_df = pd.DataFrame.from_dict(business_costs, orient="index")
-    costs_df.reset_index(inplace=True)
-    costs_df.rename(columns={"index":"business"}, inplace=True)
-    
-    costs_df["total_direct_costs"] = (
-        costs_df["wages"] +
-        costs_df["marketing"] +
-        costs_df["health_insurance"] + 
-        costs_df["hr_training"]
-    )
-    
-    
-            
-    costs_df = pd.DataFrame.from_dict(business_costs, orient="index")
-    costs_df.reset_index(inplace=True)
-    costs_df.rename(columns={"index":"business"}, inplace=True)
-    
-    costs_df["total_direct_costs"] = (
-        costs_df["wages"] + 
-        costs_df["marketing"] + 
-        costs_df["health_insurance"] + 
-        costs_df["hr_training"]
-    )
-    
-    
-    
-    
-    
-    
-    return costs_df
+    return _sum_direct_costs(direct_df, business, [])
         
 
 
@@ -219,17 +397,12 @@ def extract_revenue(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def calculate_shared_costs(df: pd.DataFrame) -> Tuple[float, float]:
+    categorized = ensure_categorized(df)
     
-    total_revenue_based = 0
-    total_equal_split = 0
+    price = categorized["price"].abs()
+    category = categorized["category"]
     
-    for _, row in df.iterrows():
-        category, _ = categorize_transaction(row)
-        price = abs(row["price"])
-        
-        if category == "shared_revenue_based":
-            total_revenue_based += price
-        elif category == "shared_equal_split":
-            total_equal_split += price
+    total_revenue_based = price[category == "shared_revenue_based"].sum()
+    total_equal_split = price[category == "shared_equal_split"].sum()
     
     return total_revenue_based, total_equal_split
\ No newline at end of file
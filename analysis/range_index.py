@@ -0,0 +1,171 @@
+"""
+Day Range Index Module
+Cumulative per-day, per-business sums for instant day-range P&L
+"""
+
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analysis.ledger import DailyLedger, build_daily_ledger
+from analysis.profit_loss import (
+    DIRECT_COST_FIELDS,
+    PL_COLUMNS,
+    add_total_direct_costs,
+    allocate_period_profit_loss,
+)
+
+
+# Campi cumulati per business: revenue, direct costs e conteggi di righe
+# (i conteggi decidono quali business entrano nel P&L, come nel merge inner)
+BUSINESS_FIELDS = ["revenue", "revenue_rows"] + DIRECT_COST_FIELDS + ["direct_rows"]
+
+SHARED_FIELDS = ["shared_revenue_based", "shared_equal_split"]
+
+
+class DailyMatrices(NamedTuple):
+    """Dense per-day arrays, row i = day min_day + i."""
+    min_day: int
+    businesses: pd.Index
+    business_daily: np.ndarray  # (giorni, business, BUSINESS_FIELDS)
+    shared_daily: np.ndarray    # (giorni, SHARED_FIELDS)
+
+
+def build_daily_matrices(ledger: DailyLedger) -> DailyMatrices:
+    """
+    Spread a DailyLedger on a dense day × business grid.
+
+    Every day between the first and the last one gets a row, also days
+    without transactions. Benefits are attributed through the employee index.
+    """
+    # STEP 1: Revenue e direct costs (benefit inclusi) per (day, business)
+    business_days = pd.concat([
+        ledger.business_days[["day", "business", "revenue", "revenue_rows"]],
+        ledger.resolved_costs(),
+    ], ignore_index=True).fillna(0.0)
+    business_days["business"] = business_days["business"].astype(str)
+
+    days = pd.concat([business_days["day"], ledger.shared["day"]])
+    if days.empty:
+        return DailyMatrices(0, pd.Index([], dtype=object),
+                             np.zeros((0, 0, len(BUSINESS_FIELDS))), np.zeros((0, len(SHARED_FIELDS))))
+
+    min_day, max_day = int(days.min()), int(days.max())
+    n_days = max_day - min_day + 1
+
+    # STEP 2: Matrice densa giorno × business × campo
+    businesses = pd.Index(sorted(business_days["business"].unique()))
+    day_position = business_days["day"].to_numpy().astype(np.int64) - min_day
+    business_position = businesses.get_indexer(business_days["business"])
+
+    business_daily = np.zeros((n_days, len(businesses), len(BUSINESS_FIELDS)))
+    np.add.at(business_daily, (day_position, business_position), business_days[BUSINESS_FIELDS].to_numpy())
+
+    shared_daily = np.zeros((n_days, len(SHARED_FIELDS)))
+    np.add.at(shared_daily, ledger.shared["day"].to_numpy().astype(np.int64) - min_day,
+              ledger.shared[SHARED_FIELDS].to_numpy())
+
+    return DailyMatrices(min_day, businesses, business_daily, shared_daily)
+
+
+class DayRangeIndex:
+    """
+    Prefix sums of the daily ledger.
+
+    Row i of the cumulative arrays holds the totals of all days before
+    min_day + i, so the totals of [start_day, end_day] are the difference
+    of two rows and do not depend on how many transactions there are.
+
+    Health Insurance / HR Training are attributed with the employee index
+    of the whole save (as in DailyLedger). calculate_profit_loss on a
+    filtered slice only sees the Wage rows inside the slice, so on short
+    ranges it drops benefits of employees that were not paid in the range
+    unless it gets the same index (employees=...); over the whole save the
+    two match.
+
+    Example:
+        index = DayRangeIndex.from_transactions(df)
+        pl_df = index.profit_loss(30, 60)
+    """
+
+    def __init__(self, min_day: int, businesses: pd.Index, business_cumsum: np.ndarray, shared_cumsum: np.ndarray):
+        self.min_day = min_day
+        self.max_day = min_day + len(shared_cumsum) - 2
+        self.businesses = businesses
+        self._business_cumsum = business_cumsum  # (giorni + 1, business, campi)
+        self._shared_cumsum = shared_cumsum      # (giorni + 1, campi shared)
+
+    @classmethod
+    def from_ledger(cls, ledger: DailyLedger) -> "DayRangeIndex":
+        """Build the index from a DailyLedger."""
+        matrices = build_daily_matrices(ledger)
+
+        # Riga 0 a zero: il totale dei giorni prima di min_day
+        business_cumsum = np.concatenate([
+            np.zeros((1,) + matrices.business_daily.shape[1:]),
+            np.cumsum(matrices.business_daily, axis=0),
+        ])
+        shared_cumsum = np.concatenate([
+            np.zeros((1, len(SHARED_FIELDS))),
+            np.cumsum(matrices.shared_daily, axis=0),
+        ])
+
+        return cls(matrices.min_day, matrices.businesses, business_cumsum, shared_cumsum)
+
+    @classmethod
+    def from_transactions(cls, df: pd.DataFrame) -> "DayRangeIndex":
+        """Build the index from cleaned transactions."""
+        return cls.from_ledger(build_daily_ledger(df))
+
+    def _positions(self, start_day: int, end_day: int) -> Tuple[int, int]:
+        """Cumulative rows to subtract for [start_day, end_day] (clamped to the data)."""
+        start = min(max(start_day, self.min_day), self.max_day + 1) - self.min_day
+        end = min(max(end_day, self.min_day - 1), self.max_day) - self.min_day + 1
+        return start, max(start, end)
+
+    def range_totals(self, start_day: int, end_day: int) -> pd.DataFrame:
+        """
+        Totals per business for the days in [start_day, end_day].
+
+        Returns:
+            DataFrame indexed by business with BUSINESS_FIELDS columns
+        """
+        start, end = self._positions(start_day, end_day)
+        totals = self._business_cumsum[end] - self._business_cumsum[start]
+
+        return pd.DataFrame(totals, index=self.businesses, columns=BUSINESS_FIELDS)
+
+    def shared_totals(self, start_day: int, end_day: int) -> pd.Series:
+        """Shared-cost pools for the days in [start_day, end_day]."""
+        start, end = self._positions(start_day, end_day)
+        return pd.Series(self._shared_cumsum[end] - self._shared_cumsum[start], index=SHARED_FIELDS)
+
+    def profit_loss(self, start_day: int, end_day: int) -> pd.DataFrame:
+        """
+        P&L of the days in [start_day, end_day].
+
+        Same columns and allocation as calculate_profit_loss.
+        """
+        totals = self.range_totals(start_day, end_day)
+        shared = self.shared_totals(start_day, end_day)
+
+        totals = totals.rename_axis("business").reset_index()
+        totals["period"] = 0
+
+        # Lo shared cost si divide tra tutti i business con revenue nel range;
+        # nel P&L restano quelli con almeno un direct cost (merge inner)
+        revenue = totals.loc[totals["revenue_rows"] > 0, ["period", "business", "revenue"]]
+        if revenue.empty:
+            return pd.DataFrame(columns=PL_COLUMNS)
+
+        direct_costs = totals.loc[totals["direct_rows"] > 0, ["period", "business"] + DIRECT_COST_FIELDS]
+
+        pl_df = allocate_period_profit_loss(
+            revenue,
+            add_total_direct_costs(direct_costs.copy()),
+            pd.Series({0: shared["shared_revenue_based"]}),
+            pd.Series({0: shared["shared_equal_split"]}),
+        )
+
+        return pl_df.drop(columns="period").reset_index(drop=True)
@@ -6,6 +6,12 @@ Extracts and analyzes revenue by business
 import pandas as pd
 from typing import Tuple, List
 
+from utils.helpers import map_categories, profiler
+
+
+# "Tech & Gift Revenue" → "Tech & Gift" (ultima parola = "Revenue")
+_REVENUE_SUFFIX_PATTERN = r"^(.*?)(?:^|\s)Revenue\s*$"
+
 
 
 
@@ -35,7 +41,34 @@ def extract_business_name_from_string(description:str) -> str:
 
 
 
+def extract_business_names(descriptions: pd.Series) -> pd.Series:
+    """
+    Vectorized version of extract_business_name_from_string.
+
+    Args:
+        descriptions: Series of revenue descriptions
+
+    Returns:
+        Series of business names, same index as descriptions
+        (categorical when descriptions is categorical)
+    """
+    return map_categories(descriptions, _extract_business_names)
+
+
+def _extract_business_names(descriptions: pd.Series) -> pd.Series:
+    prefix = descriptions.str.extract(_REVENUE_SUFFIX_PATTERN, expand=False)
+    matched = prefix.notna()
+
+    # " ".join(parti[:-1]) normalizza gli spazi interni
+    names = descriptions.astype(object).copy()
+    names[matched] = prefix[matched].str.split().str.join(" ").to_numpy()
+
+    return names
+
+
+
 
+@profiler.timed("revenue_extraction", rows=lambda result: len(result[2]))
 def extract_business_from_revenue(df: pd.DataFrame) -> Tuple[List[str], pd.Series, pd.DataFrame]:
     """
     Extract business names and calculate revenue totals.
@@ -54,13 +87,13 @@ def extract_business_from_revenue(df: pd.DataFrame) -> Tuple[List[str], pd.Serie
     revenue_df = df[df["type"] == "Revenue"].copy()
     
     
-    revenue_df["business"] = revenue_df["description"].apply(extract_business_name_from_string)
+    revenue_df["business"] = extract_business_names(revenue_df["description"])
     
     
     
     # STEP 4: Calcola totale revenue per ogni business
 
-    revenue_per_business = revenue_df.groupby("business")["price"].sum()
+    revenue_per_business = revenue_df.groupby("business", observed=True)["price"].sum()
     
     # STEP 5: Estrai lista unica di nomi business
     business_names = revenue_df["business"].unique().tolist()
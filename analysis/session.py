@@ -0,0 +1,223 @@
+"""
+Analysis Session Module
+Lazy, memoized analysis artifacts of one DataFrame, shared by the app and scripts
+"""
+
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from analysis.cost_analyzer import CostAnalyzer
+from analysis.employees import EmployeeAssignmentIndex
+from analysis.forecasting import DEFAULT_HORIZON, daily_revenue_matrix, forecast
+from analysis.ledger import DailyLedger, build_daily_ledger
+from analysis.profit_loss import profit_loss_from_totals
+from analysis.range_index import DayRangeIndex
+from analysis.revenue_analyzer import extract_business_from_revenue
+from analysis.temporal_analyzer import TemporalAnalyzer
+from analysis.trends import TrendAnalyzer, daily_balance
+from core.transaction_categories import ensure_categorized
+
+
+class artifact:
+    """
+    Session attribute computed on first access and then memoized.
+
+    Other artifacts read while computing it are recorded as its
+    dependencies (AnalysisSession.dependency_graph).
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, session, owner=None):
+        if session is None:
+            return self
+        return session._resolve(self.name, lambda: self.func(session))
+
+
+class AnalysisSession:
+    """
+    All derived datasets of one cleaned DataFrame, each computed at most once.
+
+    Artifacts are lazy: nothing runs until it is read, and reading the P&L
+    computes only what the P&L needs. Parameterized results (per-period
+    P&L, forecasts) are memoized per parameter value. Assigning a new df
+    drops everything; invalidate(name) drops one artifact and all the
+    artifacts computed from it.
+
+    The session is thread-safe, so one instance can be cached and shared
+    by several Streamlit sessions.
+
+    Example:
+        session = AnalysisSession(df)
+        session.profit_loss                  # categorized → costs → P&L
+        session.period_profit_loss("weekly")
+        session.dependency_graph()
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._values: Dict[str, object] = {}
+        self._dependencies: Dict[str, set] = defaultdict(set)
+        self._stack: List[str] = []
+        self._lock = threading.RLock()
+        self.computations: Counter = Counter()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        # Dati nuovi: tutti gli artifact sono da ricalcolare
+        with self._lock:
+            self._df = df
+            self._values.clear()
+            self._dependencies.clear()
+
+    def _resolve(self, key: str, compute):
+        """Memoized value of key, recording key as a dependency of the caller."""
+        with self._lock:
+            if self._stack:
+                self._dependencies[self._stack[-1]].add(key)
+            if key in self._values:
+                return self._values[key]
+
+            self._stack.append(key)
+            try:
+                value = compute()
+            finally:
+                self._stack.pop()
+
+            self._values[key] = value
+            self.computations[key] += 1
+            return value
+
+    def invalidate(self, key: str):
+        """Drop key and every artifact computed from it."""
+        with self._lock:
+            stale = {key}
+            changed = True
+            while changed:
+                dependents = {name for name, deps in self._dependencies.items() if deps & stale}
+                changed = not dependents <= stale
+                stale |= dependents
+
+            for name in stale:
+                self._values.pop(name, None)
+                self._dependencies.pop(name, None)
+
+    def dependency_graph(self) -> Dict[str, List[str]]:
+        """Artifact → artifacts it was computed from (only those computed so far)."""
+        with self._lock:
+            return {name: sorted(self._dependencies.get(name, ())) for name in self._values}
+
+    @property
+    def computed(self) -> List[str]:
+        """Artifacts currently memoized."""
+        return list(self._values)
+
+    # === Artifact ===
+
+    @artifact
+    def categorized(self) -> pd.DataFrame:
+        """Transactions with category and business columns."""
+        return ensure_categorized(self.df)
+
+    @artifact
+    def employees(self) -> EmployeeAssignmentIndex:
+        """Employee → business intervals."""
+        return EmployeeAssignmentIndex.from_transactions(self.categorized)
+
+    @artifact
+    def employee_map(self) -> Dict[str, str]:
+        """Current business of every employee."""
+        return self.employees.current_businesses()
+
+    @artifact
+    def statistics(self) -> pd.DataFrame:
+        """df.describe() of the numeric columns."""
+        return self.df.describe()
+
+    @artifact
+    def type_counts(self) -> pd.Series:
+        """Rows per transaction type, most frequent first."""
+        return self.df['type'].value_counts()
+
+    @artifact
+    def revenue(self) -> Tuple[List[str], pd.Series, pd.DataFrame]:
+        """extract_business_from_revenue(df)."""
+        return extract_business_from_revenue(self.df)
+
+    @artifact
+    def revenue_per_business(self) -> pd.Series:
+        return self.revenue[1]
+
+    @artifact
+    def costs(self) -> CostAnalyzer:
+        return CostAnalyzer(self.categorized, employees=self.employees)
+
+    @artifact
+    def direct_costs(self) -> pd.DataFrame:
+        return self.costs.direct_costs()
+
+    @artifact
+    def shared_costs(self) -> Tuple[float, float]:
+        """(revenue-based, equal-split) shared cost pools."""
+        return self.costs.shared_totals()
+
+    @artifact
+    def profit_loss(self) -> pd.DataFrame:
+        """P&L of the whole DataFrame (rows as calculate_profit_loss)."""
+        return profit_loss_from_totals(self.revenue_per_business, self.direct_costs, self.shared_costs)
+
+    @artifact
+    def ledger(self) -> DailyLedger:
+        return build_daily_ledger(self.categorized, employees=self.employees)
+
+    @artifact
+    def range_index(self) -> DayRangeIndex:
+        return DayRangeIndex.from_ledger(self.ledger)
+
+    @artifact
+    def trends(self) -> TrendAnalyzer:
+        return TrendAnalyzer.from_ledger(self.ledger)
+
+    @artifact
+    def daily_totals(self) -> pd.DataFrame:
+        """Revenue, profit and end-of-day balance (day × 3), for the time series charts."""
+        return self.trends.daily_totals().join(daily_balance(self.df), how="outer")
+
+    @artifact
+    def revenue_matrix(self) -> pd.DataFrame:
+        """Daily revenue per business (day × business)."""
+        return daily_revenue_matrix(self.df, revenue_df=self.revenue[2])
+
+    @artifact
+    def temporal(self) -> TemporalAnalyzer:
+        return TemporalAnalyzer(self.categorized, employees=self.employees)
+
+    # === Artifact con parametri ===
+
+    def period_profit_loss(self, granularity: str = "auto") -> pd.DataFrame:
+        """TemporalAnalyzer.aggregate_by_period, memoized per granularity."""
+        return self._resolve(f"period_profit_loss[{granularity}]",
+                             lambda: self.temporal.aggregate_by_period(granularity))
+
+    def report_sheets(self, granularity: str = "auto") -> Dict[str, pd.DataFrame]:
+        """Sheets of the Excel report: cleaned transactions, P&L and P&L per period."""
+        return {
+            "Transactions": self.df,
+            "P&L": self.profit_loss,
+            "P&L by period": self.period_profit_loss(granularity),
+        }
+
+    def revenue_forecast(self, model: str = "holt_winters", horizon: int = DEFAULT_HORIZON) -> pd.DataFrame:
+        """forecast(revenue_matrix), memoized per model and horizon."""
+        return self._resolve(f"revenue_forecast[{model},{horizon}]",
+                             lambda: forecast(self.revenue_matrix, model, horizon))
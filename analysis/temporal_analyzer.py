@@ -1,6 +1,20 @@
 
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
 import pandas as pd
-from analysis.profit_loss import calculate_profit_loss
+from analysis.employees import EmployeeAssignmentIndex
+from analysis.profit_loss import calculate_period_profit_loss
+from utils.constants import BUSINESS_DTYPE
+from utils.helpers import profiler
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow e' opzionale
+    feather = None
 
 
 PERIOD_DAYS = {
@@ -11,16 +25,53 @@ PERIOD_DAYS = {
     "quarterly": 90
 }
 
+# Blocchi di periodi per worker: piu' blocchi bilanciano meglio il carico
+BATCHES_PER_WORKER = 4
+
+# Su Linux /dev/shm e' in RAM: il file Arrow condiviso non tocca il disco
+_SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+
+
+def _period_batch_profit_loss(source, start: int, stop: int,
+                              employees: EmployeeAssignmentIndex) -> pd.DataFrame:
+    """
+    P&L of the periods in rows [start, stop) of the shared frame.
+
+    source is the path of the memory-mapped Arrow file (only the slice is
+    materialized) or, without pyarrow, the DataFrame slice itself.
+    employees is the index of the whole frame, so benefits are attributed
+    as in the serial path.
+    """
+    if isinstance(source, str):
+        df = feather.read_table(source, memory_map=True).slice(start, stop - start).to_pandas()
+    else:
+        df = source
+
+    period = df.pop("period")
+    return calculate_period_profit_loss(df, period, employees)
+
 
 
 class TemporalAnalyzer:
     
     
-    def __init__(self, df):
+    def __init__(self, df, employees: Optional[EmployeeAssignmentIndex] = None):
         self.df = df
+        self._employees = employees
         self.min_day = df["day"].min()
         self.max_day = df["day"].max()
         self.total_days = self.max_day - self.min_day + 1
+    
+    
+    
+    @property
+    def employees(self) -> EmployeeAssignmentIndex:
+        """Employee → business intervals, built once for every granularity."""
+        if self._employees is None:
+            self._employees = EmployeeAssignmentIndex.from_transactions(self.df)
+        return self._employees
 
     
     def get_recommended_granularity(self):
@@ -34,45 +85,113 @@ class TemporalAnalyzer:
         elif self.total_days <= 365:
             return "monthly"
         else:
-            return "quaterly"
+            return "quarterly"
         
         
         
         
         
     
-    def aggregate_by_period(self, granularity="auto"):
-        
+    @profiler.timed("period_aggregation", rows=len)
+    def aggregate_by_period(self, granularity="auto", workers: Optional[int] = None,
+                            executor: Optional[Executor] = None):
+        """
+        P&L per business for every period.
+        
+        Args:
+            granularity: "daily", "weekly", "biweekly", "monthly", "quarterly" or "auto"
+            workers: Compute blocks of periods on a process pool of this size
+            executor: Executor to use instead of creating one (e.g. a pool
+                shared across calls); not shut down here
+            
+        Returns:
+            DataFrame with the P&L columns, period and period_label,
+            ordered by period
+        """
         if granularity == "auto":
             granularity = self.get_recommended_granularity()
             
-            
-        df_copy = self.df.copy()
+        period = self._assign_periods(granularity)
         
-        if granularity == "daily":
-            df_copy["period"] = df_copy["day"] - self.min_day
+        if executor is None and (workers is None or workers <= 1):
+            # Un solo passaggio: categorizza una volta e raggruppa per (period, business)
+            final_df = calculate_period_profit_loss(self.df, period, self.employees)
+        elif executor is not None:
+            final_df = self._parallel_period_profit_loss(period, executor, workers)
         else:
-            period_days = PERIOD_DAYS[granularity]
-            df_copy["period"] = (df_copy["day"] - self.min_day) // period_days
-            
-        periods = sorted(df_copy["period"].unique())
-        all_results = []
-        
-        for period in periods:
-            period_df = df_copy[df_copy["period"] == period]
-            pl_df = calculate_profit_loss(period_df)
-            pl_df["period"] = period       
-            all_results.append(pl_df)
-        
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                final_df = self._parallel_period_profit_loss(period, pool, workers)
         
-        final_df = pd.concat(all_results, ignore_index=True)
-        
-        final_df["period_label"] = final_df["period"].apply(lambda d: self._create_period_label(d, granularity))
+        # Label calcolate una volta per periodo, non per riga
+        labels = {p: self._create_period_label(p, granularity) for p in final_df["period"].unique()}
+        final_df["period_label"] = final_df["period"].map(labels)
                 
         return final_df
     
     
     
+    def _parallel_period_profit_loss(self, period: pd.Series, executor: Executor,
+                                     workers: Optional[int]) -> pd.DataFrame:
+        """
+        Per-period P&L computed on blocks of whole periods in parallel.
+        
+        Each period only depends on its own rows and on the employee index
+        (built once and sent to every worker), so the rows are sorted by
+        period and split into contiguous blocks. The sorted frame is written once
+        as an uncompressed Arrow file that the workers memory-map, so every
+        worker reads just its slice instead of receiving a pickled copy.
+        """
+        # STEP 1: Righe ordinate per periodo
+        order = np.argsort(period.to_numpy(), kind="stable")
+        sorted_df = self.df.iloc[order].reset_index(drop=True)
+        sorted_df["period"] = period.to_numpy()[order]
+        
+        # STEP 2: Blocchi di periodi interi con circa lo stesso numero di righe
+        periods, starts = np.unique(sorted_df["period"].to_numpy(), return_index=True)
+        n_batches = min(len(periods), BATCHES_PER_WORKER * (workers or os.cpu_count() or 1))
+        batch_of_period = starts * n_batches // max(len(sorted_df), 1)
+        first_period = np.flatnonzero(np.diff(batch_of_period, prepend=-1))
+        bounds = list(starts[first_period]) + [len(sorted_df)]
+        
+        # STEP 3: Frame condiviso e calcolo in parallelo
+        shared_path = None
+        try:
+            if feather is not None:
+                fd, shared_path = tempfile.mkstemp(suffix=".arrow", dir=_SHARED_DIR)
+                os.close(fd)
+                feather.write_feather(sorted_df, shared_path, compression="uncompressed")
+            
+            futures = [
+                executor.submit(
+                    _period_batch_profit_loss,
+                    shared_path or sorted_df.iloc[start:stop],
+                    start, stop, self.employees
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            results = [future.result() for future in futures]
+        finally:
+            if shared_path is not None:
+                os.unlink(shared_path)
+        
+        # STEP 4: Merge nell'ordine dei periodi
+        final_df = pd.concat(results, ignore_index=True)
+        final_df["business"] = final_df["business"].astype(BUSINESS_DTYPE)
+        
+        return final_df
+    
+    
+    
+    def _assign_periods(self, granularity: str) -> pd.Series:
+        """Numero di periodo per ogni riga (0 = primo periodo)"""
+        if granularity == "daily":
+            return self.df["day"] - self.min_day
+        
+        period_days = PERIOD_DAYS[granularity]
+        return (self.df["day"] - self.min_day) // period_days
+    
+    
+    
     
     
     
@@ -1,7 +1,167 @@
 """
-trends module
-TODO: Implement functionality
+Trends Module
+Rolling-window revenue, profit and margin per business
 """
 
-# Implementation goes here
-pass
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+from analysis.ledger import DailyLedger, build_daily_ledger
+from analysis.profit_loss import DIRECT_COST_FIELDS
+from analysis.range_index import BUSINESS_FIELDS, SHARED_FIELDS, DailyMatrices, build_daily_matrices
+from analysis.temporal_analyzer import PERIOD_DAYS
+
+
+# Finestre mobili disponibili: 7/14/30/90 giorni come le granularita' di TemporalAnalyzer
+TREND_WINDOWS = {name: days for name, days in PERIOD_DAYS.items() if days > 1}
+
+TREND_METRICS = ["revenue", "profit", "margin_pct"]
+
+Window = Union[int, str]
+
+
+def _window_days(window: Window) -> int:
+    """Window length in days, from a number or a TREND_WINDOWS name."""
+    if isinstance(window, str):
+        if window not in TREND_WINDOWS:
+            raise ValueError(f"Unknown window '{window}', expected one of {list(TREND_WINDOWS)}")
+        return TREND_WINDOWS[window]
+    if window < 1:
+        raise ValueError("window must be at least 1 day")
+    return int(window)
+
+
+class TrendAnalyzer:
+    """
+    Rolling revenue, profit and margin on a dense day × business grid.
+
+    The profit of a window is what calculate_profit_loss would give for
+    the days in that window (same shared-cost allocation and the same
+    rule that a business needs revenue and a direct cost), but computed
+    for every window at once with rolling sums instead of one P&L per
+    window. Days where a business is not in the P&L are NaN.
+
+    Example:
+        trends = TrendAnalyzer.from_transactions(df)
+        monthly = trends.rolling("monthly")
+        monthly["profit"]  # DataFrame day × business
+    """
+
+    def __init__(self, matrices: DailyMatrices):
+        days = pd.RangeIndex(matrices.min_day, matrices.min_day + len(matrices.shared_daily), name="day")
+        businesses = pd.Index(matrices.businesses, name="business")
+
+        def daily(*fields) -> pd.DataFrame:
+            positions = [BUSINESS_FIELDS.index(field) for field in fields]
+            values = matrices.business_daily[:, :, positions].sum(axis=2)
+            return pd.DataFrame(values, index=days, columns=businesses)
+
+        self.days = days
+        self.businesses = businesses
+        self.revenue = daily("revenue")
+        self.direct_costs = daily(*DIRECT_COST_FIELDS)
+        self._revenue_rows = daily("revenue_rows")
+        self._direct_rows = daily("direct_rows")
+        self._shared = pd.DataFrame(matrices.shared_daily, index=days, columns=SHARED_FIELDS)
+
+    @classmethod
+    def from_ledger(cls, ledger: DailyLedger) -> "TrendAnalyzer":
+        return cls(build_daily_matrices(ledger))
+
+    @classmethod
+    def from_transactions(cls, df: pd.DataFrame) -> "TrendAnalyzer":
+        return cls.from_ledger(build_daily_ledger(df))
+
+    def rolling(self, window: Window = "weekly") -> Dict[str, pd.DataFrame]:
+        """
+        Revenue, profit and margin over the window ending on each day.
+
+        Args:
+            window: Days in the window, or a TREND_WINDOWS name
+
+        Returns:
+            Dict metric → DataFrame (day × business) for TREND_METRICS
+        """
+        days = _window_days(window)
+
+        def window_sum(frame: pd.DataFrame) -> pd.DataFrame:
+            return frame.rolling(days, min_periods=1).sum()
+
+        # STEP 1: Totali di ogni finestra
+        revenue = window_sum(self.revenue)
+        direct_costs = window_sum(self.direct_costs)
+        has_revenue = window_sum(self._revenue_rows) > 0
+        in_pl = has_revenue & (window_sum(self._direct_rows) > 0)
+        shared = window_sum(self._shared)
+
+        # STEP 2: Allocazione shared costs tra i business con revenue nella finestra
+        revenue_with_rows = revenue.where(has_revenue, 0.0)
+        total_revenue = revenue_with_rows.sum(axis=1).replace(0.0, np.nan)
+        n_business = has_revenue.sum(axis=1).replace(0, np.nan)
+
+        shared_costs = (
+            revenue_with_rows.div(total_revenue, axis=0).mul(shared["shared_revenue_based"], axis=0)
+            .add(shared["shared_equal_split"] / n_business, axis=0)
+        )
+
+        # STEP 3: Profit e margin (NaN fuori dal P&L)
+        profit = (revenue - direct_costs - shared_costs).where(in_pl)
+        margin_pct = profit / revenue.where(in_pl) * 100
+
+        return {"revenue": revenue, "profit": profit, "margin_pct": margin_pct}
+
+    def rolling_table(self, window: Window = "weekly") -> pd.DataFrame:
+        """rolling() in long format: one row per (day, business) in the P&L."""
+        metrics = self.rolling(window)
+        table = pd.concat({metric: metrics[metric].stack(future_stack=True) for metric in TREND_METRICS}, axis=1)
+
+        return table.dropna(subset=["profit"]).reset_index()
+
+    def growth(self, metric: str = "revenue", window: Window = 1) -> pd.DataFrame:
+        """
+        Day-over-day growth rate (%) of a rolling metric.
+
+        With window=1 it is the growth of the daily value; longer windows
+        smooth out days without sales. Divisions by zero give NaN.
+        """
+        values = self.rolling(window)[metric]
+        growth = values.pct_change(fill_method=None) * 100
+
+        return growth.replace([np.inf, -np.inf], np.nan)
+
+    def ewm(self, metric: str = "revenue", span: int = 7) -> pd.DataFrame:
+        """Exponentially weighted average of a daily metric (day × business)."""
+        return self.rolling(1)[metric].ewm(span=span).mean()
+
+    def daily_totals(self) -> pd.DataFrame:
+        """
+        Revenue and profit of all businesses per day.
+
+        Returns:
+            DataFrame day × [revenue, profit]; profit is the sum over the
+            businesses in the daily P&L (NaN on days with none)
+        """
+        daily = self.rolling(1)
+
+        return pd.DataFrame({
+            "revenue": daily["revenue"].sum(axis=1),
+            "profit": daily["profit"].sum(axis=1, min_count=1),
+        })
+
+
+def daily_balance(df: pd.DataFrame) -> pd.Series:
+    """
+    Cash balance at the end of each day.
+
+    Exports list the rows oldest or newest first: the balance of a day is
+    the one of its latest row in time, whichever the file order.
+
+    Returns:
+        Series indexed by day
+    """
+    newest_first = len(df) > 1 and df["day"].iloc[0] > df["day"].iloc[-1]
+    by_day = df.groupby("day", sort=True)["balance"]
+
+    return (by_day.first() if newest_first else by_day.last()).rename("balance")
@@ -3,12 +3,25 @@ Big Ambitions Business Analyzer
 Main Streamlit Application
 """
 
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
 import streamlit as st
 import pandas as pd
-from core.data_cleaner import clean_big_ambitions_csv
-from analysis.revenue_analyzer import extract_business_from_revenue
-from analysis.profit_loss import calculate_profit_loss
-import plotly.graph_objects as go  
+from core.data_exporter import EXPORT_FORMATS, export_bytes
+from core.data_merger import merge_transactions, parse_exports
+from core.data_validator import ISSUE_REASONS, REJECT_REASONS, validate_export, validate_transactions
+from analysis.forecasting import FORECAST_MODELS
+from analysis.session import AnalysisSession
+from config.settings import (CACHE_MAX_ENTRIES, EXPORT_CACHE_MAX_ENTRIES, PROFILE_MEMORY, PROFILE_STAGES,
+                             UPLOAD_CACHE_MAX_ENTRIES, UPLOAD_CACHE_MAX_RESERVED)
+from core.transaction_categories import description_lookup
+from utils.cache import ResultCache, content_hash, make_key
+from utils.helpers import StageProfiler, profiler
+from visualization import charts
+from visualization.dashboard import TableView, render_table
 
 # Page Configuration
 st.set_page_config(
@@ -18,6 +31,137 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """Merged multi-file analyses, one cache per server process shared by all sessions."""
+    return ResultCache(max_entries=CACHE_MAX_ENTRIES)
+
+
+@st.cache_resource
+def get_upload_cache() -> ResultCache:
+    """
+    Analyses of single files, shared by all sessions.
+
+    Separate from the merged analyses, so building a merge never evicts
+    the files it is made of.
+    """
+    return ResultCache(max_entries=UPLOAD_CACHE_MAX_ENTRIES)
+
+
+@st.cache_resource
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Worker processes for parsing several uploads, started once per server (None on one core)."""
+    workers = os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+
+def upload_key(data_hash: str) -> tuple:
+    return make_key(data_hash, engine="fast")
+
+
+def analyze_upload(file_content: bytes, validated: Optional[Tuple] = None) -> dict:
+    """
+    Clean and validate the upload and open an AnalysisSession on it.
+
+    Results are cached by content hash, so widget interactions only
+    re-render and do not re-parse or re-categorize the file; the session
+    computes each analysis once, on first use.
+
+    validated is validate_export(file_content) when already computed
+    (e.g. on the worker pool of analyze_uploads).
+    """
+    data_hash = content_hash(file_content)
+    key = upload_key(data_hash)
+    
+    def compute():
+        report, error = validated if validated is not None else validate_export(file_content)
+        df = report.df if not error else None
+        session = AnalysisSession(df) if not error else None
+        table = TableView(df) if not error else None
+        return {"df": df, "error": error, "session": session, "table": table, "data_hash": data_hash,
+                "validation": report}
+    
+    return get_upload_cache().get_or_compute(key, compute)
+
+
+def analyze_uploads(contents: List[bytes]) -> dict:
+    """
+    Clean, validate and merge several uploads into one analysis.
+
+    Every file is cached on its own (analyze_upload; while merging, the
+    cache keeps room for the whole selection up to UPLOAD_CACHE_MAX_RESERVED
+    files), so adding a file to the selection parses only that file; the files not cached yet are parsed concurrently on the
+    server's worker pool. The merged timeline has no duplicate rows and is
+    cached by the hashes of the files, in upload order.
+    """
+    if len(contents) == 1:
+        return analyze_upload(contents[0])
+    
+    file_cache = get_upload_cache()
+    hashes = [content_hash(content) for content in contents]
+    merged_hash = content_hash("".join(hashes).encode())
+    
+    def compute():
+        # STEP 1: File non ancora in cache, in parallelo sul pool del server
+        missing = [i for i, data_hash in enumerate(hashes) if upload_key(data_hash) not in file_cache]
+        parsed = dict(zip(missing, parse_exports([contents[i] for i in missing], validate_export,
+                                                 executor=get_parse_pool())))
+        per_file = [analyze_upload(content, parsed.get(i)) for i, content in enumerate(contents)]
+        
+        errors = [f"File {i + 1}: {result['error']}" for i, result in enumerate(per_file) if result["error"]]
+        valid = [(i, result) for i, result in enumerate(per_file) if not result["error"]]
+        if not valid:
+            return {"df": None, "error": "; ".join(errors), "session": None, "table": None}
+        
+        # STEP 2: Una sola timeline senza duplicati, validata di nuovo (gap tra i file)
+        merge = merge_transactions([result["df"] for _, result in valid])
+        validation = validate_transactions(
+            merge.df,
+            [result["validation"].quarantine.assign(file=i + 1) for i, result in valid]
+        )
+        
+        return {"df": merge.df, "error": None, "session": AnalysisSession(merge.df), "table": TableView(merge.df),
+                "data_hash": merged_hash, "validation": validation, "merge": merge, "merge_errors": errors}
+    
+    # Posto per tutti i file solo durante il merge: poi il limite torna quello configurato
+    with file_cache.reserved(len(contents), UPLOAD_CACHE_MAX_RESERVED):
+        return get_result_cache().get_or_compute(make_key(merged_hash, engine="fast", merged=True), compute)
+
+
+@st.cache_resource
+def get_export_cache() -> ResultCache:
+    """Generated export files, shared by all sessions (separate from the analyses)."""
+    return ResultCache(max_entries=EXPORT_CACHE_MAX_ENTRIES)
+
+
+def export_upload(cache: ResultCache, data_hash: str, session: AnalysisSession, fmt: str,
+                  session_profiler: StageProfiler) -> bytes:
+    """
+    Export file of an upload, generated once per format.
+
+    Called by the download button only when it is clicked (on a separate
+    thread), so no rerun serializes the data; the stages are recorded by
+    the profiler of the session that asked for the file.
+    """
+    with session_profiler.installed():
+        sheets = session.report_sheets() if fmt == "xlsx" else {"Transactions": session.df}
+        
+        return cache.get_or_compute(make_key(data_hash, export=fmt), lambda: export_bytes(sheets, fmt))
+
+
+# Profiling degli stage: un profiler per sessione, installato per questa run (il
+# toggle e' nella sidebar, ma va applicato prima dell'analisi)
+if "profiler" not in st.session_state:
+    st.session_state["profiler"] = StageProfiler()
+session_profiler = st.session_state["profiler"]
+session_profiler.install()
+
+if st.session_state.get("profile_stages", PROFILE_STAGES):
+    session_profiler.enable(track_memory=PROFILE_MEMORY)
+else:
+    session_profiler.disable()
+
+
 # Header
 st.title("🎮 Big Ambitions Business Analyzer")
 st.markdown("### Professional analytics for your Big Ambitions empire")
@@ -25,19 +169,22 @@ st.markdown("### Professional analytics for your Big Ambitions empire")
 st.divider()
 
 # File Upload
-uploaded_file = st.file_uploader(
+uploaded_files = st.file_uploader(
     "📂 Upload your Big Ambitions CSV/XLSM file",
-    type=['csv', 'xlsm'],
-    help="Export transactions from Big Ambitions and upload here"
+    type=['csv', 'xlsm', 'xlsx'],
+    accept_multiple_files=True,
+    help="Export transactions from Big Ambitions and upload here. "
+         "Several exports (also overlapping) are merged into one timeline."
 )
 
-if uploaded_file is not None:
+if uploaded_files:
     with st.spinner('🔄 Cleaning and processing data...'):
         # Read file content
-        file_content = uploaded_file.getvalue()
+        contents = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
         
-        # Clean with your cleaner!
-        df, error = clean_big_ambitions_csv(file_content)
+        # Clean with your cleaner! (cached across reruns, one entry per file)
+        results = analyze_uploads(contents)
+        df, error, session, table = results["df"], results["error"], results["session"], results["table"]
     
     if error:
         st.error(f"❌ Error cleaning data: {error}")
@@ -45,6 +192,42 @@ if uploaded_file is not None:
     else:
         st.success(f"✅ Successfully processed {len(df):,} transactions!")
         
+        merge = results.get("merge")
+        if merge is not None:
+            st.info(
+                f"🔗 Merged {len(merge.rows_per_export)} exports "
+                f"({sum(merge.rows_per_export):,} rows, {merge.duplicates:,} duplicates dropped)"
+            )
+        for merge_error in results.get("merge_errors", []):
+            st.warning(f"⚠️ Skipped {merge_error}")
+        
+        # Righe scartate e problemi di continuita' (balance, giorni)
+        validation = results["validation"]
+        if not validation.is_clean:
+            st.warning(
+                f"⚠️ {len(validation.quarantine):,} rows rejected, {len(validation.issues):,} rows flagged "
+                f"(see Data quality)"
+            )
+            with st.expander("🧪 Data quality"):
+                counts = pd.Series(validation.summary()).drop("valid_rows")
+                st.dataframe(
+                    pd.DataFrame({
+                        "rows": counts,
+                        "meaning": counts.index.map({**REJECT_REASONS, **ISSUE_REASONS}),
+                    }),
+                    use_container_width=True
+                )
+                st.caption(
+                    f"Export order: {'newest' if validation.newest_first else 'oldest'} first. "
+                    f"Net amount missing at balance gaps: ${validation.missing_amount():,.2f}"
+                )
+                if not validation.quarantine.empty:
+                    st.write("**Rejected rows (quarantine):**")
+                    st.dataframe(validation.quarantine.head(1000), use_container_width=True, hide_index=True)
+                if not validation.issues.empty:
+                    st.write("**Flagged rows:**")
+                    st.dataframe(validation.issues.head(1000), use_container_width=True, hide_index=True)
+        
         
        
         
@@ -83,7 +266,7 @@ if uploaded_file is not None:
 
         
         # extract revenue from data
-        business_name, revenue_per_business, revenue_df = extract_business_from_revenue(df)
+        business_name, revenue_per_business, revenue_df = session.revenue
         
         if len(business_name) > 0:
             st.subheader("Revenue Analysis")
@@ -117,25 +300,9 @@ if uploaded_file is not None:
             with col2:
                 st.write("Revenue Distribution:")
                 
-                import plotly.express as px
-                
-                fig = px.bar(
-                    revenue_display,
-                    x="Business",
-                    y="Total Revenue",
-                    title="Revenue by Business",
-                    color="Total Revenue",
-                    color_continuous_scale="Viridis"
-                )
-                
-                fig.update_layout(
-                    showlegend=False,
-                    height=400,
-                    xaxis_title="",
-                    yaxis_title="Revenue ($)"
-                )
-                
-                fig.update_yaxes(tickformat='$,.0f')
+                fig = charts.bar_chart(revenue_display, "Business", "Total Revenue", "Revenue by Business",
+                                       colorscale="Viridis", tickformat='$,.0f')
+                fig.update_layout(height=400, yaxis_title="Revenue ($)")
                 st.plotly_chart(fig, use_container_width=True)
             st.divider()
             
@@ -146,7 +313,7 @@ if uploaded_file is not None:
             
             with st.spinner('📊 Calculating P&L for each business...'):
                 try:
-                    pl_df = calculate_profit_loss(df)
+                    pl_df = session.profit_loss
                     
                     # Ordina per profit (dal più alto al più basso)
                     pl_df = pl_df.sort_values('profit', ascending=False)
@@ -187,115 +354,12 @@ if uploaded_file is not None:
     
         st.subheader("TEST")
 
-        fig1 = px.bar(
-            pl_df,
-            x="business",
-            y="profit", 
-            title="Profit by Business",
-            color="profit",
-            color_continuous_scale=["red", "yellow", "green"]   
-            )
-        fig2 = px.bar(
-            pl_df,
-            x="business",
-            y="margin_pct",
-            title="Profit Margin %"
-        )
-        
-        
-        fig3 = px.bar(
-            pl_df,
-            x="business",
-            y=["wages", "shared_revenue_based", "marketing", "health_insurance", "hr_training"],
-            barmode="stack",
-            title="Cost Breakdown",
-            labels={"value": "Amount ($)", "variable": "Category"},
-            color_discrete_map={
-                "wages": "#e7f316",
-                "shared_revenue_based": "#bc2210",
-                "marketing": "#225ae6",
-                "health_insurance": "#0cc05a",
-                "hr_training": "#14bcc2"
-            }
-        )
-        
-        
-        fig3.update_yaxes(tickformat='$,.0f')
-        fig3.update_layout(height=500)
-        
-        
-        
-        
-#######################################################
-        
-        # Creazione grafico a cascata per business
-        
-        fig5 = go.Figure()
-        
-        for i, business_row in pl_df.iterrows():
-            x_list = ["Revenue", "Direct Costs", "Shared Costs", "Profit"]
-            y_list = [
-                business_row["revenue"],
-                -business_row["total_direct_costs"],
-                -business_row["total_shared_costs"],
-                business_row["profit"]
-            ]
-            
-            measure = ["relative", "relative", "relative", "total"]
-            
-            fig5.add_trace(go.Waterfall(
-                x= x_list,
-                y=y_list,
-                measure=measure,
-                text= y_list,
-                textposition="outside",
-                texttemplate='$%{y:,.0f}',
-                visible=(i==0),
-                name=business_row["business"],
-                increasing={"marker": {"color": "#2ecc71"}},    
-                decreasing={"marker": {"color": "#e74c3c"}},      
-                totals={"marker": {"color": "#3498db"}}
-            ))
-        
-        buttons = []
-        
-        for i in range(len(pl_df)):
-            business_name = pl_df.iloc[i]["business"]
-            
-            # Creare array di visibilità [False, False, True, False]
-            # True solo alla posizione i
-            visible = [False] * len(pl_df)
-            visible[i] = True
-            
-            buttons.append(dict(
-                label=business_name,
-                method="update",
-                args=[{"visible": visible},
-                    {"title.text": f"<b>P&L Waterfall - {business_name}</b>"}
-                ]
-            ))
-            
-            
-            
-            
-            
-        fig5.update_layout(
-            title=f"P&L Waterfall - {pl_df.iloc[0]['business']}",
-            height=500,
-            updatemenus=[dict(
-                buttons=buttons,
-                direction="down",
-                showactive=True,
-                x=0.5,
-                y=1.2,
-                xanchor="left",
-                yanchor="top"
-            )]
-        )   
-            
-            
-        
-            
+        with profiler.stage("chart_build", rows=len(pl_df)):
+            fig1 = charts.bar_chart(pl_df, "business", "profit", "Profit by Business",
+                                    colorscale=["red", "yellow", "green"], tickformat='$,.0f')
+            fig2 = charts.bar_chart(pl_df, "business", "margin_pct", "Profit Margin %")
+            fig3 = charts.cost_breakdown_chart(pl_df)
+            fig4 = charts.time_series_chart(session.daily_totals, "Daily revenue, profit and balance", "Amount ($)")
         
         col1, col2 = st.columns(2)
         
@@ -310,34 +374,43 @@ if uploaded_file is not None:
         with col2:
             st.subheader("Margin %")
             st.plotly_chart(fig2, use_container_width=True)
+            
+            # Un solo trace: la figura si ricostruisce per il business scelto
+            waterfall_business = st.selectbox("Waterfall business:", pl_df["business"].astype(str))
+            with profiler.stage("chart_build", rows=1):
+                fig5 = charts.waterfall_chart(pl_df, waterfall_business)
             st.plotly_chart(fig5, use_container_width=True)
         
-        
+        st.plotly_chart(fig4, use_container_width=True)
         
         
         
         
         # Tabs for different views
-        tab1, tab2, tab3 = st.tabs(["📋 Data Preview", "📊 Statistics", "🔍 Filters"])
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 Data Preview", "📊 Statistics", "🔍 Filters", "📈 Forecast", "💸 Costs"])
         
         with tab1:
             st.subheader("Transaction Data")
             
-            # Number of rows to display
-            num_rows = st.slider("Number of rows to display:", 10, 100, 20)
+            # Solo la pagina visibile va al browser
+            render_table(table, key="preview")
             
-            st.dataframe(
-                df.head(num_rows),
-                use_container_width=True,
-                height=400
+            # Download button: il file viene generato solo al click (data callable, Streamlit >= 1.52)
+            export_format = st.selectbox(
+                "Export format:",
+                list(EXPORT_FORMATS),
+                format_func=lambda fmt: EXPORT_FORMATS[fmt].label,
+                help="The Excel report also has the P&L and the P&L per period"
             )
+            export_info = EXPORT_FORMATS[export_format]
             
-            # Download button
             st.download_button(
-                label="💾 Download Cleaned Data (CSV)",
-                data=df.to_csv(index=False),
-                file_name="big_ambitions_cleaned.csv",
-                mime="text/csv"
+                label=f"💾 Download {export_info.label}",
+                data=functools.partial(export_upload, get_export_cache(), results["data_hash"], session, export_format,
+                                       session_profiler),
+                file_name=f"big_ambitions_{'report' if export_format == 'xlsx' else 'cleaned'}.{export_info.extension}",
+                mime=export_info.mime,
+                on_click="ignore"
             )
         
         with tab2:
@@ -347,21 +420,21 @@ if uploaded_file is not None:
             
             with col1:
                 st.write("**Numeric Columns Summary:**")
-                st.dataframe(df.describe(), use_container_width=True)
+                st.dataframe(session.statistics, use_container_width=True)
             
             with col2:
                 st.write("**Transaction Types:**")
-                type_counts = df['type'].value_counts()
-                st.dataframe(type_counts, use_container_width=True)
+                st.dataframe(session.type_counts, use_container_width=True)
         
         with tab3:
             st.subheader("Filter Data")
             
             # Filter by transaction type
+            all_types = table.types()
             selected_types = st.multiselect(
                 "Select transaction types:",
-                options=df['type'].unique(),
-                default=df['type'].unique()
+                options=all_types,
+                default=all_types
             )
             
             # Filter by day range
@@ -372,15 +445,90 @@ if uploaded_file is not None:
                 (min_day, max_day)
             )
             
-            # Apply filters
-            filtered_df = df[
-                (df['type'].isin(selected_types)) &
-                (df['day'] >= day_range[0]) &
-                (df['day'] <= day_range[1])
-            ]
+            # Apply filters (posizioni delle righe, non un DataFrame copiato)
+            filtered_rows = table.select(selected_types, day_range)
+            
+            st.metric("Filtered Transactions", f"{len(filtered_rows):,}")
+            render_table(table, key="filters", types=selected_types, day_range=day_range, height=300)
+            
+            # P&L del range di giorni dalle somme cumulative (non dipende dai tipi selezionati)
+            try:
+                range_index = session.range_index
+            except Exception:
+                range_index = None
+            if range_index is not None:
+                range_pl = range_index.profit_loss(*day_range).sort_values('profit', ascending=False)
+                
+                st.write(f"**P&L for days {day_range[0]}–{day_range[1]}:**")
+                if range_pl.empty:
+                    st.info("💡 No business has both revenue and direct costs in this range")
+                else:
+                    st.metric("Total Profit", f"${range_pl['profit'].sum():,.2f}")
+                    st.dataframe(
+                        range_pl.style.format({
+                            column: '{:.1f}%' if column == 'margin_pct' else '${:,.2f}'
+                            for column in range_pl.columns if column != 'business'
+                        }),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+        
+        with tab4:
+            st.subheader("Revenue Forecast")
             
-            st.metric("Filtered Transactions", f"{len(filtered_df):,}")
-            st.dataframe(filtered_df, use_container_width=True, height=300)
+            revenue_matrix = session.revenue_matrix
+            if revenue_matrix.empty:
+                st.info("💡 No revenue data to forecast")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    model = st.selectbox("Model:", list(FORECAST_MODELS), format_func=lambda name: name.replace("_", " ").title())
+                with col2:
+                    horizon = st.slider("Days to forecast:", 7, 90, 30)
+                
+                # Tutti i business in un solo fit vettoriale
+                predicted = session.revenue_forecast(model, horizon)
+                
+                fig = charts.forecast_chart(revenue_matrix.sum(axis=1), predicted.sum(axis=1))
+                st.plotly_chart(fig, use_container_width=True)
+                
+                st.write(f"**Forecast revenue, next {horizon} days:**")
+                st.dataframe(
+                    predicted.sum().rename("forecast_revenue").sort_values(ascending=False).to_frame()
+                    .style.format('${:,.2f}'),
+                    use_container_width=True
+                )
+        
+        with tab5:
+            st.subheader("Cost Breakdown")
+            
+            try:
+                costs = session.costs
+            except Exception:
+                costs = None
+            if costs is None:
+                st.info("💡 No cost data available")
+            else:
+                st.write("**Daily costs by type:**")
+                st.area_chart(costs.daily_cost_matrix())
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write("**Costs per employee:**")
+                    st.dataframe(
+                        costs.employee_costs().style.format({
+                            column: '${:,.2f}' for column in ['wages', 'health_insurance', 'hr_training', 'total_costs']
+                        }),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                with col2:
+                    st.write("**Delivery spend per supplier:**")
+                    st.dataframe(
+                        costs.supplier_costs().style.format({'spend': '${:,.2f}'}),
+                        use_container_width=True,
+                        hide_index=True
+                    )
 
 else:
     # Welcome message when no file uploaded
@@ -407,7 +555,7 @@ with st.sidebar:
     ### Status
     🟢 **Data Cleaner**: Ready  
     🟡 **Analytics**: In Development  
-    🔴 **Forecasting**: Coming Soon
+    🟢 **Forecasting**: Ready
     
     ### About
     This tool helps you analyze your Big Ambitions
@@ -417,6 +565,43 @@ with st.sidebar:
     **Updated:** 2025
     """)
     
+    cache_stats = get_upload_cache().stats
+    st.caption(
+        f"⚡ Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['size']}/{cache_stats['max_entries']} uploads)"
+    )
+    
+    lookup_stats = description_lookup.stats
+    st.caption(
+        f"🔎 Descriptions: {lookup_stats['hit_rate']:.0%} hit rate "
+        f"({lookup_stats['size']:,} distinct, {lookup_stats['rows']:,} rows)"
+    )
+    
+    with st.expander("⏱️ Stage profiling"):
+        st.toggle("Profile stages", value=PROFILE_STAGES, key="profile_stages",
+                  help="Only this session's stages are recorded")
+        st.caption("Cached uploads are not parsed again: reset and upload a new file to time the cleaning stages.")
+        if PROFILE_MEMORY:
+            st.caption("Peak memory is tracked for the whole server (PROFILE_MEMORY in config/settings.py).")
+        
+        if st.button("Reset", key="profile_reset"):
+            session_profiler.reset()
+        
+        if session_profiler.records:
+            st.dataframe(
+                session_profiler.summary().style.format({"total_s": "{:.3f}", "mean_ms": "{:.1f}", "rows": "{:,.0f}", "peak_mb": "{:.1f}"},
+                                                na_rep="—"),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.download_button("Download profile (JSON)", session_profiler.to_json(), file_name="profile.json",
+                               mime="application/json")
+    
+    # Artifact calcolati dalla sessione e da cosa dipendono (debug)
+    if uploaded_files and session is not None:
+        with st.expander("🧩 Analysis graph"):
+            st.json(session.dependency_graph(), expanded=False)
+    
     st.divider()
     
     st.markdown("""
@@ -0,0 +1,69 @@
+"""
+Batch analysis of Big Ambitions save exports (headless, no Streamlit)
+Run: python batch_analyze.py saves/ "exports/**/*.csv" --output batch_pl.csv
+"""
+
+import argparse
+import sys
+import time
+
+from analysis.batch import combine_periods, combine_profit_loss, find_exports, run_batch
+from analysis.temporal_analyzer import PERIOD_DAYS
+
+
+def print_result(result):
+    """One line per analyzed file, printed as soon as it completes."""
+    if result.error:
+        print(f"✗ {result.save:<30} {result.timings.get('total', 0):>7.2f}s  {result.error}")
+        return
+
+    timings = result.timings
+    print(
+        f"✓ {result.save:<30} {timings['total']:>7.2f}s  "
+        f"(clean {timings['clean']:.2f}s, P&L {timings['profit_loss']:.2f}s, "
+        f"periods {timings['temporal']:.2f}s)  {result.rows:,} rows"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many Big Ambitions exports in parallel")
+    parser.add_argument("sources", nargs="+", help="Export files, directories or glob patterns")
+    parser.add_argument("--output", "-o", default="batch_pl.csv", help="Combined per-save, per-business P&L (CSV)")
+    parser.add_argument("--periods-output", help="Combined per-period P&L (CSV, optional)")
+    parser.add_argument("--granularity", default="auto", choices=["auto"] + list(PERIOD_DAYS),
+                        help="Period granularity for the temporal analysis")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    paths = find_exports(args.sources)
+    if not paths:
+        print("No export files found", file=sys.stderr)
+        return 1
+
+    print(f"📂 {len(paths)} exports\n")
+    start = time.perf_counter()
+
+    results = run_batch(paths, granularity=args.granularity, workers=args.workers, on_result=print_result)
+
+    wall = time.perf_counter() - start
+    busy = sum(r.timings.get("total", 0) for r in results)
+    failed = [r for r in results if r.error]
+
+    combine_profit_loss(results).to_csv(args.output, index=False)
+    print(f"\n💾 P&L table: {args.output}")
+
+    if args.periods_output:
+        combine_periods(results).to_csv(args.periods_output, index=False)
+        print(f"💾 Period table: {args.periods_output}")
+
+    print(f"⏱️ {wall:.2f}s wall, {busy:.2f}s of analysis ({busy / wall:.1f}x parallel)")
+
+    if failed:
+        print(f"⚠️ {len(failed)} of {len(results)} exports failed")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Benchmark of the CSV parsing engines
+Run: python -m benchmarks.bench_cleaner [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import time
+
+from core.data_cleaner import ENGINES, clean_big_ambitions_csv
+from utils.synthetic_data import generate_export
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def bench_engine(content: bytes, engine: str, repeat: int = 1) -> float:
+    """Return the best wall time (seconds) of clean_big_ambitions_csv."""
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df, error = clean_big_ambitions_csv(content, engine=engine)
+        elapsed = time.perf_counter() - start
+
+        if error:
+            raise RuntimeError(f"{engine} engine failed: {error}")
+        best = min(best, elapsed)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Big Ambitions CSV parsing engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts to test")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} | {'engine':>8} | {'seconds':>8} | {'rows/sec':>12}")
+    print("-" * 48)
+
+    for n_rows in args.sizes:
+        content = generate_export(n_rows)
+        timings = {}
+
+        for engine in ENGINES:
+            timings[engine] = bench_engine(content, engine, args.repeat)
+            print(f"{n_rows:>10,} | {engine:>8} | {timings[engine]:>8.3f} | {n_rows / timings[engine]:>12,.0f}")
+
+        print(f"{'':>10} | speedup: {timings['legacy'] / timings['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory footprint of the cleaned transactions DataFrame
+Run: python -m benchmarks.bench_memory [--sizes 100000 1000000]
+"""
+
+import argparse
+
+import pandas as pd
+
+from core.data_cleaner import clean_big_ambitions_csv
+from core.transaction_categories import categorize_transactions
+from utils.synthetic_data import generate_export
+
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+
+# Tipi restituiti dal cleaner prima dello schema compatto
+WIDE_DTYPES = {
+    "description": object,
+    "day": "float64",
+    "type": object,
+    "price": "float64",
+    "balance": "float64",
+    "business": object,
+}
+
+
+def memory_footprint(df: pd.DataFrame) -> pd.Series:
+    """Bytes used by each column, including the Python strings of object columns."""
+    return df.memory_usage(deep=True, index=False)
+
+
+def to_wide_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast a compact frame back to the previous float64/object dtypes."""
+    return df.astype({column: dtype for column, dtype in WIDE_DTYPES.items() if column in df.columns})
+
+
+def print_report(label: str, compact: pd.DataFrame):
+    """Print per-column memory before (wide) and after (compact)."""
+    before = memory_footprint(to_wide_schema(compact))
+    after = memory_footprint(compact)
+
+    print(f"\n{label} ({len(compact):,} rows)")
+    print(f"{'column':>12} | {'before MB':>10} | {'after MB':>10} | {'ratio':>6} | dtype")
+    print("-" * 62)
+
+    for column in after.index:
+        ratio = before[column] / after[column] if after[column] else float("nan")
+        print(f"{column:>12} | {before[column] / 1e6:>10.2f} | {after[column] / 1e6:>10.2f} | "
+              f"{ratio:>5.1f}x | {compact[column].dtype}")
+
+    print(f"{'total':>12} | {before.sum() / 1e6:>10.2f} | {after.sum() / 1e6:>10.2f} | "
+          f"{before.sum() / after.sum():>5.1f}x |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint of the compact transaction schema")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts to test")
+    args = parser.parse_args()
+
+    for n_rows in args.sizes:
+        df, error = clean_big_ambitions_csv(generate_export(n_rows))
+        if error:
+            raise RuntimeError(error)
+
+        print_report("Cleaned transactions", df)
+        print_report("Categorized transactions", categorize_transactions(df).drop(columns="category"))
+
+
+if __name__ == "__main__":
+    main()
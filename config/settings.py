@@ -1,7 +1,28 @@
 """
-settings module
-TODO: Implement functionality
+Application settings
 """
 
-# Implementation goes here
-pass
+# Result cache (utils/cache.py): numero massimo di upload multipli (file uniti) analizzati in memoria
+CACHE_MAX_ENTRIES = 8
+
+# Analisi dei singoli file caricati
+UPLOAD_CACHE_MAX_ENTRIES = 16
+
+# Durante il merge di un upload multiplo la cache dei file tiene tutta la selezione,
+# fino a questo numero di file (oltre, i file in piu' vengono riletti a ogni merge)
+UPLOAD_CACHE_MAX_RESERVED = 32
+
+# Export scaricabili (core/data_exporter.py): file generati tenuti in memoria
+EXPORT_CACHE_MAX_ENTRIES = 4
+
+# Cache colonnare degli export (core/data_loader.py): None = accanto al file sorgente
+DATA_CACHE_DIR = None
+
+# Lookup description → categoria (core/transaction_categories.py): chiavi distinte in memoria
+DESCRIPTION_LOOKUP_MAX_ENTRIES = 50_000
+
+# Profiling degli stage (utils/helpers.py): valore iniziale del toggle nella sidebar (per sessione)
+PROFILE_STAGES = False
+
+# Picco di memoria degli stage (tracemalloc): vale per tutto il server e rallenta ogni sessione
+PROFILE_MEMORY = False
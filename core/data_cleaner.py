@@ -3,87 +3,384 @@ core/data_cleaner.py
 Data cleaning module for Big Ambitions CSV files
 """
 
+import csv
+import os
+import re
+import numpy as np
 import pandas as pd
 import io
-from typing import Tuple, Optional
+from contextlib import contextmanager
+from itertools import islice
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
 
+from utils.constants import TRANSACTION_DTYPES
+from utils.helpers import profiler
 
-def clean_big_ambitions_csv(file_content: bytes) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+
+COLUMNS = ["description", "day", "type", "price", "balance"]
+
+ENGINES = ("fast", "legacy")
+
+# Righe per chunk in modalita' streaming
+DEFAULT_CHUNK_ROWS = 50_000
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+# Righe scartate (core/data_validator.py): motivo di ogni riga in quarantena
+MALFORMED_LINE = "malformed_line"
+INVALID_DAY = "invalid_day"
+INVALID_PRICE = "invalid_price"
+
+# Separatore interno (ASCII unit separator), non compare negli export
+_FIELD_SEP = b"\x1f"
+
+# Riga canonica dell'export (doppio wrapper, apici raddoppiati):
+# "Kathleen Hinds (HQ Ray Daily Wage),""179"",""Wage"",""-325.8668"",""2134567"""
+# La description non e' quotata, quindi puo' contenere virgole.
+_WRAPPED_FIELDS = r'"([^"\n]*),""([^"\n]*)"",""([^"\n]*)"",""([^"\n]*)"",""([^"\n]+)"""'
+
+_WRAPPED_LINE = re.compile(_WRAPPED_FIELDS)
+
+# Variante multilinea per un solo findall sull'intero buffer
+_WRAPPED_BUFFER = re.compile(r'^[ \t\r]*' + _WRAPPED_FIELDS + r'[ \t\r]*$', re.MULTILINE)
+
+# Stessa riga senza wrapper esterno:
+# Kathleen Hinds (HQ Ray Daily Wage),"179","Wage","-325.8668","2134567"
+_PLAIN_LINE = re.compile(r'([^"]*),"([^"]*)","([^"]*)","([^"]*)","([^"]+)"')
+
+
+def _parse_line_legacy(line: str) -> List[str]:
+    """
+    Parse one export line character by character.
+
+    This is the original parser, kept as the reference implementation and
+    as fallback for lines that do not follow the standard export layout.
+    """
+    # STEP 3a: Rimuovi wrapper esterno se presente
+    line = line.strip()
+
+    if line.startswith('"') and line.endswith('"'):
+        line = line[1:-1]
+
+    # STEP 3b: Sostituisci doppi apici doppi
+    line = line.replace('""', '"')
+
+    # STEP 3c: Parse manuale
+    parts = []
+    current = ""
+    in_quotes = False
+
+    for char in line:
+        if char == '"':
+            in_quotes = not in_quotes
+            continue
+        if char == ',' and not in_quotes:
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    if current:
+        parts.append(current.strip())
+
+    return parts
+
+
+def _parse_lines_legacy(lines: Sequence[str], rejected: Optional[list] = None) -> List[Sequence[str]]:
+    """Parse lines with the per-character parser, keeping 5-field rows."""
+    cleaned_rows = []
+
+    for line in lines:
+        parts = _parse_line_legacy(line)
+        if len(parts) == 5:
+            cleaned_rows.append(parts)
+        elif rejected is not None and line.strip():
+            rejected.append((len(cleaned_rows), line.strip()))
+
+    return cleaned_rows
+
+
+def _parse_lines_fast(lines: Sequence[str], rejected: Optional[list] = None) -> List[Sequence[str]]:
+    """
+    Parse lines with precompiled regexes.
+
+    Lines in the wrapped or plain export layout are split by a single regex
+    match; anything else goes through the legacy parser so the result stays
+    the same on unusual input.
+
+    Lines that do not give 5 fields are skipped; with rejected, each one is
+    appended to it as (number of rows parsed before it, line).
+    """
+    cleaned_rows = []
+    append = cleaned_rows.append
+    match_wrapped = _WRAPPED_LINE.fullmatch
+    match_plain = _PLAIN_LINE.fullmatch
+
+    for line in lines:
+        line = line.strip()
+        match = match_wrapped(line) or match_plain(line)
+
+        if match is not None:
+            append(match.groups())
+            continue
+
+        parts = _parse_line_legacy(line)
+        if len(parts) == 5:
+            append(parts)
+        elif rejected is not None and line:
+            rejected.append((len(cleaned_rows), line))
+
+    return cleaned_rows
+
+
+def parse_content(content: str, engine: str = "fast", rejected: Optional[list] = None) -> List[Sequence[str]]:
+    """
+    Split decoded export text into raw 5-field rows.
+
+    Args:
+        content: Decoded file content
+        engine: "fast" (regex over the whole buffer) or "legacy"
+            (per-character parser)
+        rejected: If given, (row position, line) of every non-blank line
+            that is not a valid row is appended to it
+
+    Returns:
+        List of (description, day, type, price, balance) string rows
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+
+    content = content.strip()
+    if not content:
+        return []
+
+    if engine == "legacy":
+        return _parse_lines_legacy(content.split("\n"), rejected)
+
+    # Caso comune: tutte le righe sono nel formato standard, quindi un solo
+    # findall sull'intero buffer basta (nessun loop Python per riga).
+    rows = _WRAPPED_BUFFER.findall(content)
+    if len(rows) == content.count("\n") + 1:
+        return rows
+
+    return _parse_lines_fast(content.split("\n"), rejected)
+
+
+def _read_canonical_bytes(file_content: bytes) -> Optional[pd.DataFrame]:
+    """
+    Read a standard export in bulk with the C CSV parser.
+
+    The double wrapper is removed with a few replaces over the whole buffer
+    so every line becomes "description<US>day<US>type<US>price<US>balance".
+    Returns None when the buffer is not entirely in the standard layout;
+    the caller then falls back to the line parser.
+    """
+    content = file_content.strip()
+
+    if not (content.startswith(b'"') and content.endswith(b'"""')):
+        return None
+    if _FIELD_SEP in content:
+        return None
+
+    # Un solo passaggio di normalizzazione sull'intero buffer
+    content = content[1:-3]
+    content = content.replace(b'"""\r\n"', b"\n").replace(b'"""\n"', b"\n")
+    content = content.replace(b'"",""', _FIELD_SEP).replace(b',""', _FIELD_SEP)
+
+    # Ogni apice rimasto indica una riga fuori formato
+    if b'"' in content:
+        return None
+
+    n_lines = content.count(b"\n") + 1
+    if content.count(_FIELD_SEP) != 4 * n_lines:
+        return None
+
+    try:
+        df = pd.read_csv(
+            io.BytesIO(content),
+            sep=_FIELD_SEP.decode(),
+            header=None,
+            names=COLUMNS,
+            index_col=False,
+            quoting=csv.QUOTE_NONE,
+            na_filter=False,
+            skip_blank_lines=False,
+            dtype={"description": str, "type": str},
+            encoding="utf-8",
+            engine="c"
+        )
+    except pd.errors.ParserError:
+        return None
+
+    # Il parser originale scarta le righe con balance vuoto
+    if len(df) != n_lines or (df["balance"].astype(str) == "").any():
+        return None
+
+    return df
+
+
+def _rows_to_frame(rows: Sequence[Sequence[str]]) -> pd.DataFrame:
+    """Build a DataFrame of raw string fields from parsed rows."""
+    return pd.DataFrame(list(rows), columns=COLUMNS)
+
+
+def build_transactions_frame(df: pd.DataFrame, rejected: Optional[List[pd.DataFrame]] = None) -> pd.DataFrame:
+    """
+    Convert a raw transactions frame to typed columns.
+
+    Numeric columns are converted and rows without a valid day or price
+    are dropped.
+
+    Args:
+        df: Raw frame with COLUMNS (strings or cell values)
+        rejected: If given, the dropped rows are appended to it with their
+            raw values, row (their index) and reason
+    """
+    with profiler.stage("dtype_conversion", rows=len(df)):
+        # STEP 5: Converti tipi di dato
+        day = pd.to_numeric(df["day"], errors="coerce")
+        price = pd.to_numeric(df["price"], errors="coerce")
+
+        # STEP 6: Valida (rimuovi righe invalide, tenendole da parte se richiesto)
+        invalid_day = day.isna().to_numpy()
+        invalid = invalid_day | price.isna().to_numpy()
+        if rejected is not None and invalid.any():
+            rejected.append(df[invalid].assign(
+                row=df.index[invalid],
+                reason=np.where(invalid_day[invalid], INVALID_DAY, INVALID_PRICE),
+            ))
+
+        df["day"] = day
+        df["price"] = price
+        df["balance"] = pd.to_numeric(df["balance"], errors="coerce")
+        df = df[~invalid] if invalid.any() else df
+
+        # STEP 7: Schema compatto (day int32, description/type category)
+        return apply_transaction_schema(df)
+
+
+def apply_transaction_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a cleaned transactions frame to TRANSACTION_DTYPES.
+
+    Also used after concatenating chunks, since categoricals with different
+    categories are concatenated as plain strings.
+    """
+    dtypes = {column: dtype for column, dtype in TRANSACTION_DTYPES.items()
+              if column in df.columns and df[column].dtype != dtype}
+
+    return df.astype(dtypes) if dtypes else df
+
+
+def _parse_chunk(chunk: bytes, engine: str, rejected: Optional[list] = None) -> pd.DataFrame:
+    """Parse a block of complete export lines into a raw string frame."""
+    with profiler.stage("parse") as stage:
+        df = _read_canonical_bytes(chunk) if engine == "fast" else None
+
+        if df is None:
+            # STEP 1: Decodifica bytes → string
+            with profiler.stage("decode", rows=len(chunk)):
+                content = chunk.decode("utf-8")
+
+            # STEP 2-4: Splitta in righe, parsa e crea DataFrame
+            df = _rows_to_frame(parse_content(content, engine=engine, rejected=rejected))
+
+        stage.rows = len(df)
+
+    return df
+
+
+@contextmanager
+def _open_source(source: Source) -> Iterator[BinaryIO]:
+    """Open a path in binary mode, or pass an already open stream through."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            yield stream
+    else:
+        yield source
+
+
+def iter_clean_chunks(source: Source, chunk_rows: int = DEFAULT_CHUNK_ROWS, engine: str = "fast",
+                      rejected: Optional[List[pd.DataFrame]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a Big Ambitions export as typed DataFrame chunks.
+
+    Only chunk_rows lines are held in memory at a time, so exports larger
+    than RAM can be processed. The index of each chunk continues from the
+    previous one, so concatenating the chunks gives the same DataFrame as
+    cleaning the whole file at once.
+
+    Args:
+        source: Path to the export or binary stream (file, BytesIO, upload)
+        chunk_rows: Number of lines parsed per chunk
+        engine: Parsing engine, "fast" (default) or "legacy"
+        rejected: If given, the skipped lines and rows are appended to it as
+            DataFrames with row, reason and the raw values (core/data_validator.py)
+
+    Yields:
+        Cleaned DataFrame chunks (empty chunks are skipped)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be a positive integer")
+
+    with _open_source(source) as stream:
+        offset = 0
+
+        while True:
+            lines = list(islice(stream, chunk_rows))
+            if not lines:
+                break
+
+            malformed = [] if rejected is not None else None
+            df = _parse_chunk(b"".join(lines), engine, malformed)
+            df.index = pd.RangeIndex(offset, offset + len(df))
+
+            # Righe non parsabili: row = indice che avrebbe avuto la riga successiva
+            if malformed:
+                positions, raw_lines = zip(*malformed)
+                rejected.append(pd.DataFrame({
+                    "row": offset + np.array(positions, dtype=np.int64),
+                    "reason": MALFORMED_LINE,
+                    "raw": list(raw_lines),
+                }))
+            offset += len(df)
+
+            # STEP 5-6: Tipi di dato e validazione
+            df = build_transactions_frame(df, rejected)
+
+            if not df.empty:
+                yield df
+
+
+def clean_big_ambitions_csv(file_content: bytes, engine: str = "fast",
+                            rejected: Optional[List[pd.DataFrame]] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
     Clean Big Ambitions CSV with nested quotes.
-    
+
+    Thin wrapper around iter_clean_chunks that concatenates all chunks.
+
     Args:
         file_content: Raw file content as bytes
-        
+        engine: Parsing engine, "fast" (default) or "legacy"
+        rejected: If given, collects the skipped lines and rows (see iter_clean_chunks)
+
     Returns:
         Tuple[DataFrame or None, error_message or None]
         - If success: (DataFrame, None)
         - If error: (None, "error message")
     """
-    
-    
-    
-    
     try:
-        # STEP 1: Decodifica bytes → string
-        content = file_content.decode("utf-8")
-        
-        # STEP 2: Splitta in righe
-        lines = content.strip().split("\n")
-        
-        # STEP 3: Per ogni riga, pulisci e parsa
-        cleaned_rows = []
-        
-        for line in lines:
-            # STEP 3a: Rimuovi wrapper esterno se presente
-            line = line.strip()
-            
-            if line.startswith('"') and line.endswith('"'):
-                line = line[1:-1]
-            
-            # STEP 3b: Sostituisci doppi apici doppi
-            line = line.replace('""', '"')
-            
-            # STEP 3c: Parse manuale (questo è il più complesso!)
-            parts = []
-            current = ""
-            in_quotes = False
-            
-            for char in line:
-                if char == '"':
-                    in_quotes = not in_quotes
-                    continue
-                if char == ',' and not in_quotes:
-                    parts.append(current)
-                    current = ""
-                    continue
-                current += char
-            if current:
-                parts.append(current.strip())
-            
-            # STEP 3d: Aggiungi a cleaned_rows se valida
-            if len(parts) == 5:
-                cleaned_rows.append(parts)
-        
-        # STEP 4: Crea DataFrame
-        df = pd.DataFrame(
-            cleaned_rows,
-            columns=["description", "day", "type", "price", "balance"]
-        )
-        
-        # STEP 5: Converti tipi di dato
-        df["day"] = pd.to_numeric(df["day"], errors="coerce")
-        df["price"] = pd.to_numeric(df["price"], errors="coerce")
-        df["balance"] = pd.to_numeric(df["balance"], errors="coerce")
-        
-        
-        # STEP 6: Valida (rimuovi righe invalide)
-        df = df.dropna(subset=["day", "price"])
-        
-        if df.empty:
-            return None, "No valid data after cleaning"
-        
+        with profiler.stage("clean") as stage:
+            chunks = list(iter_clean_chunks(io.BytesIO(file_content), engine=engine, rejected=rejected))
+
+            if not chunks:
+                return None, "No valid data after cleaning"
+
+            df = apply_transaction_schema(pd.concat(chunks)) if len(chunks) > 1 else chunks[0]
+            stage.rows = len(df)
+
         return df, None
-        
+
     except Exception as e:
-        return None, f"Cleaning error: {str(e)}"
\ No newline at end of file
+        return None, f"Cleaning error: {str(e)}"
@@ -0,0 +1,211 @@
+"""
+core/data_exporter.py
+Chunked exports of cleaned data and reports (CSV, gzip CSV, Parquet, Excel)
+"""
+
+import io
+import os
+import zlib
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Union
+
+import pandas as pd
+
+from core.data_cleaner import DEFAULT_CHUNK_ROWS
+from utils.helpers import profiler
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow e' opzionale
+    pa = pq = None
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # pragma: no cover - openpyxl e' opzionale
+    Workbook = None
+
+
+# Righe di dati per foglio Excel (1.048.576 righe meno l'intestazione):
+# oltre si continua su un foglio "Nome (2)", "Nome (3)", ...
+EXCEL_MAX_ROWS = 1_048_575
+
+# Lunghezza massima del nome di un foglio Excel
+SHEET_NAME_MAX = 31
+
+Target = Union[str, os.PathLike, BinaryIO]
+
+
+class ExportFormat(NamedTuple):
+    extension: str
+    mime: str
+    label: str
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("csv", "text/csv", "CSV"),
+    "csv.gz": ExportFormat("csv.gz", "application/gzip", "CSV (gzip)"),
+    "parquet": ExportFormat("parquet", "application/vnd.apache.parquet", "Parquet"),
+    "xlsx": ExportFormat("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                         "Excel report"),
+}
+
+
+def _open_target(target: Target):
+    """(binary file, whether we opened it)."""
+    if hasattr(target, "write"):
+        return target, False
+    return open(target, "wb"), True
+
+
+# === CSV ===
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS, compress: bool = False) -> Iterator[bytes]:
+    """
+    CSV bytes of df, chunk_rows rows at a time.
+
+    The text is the same as df.to_csv(index=False), but only one chunk is
+    serialized at a time. With compress the chunks form one gzip stream.
+
+    Args:
+        df: DataFrame to export
+        chunk_rows: Rows serialized per chunk
+        compress: Gzip the output
+
+    Yields:
+        Successive pieces of the file (concatenate them for the full file)
+    """
+    encoder = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    for start in range(0, max(len(df), 1), chunk_rows):
+        data = df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+        if encoder is not None:
+            data = encoder.compress(data)
+        if data:
+            yield data
+
+    if encoder is not None:
+        yield encoder.flush()
+
+
+def write_csv(df: pd.DataFrame, target: Target, compress: bool = False, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Write df as CSV (gzip with compress) to a path or binary file, chunk by chunk."""
+    file, owned = _open_target(target)
+    try:
+        for data in iter_csv_chunks(df, chunk_rows, compress):
+            file.write(data)
+    finally:
+        if owned:
+            file.close()
+
+
+# === Parquet ===
+
+def write_parquet(df: pd.DataFrame, target: Target, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Write df as Parquet, one row group per chunk.
+
+    Each chunk is converted to Arrow on its own, so the full Arrow copy of
+    df is never in memory. Categorical columns stay dictionary-encoded.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    if pq is None:
+        raise ImportError("Parquet export requires pyarrow")
+
+    file, owned = _open_target(target)
+    try:
+        writer = None
+        for start in range(0, max(len(df), 1), chunk_rows):
+            table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False,
+                                         schema=writer.schema if writer is not None else None)
+            if writer is None:
+                writer = pq.ParquetWriter(file, table.schema, compression="zstd")
+            writer.write_table(table)
+        writer.close()
+    finally:
+        if owned:
+            file.close()
+
+
+# === Excel ===
+
+def _sheet_names(name: str, rows: int):
+    """Sheet names for a frame of rows rows: name, name (2), ... (one per EXCEL_MAX_ROWS)."""
+    for part in range(max(1, -(-rows // EXCEL_MAX_ROWS))):
+        suffix = f" ({part + 1})" if part else ""
+        yield name[:SHEET_NAME_MAX - len(suffix)] + suffix, part * EXCEL_MAX_ROWS
+
+
+def write_excel(sheets: Dict[str, pd.DataFrame], target: Target, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Write several frames to one workbook, one sheet each.
+
+    The workbook is opened in openpyxl's write-only mode, which streams the
+    rows to the file instead of keeping a cell object per value, and rows
+    are converted chunk_rows at a time. Frames longer than the Excel row
+    limit continue on extra sheets.
+
+    Args:
+        sheets: Sheet name → DataFrame (written with its columns, no index)
+        target: Path or binary file
+        chunk_rows: Rows converted per chunk
+
+    Raises:
+        ImportError: If openpyxl is not installed
+    """
+    if Workbook is None:
+        raise ImportError("Excel export requires openpyxl")
+
+    workbook = Workbook(write_only=True)
+
+    for name, df in sheets.items():
+        for sheet_name, offset in _sheet_names(name, len(df)):
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append([str(column) for column in df.columns])
+
+            stop = min(offset + EXCEL_MAX_ROWS, len(df))
+            for start in range(offset, stop, chunk_rows):
+                # object + None: categorie come testo, celle vuote invece di NaN
+                chunk = df.iloc[start:min(start + chunk_rows, stop)].astype(object)
+                for row in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+                    sheet.append(row)
+
+    file, owned = _open_target(target)
+    try:
+        workbook.save(file)
+    finally:
+        if owned:
+            file.close()
+
+
+# === Dispatch ===
+
+def export_bytes(sheets: Dict[str, pd.DataFrame], fmt: str = "csv", chunk_rows: int = DEFAULT_CHUNK_ROWS) -> bytes:
+    """
+    File content of an export.
+
+    Args:
+        sheets: Sheet name → DataFrame. CSV and Parquet export only the
+            first frame; Excel writes one sheet per frame
+        fmt: Name in EXPORT_FORMATS
+        chunk_rows: Rows serialized per chunk
+
+    Returns:
+        The file as bytes
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {list(EXPORT_FORMATS)}")
+
+    buffer = io.BytesIO()
+    first = next(iter(sheets.values()))
+
+    with profiler.stage(f"export_{fmt}", rows=sum(len(df) for df in sheets.values()) if fmt == "xlsx" else len(first)):
+        if fmt == "xlsx":
+            write_excel(sheets, buffer, chunk_rows)
+        elif fmt == "parquet":
+            write_parquet(first, buffer, chunk_rows)
+        else:
+            write_csv(first, buffer, compress=fmt == "csv.gz", chunk_rows=chunk_rows)
+
+    return buffer.getvalue()
@@ -1,7 +1,835 @@
 """
-data_loader module
-TODO: Implement functionality
+core/data_loader.py
+Load Big Ambitions exports (CSV or Excel workbook) with a persistent columnar cache
 """
 
-# Implementation goes here
-pass
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from analysis.ledger import DailyLedger, build_daily_ledger
+from config.settings import DATA_CACHE_DIR
+from core.data_cleaner import (
+    COLUMNS,
+    DEFAULT_CHUNK_ROWS,
+    MALFORMED_LINE,
+    apply_transaction_schema,
+    build_transactions_frame,
+    clean_big_ambitions_csv,
+    iter_clean_chunks,
+)
+from utils.helpers import profiler
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow e' opzionale
+    feather = None
+
+try:
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+except ImportError:  # pragma: no cover - openpyxl e' opzionale
+    openpyxl = None
+
+
+# Incrementare quando cambia l'output del cleaner o lo schema del ledger: invalida le cache esistenti
+CACHE_VERSION = 4
+
+# Ingestion incrementale: byte letti per blocco mentre si verifica il prefisso gia' letto
+INCREMENTAL_WINDOW = 1 << 20
+
+# Oltre questo numero di segmenti vengono compattati in uno solo
+MAX_SEGMENTS = 32
+
+LEDGER_TABLES = ["business_days", "benefits", "shared", "employees"]
+
+# XLSX/XLSM sono archivi zip: riconosciuti dalla firma, non dall'estensione
+WORKBOOK_SIGNATURE = b"PK\x03\x04"
+
+# Righe iniziali di ogni foglio in cui cercare l'intestazione delle colonne
+HEADER_SCAN_ROWS = 10
+
+# Byte dell'XML del foglio decompressi per lettura
+WORKBOOK_READ_BYTES = 1 << 20
+
+# Celle del foglio XML: riferimento, tipo e valore (<v> o testo inline <t>)
+_CELL_COLUMN = re.compile(rb'<c r="([A-Z]+)[0-9]+"')
+_CELL_ROW = re.compile(rb'<c r="[A-Z]+([0-9]+)"')
+_CELL_TYPE = re.compile(rb'<c r="[A-Z]+[0-9]+"(?: s="[0-9]+")?(?: t="([a-zA-Z]+)")?')
+_CELL_VALUE = re.compile(rb'<(?:v|t)(?: [^>]*)?>([^<]*)</(?:v|t)>')
+
+# Un carattere di controllo non puo' comparire nel testo XML: separa i valori decodificati insieme
+_TEXT_SEP = b"\x1f"
+
+PathLike = Union[str, os.PathLike]
+
+
+def _cache_paths(source: Path, cache_dir: Optional[PathLike]) -> Tuple[Path, Path]:
+    """Percorsi del file Feather e del fingerprint per un export."""
+    directory = Path(cache_dir) if cache_dir is not None else source.parent
+    return (
+        directory / f"{source.name}.feather",
+        directory / f"{source.name}.fingerprint.json",
+    )
+
+
+def file_digest(path: PathLike, block_size: int = 1 << 20) -> str:
+    """
+    Hash the content of a file, reading it in blocks.
+
+    Args:
+        path: File to hash
+        block_size: Bytes read per block
+
+    Returns:
+        Hex digest (BLAKE2b, 128 bit)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def source_fingerprint(path: PathLike, with_digest: bool = True) -> dict:
+    """
+    Fingerprint of an export file: size, modification time and content hash.
+    """
+    stat = os.stat(path)
+    fingerprint = {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    if with_digest:
+        fingerprint["digest"] = file_digest(path)
+
+    return fingerprint
+
+
+def _read_fingerprint(path: Path) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_fingerprint(path: Path, fingerprint: dict):
+    with open(path, "w") as f:
+        json.dump(fingerprint, f)
+
+
+def _is_cache_valid(source: Path, feather_path: Path, stored: Optional[dict], fingerprint_path: Path) -> bool:
+    """
+    Check the stored fingerprint against the source file.
+
+    Size and mtime are checked first; the content hash is only computed
+    when they differ (e.g. the file was touched or copied).
+    """
+    if stored is None or not feather_path.exists():
+        return False
+    if stored.get("version") != CACHE_VERSION:
+        return False
+
+    current = source_fingerprint(source, with_digest=False)
+    if current["size"] != stored.get("size"):
+        return False
+    if current["mtime_ns"] == stored.get("mtime_ns"):
+        return True
+
+    # Stessa dimensione ma mtime diverso: decide l'hash del contenuto
+    if file_digest(source) != stored.get("digest"):
+        return False
+
+    stored["mtime_ns"] = current["mtime_ns"]
+    _write_fingerprint(fingerprint_path, stored)
+    return True
+
+
+def to_cache_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Prepare a cleaned DataFrame for the columnar cache (compact schema, default index)."""
+    return apply_transaction_schema(df.reset_index(drop=True))
+
+
+def read_cache(path: PathLike) -> pd.DataFrame:
+    """Read a Feather cache file through a memory map."""
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas()
+
+
+def write_cache(df: pd.DataFrame, path: PathLike):
+    """Write a frame from to_cache_frame as an uncompressed Feather file (memory-mappable)."""
+    feather.write_feather(df, path, compression="uncompressed")
+
+
+def is_workbook(file_content: bytes) -> bool:
+    """Check whether an upload is an Excel workbook (XLSX/XLSM) rather than a CSV export."""
+    return file_content[:4] == WORKBOOK_SIGNATURE
+
+
+def _header_positions(row: Sequence) -> Optional[List[int]]:
+    """Position of each of COLUMNS in a header row (None if row is not a header)."""
+    names = [str(value).strip().lower() if value is not None else "" for value in row]
+    if not all(column in names for column in COLUMNS):
+        return None
+    return [names.index(column) for column in COLUMNS]
+
+
+def _find_transactions_sheet(workbook) -> Tuple[object, List[int], int]:
+    """
+    Locate the transactions table in a workbook.
+
+    The first sheet with a Description/Day/Type/Price/Balance header in
+    its first HEADER_SCAN_ROWS rows wins; without a header the active
+    sheet is read positionally from its first row.
+
+    Returns:
+        (worksheet, column position of each of COLUMNS, first data row)
+    """
+    for sheet in workbook.worksheets:
+        rows = sheet.iter_rows(max_row=HEADER_SCAN_ROWS, values_only=True)
+        for row_number, row in enumerate(rows, start=1):
+            positions = _header_positions(row)
+            if positions is not None:
+                return sheet, positions, row_number + 1
+
+    return workbook.active, list(range(len(COLUMNS))), 1
+
+
+def _typed_workbook_frame(raw: pd.DataFrame, rejected: Optional[List[pd.DataFrame]] = None) -> pd.DataFrame:
+    """Typed transactions from raw cell values (same rules as the CSV parser)."""
+    # Come il parser CSV: scarta le righe senza balance (anche quelle vuote)
+    has_balance = (raw["balance"].notna() & (raw["balance"] != "")).to_numpy()
+    if rejected is not None and not has_balance.all():
+        # In quarantena solo le righe incomplete, non quelle del tutto vuote
+        filled = (raw.notna() & (raw != "")).to_numpy().any(axis=1)
+        incomplete = ~has_balance & filled
+        if incomplete.any():
+            rejected.append(raw[incomplete].assign(row=raw.index[incomplete], reason=MALFORMED_LINE))
+
+    raw = raw[has_balance]
+    for column in ("description", "type"):
+        raw[column] = raw[column].fillna("").astype(str)
+
+    return build_transactions_frame(raw, rejected)
+
+
+def _xml_texts(values: np.ndarray) -> List[str]:
+    """Decode and unescape raw XML cell texts in one pass."""
+    text = _TEXT_SEP.join(values).decode("utf-8")
+    if "&" in text:
+        text = html.unescape(text)
+    return text.split(_TEXT_SEP.decode())
+
+
+def _read_sheet_block(block: bytes, columns: dict, shared_strings: np.ndarray,
+                      first_row: int) -> Optional[pd.DataFrame]:
+    """
+    Read the cells of a block of complete <row> elements in bulk.
+
+    Every cell must carry its reference (r="B12") and exactly one <v> or
+    inline <t> value, which is how Excel and openpyxl write data cells.
+    The cells are then matched with a few regex scans (C speed) instead
+    of one parser callback per XML node. Returns None when the block is
+    not entirely in that layout; the caller then falls back to openpyxl.
+
+    Args:
+        block: Bytes of consecutive <row> elements
+        columns: Column letter → field name
+        shared_strings: Shared string table of the workbook
+        first_row: First data row (after the header)
+
+    Returns:
+        Raw DataFrame with COLUMNS (cell values as str) indexed by
+        row - first_row, or None
+    """
+    n_cells = block.count(b"<c ")
+    if n_cells != block.count(b"<c") or b"<c/" in block:
+        return None
+
+    letters = _CELL_COLUMN.findall(block)
+    row_numbers = _CELL_ROW.findall(block)
+    values = _CELL_VALUE.findall(block)
+    if not (len(letters) == len(row_numbers) == len(values) == n_cells):
+        return None
+
+    # Il tipo serve solo per le shared string (Excel; openpyxl scrive testo inline)
+    n_shared = block.count(b' t="s"')
+    if n_shared:
+        types = _CELL_TYPE.findall(block)
+        # Un t="s" dopo altri attributi sfuggirebbe a _CELL_TYPE: l'indice verrebbe letto come testo
+        if len(types) != n_cells or types.count(b"s") != n_shared:
+            return None
+    else:
+        types = [b""] * n_cells
+
+    # STEP 1: Solo le celle delle colonne dei dati, dopo l'intestazione
+    letters = np.array(letters, dtype=object)
+    row_numbers = np.array(row_numbers, dtype="S10").astype(np.int64)
+    types = np.array(types, dtype=object)
+    values = np.array(values, dtype=object)
+
+    keep = np.isin(letters, list(columns)) & (row_numbers >= first_row)
+    if not keep.any():
+        return pd.DataFrame(columns=COLUMNS, dtype=object)
+    letters, row_numbers, types, values = letters[keep], row_numbers[keep], types[keep], values[keep]
+
+    # STEP 2: Testo delle celle (shared string, inline o numero)
+    shared = types == b"s"
+    text = np.empty(len(values), dtype=object)
+    if shared.any():
+        text[shared] = shared_strings[np.array(values[shared], dtype="S10").astype(np.int64)]
+    if not shared.all():
+        text[~shared] = _xml_texts(values[~shared])
+
+    # STEP 3: Una colonna per campo, allineate sul numero di riga
+    fields = {
+        field: pd.Series(text[letters == letter], index=row_numbers[letters == letter] - first_row)
+        for letter, field in columns.items()
+    }
+
+    return pd.DataFrame(fields, columns=COLUMNS)
+
+
+def _iter_sheet_blocks(stream: BinaryIO) -> Iterator[bytes]:
+    """
+    Cut the <sheetData> of a worksheet XML stream into blocks of complete rows.
+
+    Blocks are about WORKBOOK_READ_BYTES long, so memory stays bounded
+    whatever the size of the sheet.
+    """
+    buffer = b""
+    in_data = False
+
+    while True:
+        piece = stream.read(WORKBOOK_READ_BYTES)
+        buffer += piece
+
+        if not in_data:
+            # Tutto cio' che precede <sheetData> (colonne, viste...) si scarta
+            start = buffer.find(b"<sheetData")
+            tag_end = buffer.find(b">", start) if start >= 0 else -1
+            if tag_end < 0:
+                if not piece:
+                    return
+                continue
+            if buffer[tag_end - 1:tag_end] == b"/":
+                return
+            buffer = buffer[tag_end + 1:]
+            in_data = True
+
+        end = buffer.find(b"</sheetData>")
+        if end >= 0 or not piece:
+            block = buffer[:end] if end >= 0 else buffer
+            if block:
+                yield block
+            return
+
+        cut = buffer.rfind(b"</row>")
+        if cut >= 0:
+            cut += len(b"</row>")
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+
+
+def _iter_openpyxl_chunks(sheet, positions: List[int], first_row: int, min_row: int,
+                          chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream rows through openpyxl (values_only) into preallocated column buffers.
+
+    Fallback for sheets the bulk reader does not handle. The buffers are
+    allocated once (chunk_rows slots per column) and reused for every
+    chunk.
+    """
+    columns = [np.empty(chunk_rows, dtype=object) for _ in COLUMNS]
+    targets = list(zip(columns, positions))
+    filled = 0
+    offset = min_row - first_row
+
+    for row in sheet.iter_rows(min_row=min_row, max_col=max(positions) + 1, values_only=True):
+        for column, position in targets:
+            column[filled] = row[position]
+        filled += 1
+
+        if filled == chunk_rows:
+            yield pd.DataFrame({name: column[:filled] for name, column in zip(COLUMNS, columns)},
+                               index=pd.RangeIndex(offset, offset + filled))
+            offset += filled
+            filled = 0
+
+    if filled:
+        yield pd.DataFrame({name: column[:filled] for name, column in zip(COLUMNS, columns)},
+                           index=pd.RangeIndex(offset, offset + filled))
+
+
+def _iter_bulk_chunks(sheet, positions: List[int], first_row: int, chunk_rows: int,
+                      progress: dict) -> Iterator[pd.DataFrame]:
+    """
+    Raw chunks of about chunk_rows rows from the bulk reader.
+
+    Stops at the first block _read_sheet_block rejects, leaving in
+    progress["min_row"] the first row not read yet, and sets
+    progress["done"] once the whole sheet is read.
+    """
+    # Il foglio read-only espone il sorgente XML e la tabella delle shared string
+    open_source = getattr(sheet, "_get_source", None)
+    shared_strings = getattr(sheet, "_shared_strings", None)
+    if open_source is None or shared_strings is None:
+        return
+
+    columns = {get_column_letter(position + 1).encode(): field
+               for position, field in zip(positions, COLUMNS)}
+    shared_strings = np.array([str(value) for value in shared_strings], dtype=object)
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+
+    with open_source() as stream:
+        for block in _iter_sheet_blocks(stream):
+            with profiler.stage("parse") as stage:
+                raw = _read_sheet_block(block, columns, shared_strings, first_row)
+                stage.rows = len(raw) if raw is not None else 0
+            if raw is None:
+                break
+
+            pending.append(raw)
+            pending_rows += len(raw)
+            if not raw.empty:
+                progress["min_row"] = first_row + int(raw.index.max()) + 1
+
+            if pending_rows >= chunk_rows:
+                yield pd.concat(pending)
+                pending, pending_rows = [], 0
+        else:
+            progress["done"] = True
+
+    if pending_rows:
+        yield pd.concat(pending)
+
+
+def _iter_raw_workbook_chunks(workbook, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Raw cell values of the transactions sheet: bulk reader, then openpyxl from the first rejected block."""
+    sheet, positions, first_row = _find_transactions_sheet(workbook)
+    progress = {"min_row": first_row, "done": False}
+
+    yield from _iter_bulk_chunks(sheet, positions, first_row, chunk_rows, progress)
+
+    if not progress["done"]:
+        yield from _iter_openpyxl_chunks(sheet, positions, first_row, progress["min_row"], chunk_rows)
+
+
+def iter_clean_workbook_chunks(source: Union[PathLike, BinaryIO], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                               rejected: Optional[List[pd.DataFrame]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the transactions of an XLSX/XLSM export as typed DataFrame chunks.
+
+    The workbook is opened read-only, so the cell object model is never
+    built: openpyxl resolves the sheets, the header and the shared
+    strings, and the rows of the sheet XML are streamed in blocks of
+    about chunk_rows rows. Blocks in the standard layout are read in
+    bulk; from the first block that is not, rows go through openpyxl
+    values_only iteration into preallocated column buffers. Either way
+    the chunks have the same schema and index convention as
+    iter_clean_chunks (index = row - first data row).
+
+    Args:
+        source: Path to the workbook or binary stream
+        chunk_rows: Approximate number of rows per chunk
+        rejected: If given, collects the skipped rows (as iter_clean_chunks)
+
+    Yields:
+        Cleaned DataFrame chunks (empty chunks are skipped)
+    """
+    if openpyxl is None:
+        raise ImportError("Reading Excel exports requires openpyxl")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be a positive integer")
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        for raw in _iter_raw_workbook_chunks(workbook, chunk_rows):
+            df = _typed_workbook_frame(raw, rejected)
+            if not df.empty:
+                yield df
+    finally:
+        workbook.close()
+
+
+def clean_big_ambitions_workbook(file_content: bytes,
+                                 rejected: Optional[List[pd.DataFrame]] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    Clean a Big Ambitions XLSX/XLSM export.
+
+    Same result and error convention as clean_big_ambitions_csv.
+
+    Args:
+        file_content: Raw workbook content as bytes
+        rejected: If given, collects the skipped rows
+
+    Returns:
+        Tuple[DataFrame or None, error_message or None]
+    """
+    if openpyxl is None:
+        return None, "Reading Excel exports requires openpyxl"
+
+    try:
+        with profiler.stage("clean") as stage:
+            chunks = list(iter_clean_workbook_chunks(io.BytesIO(file_content), rejected=rejected))
+
+            if not chunks:
+                return None, "No valid data after cleaning"
+
+            df = apply_transaction_schema(pd.concat(chunks)) if len(chunks) > 1 else chunks[0]
+            stage.rows = len(df)
+
+        return df, None
+
+    except Exception as e:
+        return None, f"Cleaning error: {str(e)}"
+
+
+def clean_export(file_content: bytes,
+                 rejected: Optional[List[pd.DataFrame]] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    Clean an export of either format (CSV or Excel workbook).
+
+    Args:
+        file_content: Raw file content as bytes
+        rejected: If given, collects the skipped lines and rows (core/data_validator.py)
+
+    Returns:
+        Tuple[DataFrame or None, error_message or None]
+    """
+    if is_workbook(file_content):
+        return clean_big_ambitions_workbook(file_content, rejected)
+    return clean_big_ambitions_csv(file_content, rejected=rejected)
+
+
+def load_transactions(path: PathLike, cache_dir: Optional[PathLike] = DATA_CACHE_DIR,
+                      use_cache: bool = True) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    Load and clean a Big Ambitions export, reusing the columnar cache.
+
+    The first load parses the export (CSV or XLSX/XLSM) and writes a
+    Feather file next to a fingerprint of the source. Later loads memory-map the Feather file,
+    until the source file changes.
+
+    Args:
+        path: Path to the exported CSV or workbook
+        cache_dir: Directory for cache files (None = next to the export)
+        use_cache: Set to False to always parse the source
+
+    Returns:
+        Tuple[DataFrame or None, error_message or None]
+    """
+    source = Path(path)
+
+    if not source.exists():
+        return None, f"File not found: {source}"
+
+    if not use_cache or feather is None:
+        with open(source, "rb") as f:
+            return clean_export(f.read())
+
+    feather_path, fingerprint_path = _cache_paths(source, cache_dir)
+    stored = _read_fingerprint(fingerprint_path)
+
+    if _is_cache_valid(source, feather_path, stored, fingerprint_path):
+        try:
+            return read_cache(feather_path), None
+        except Exception:
+            pass  # Cache corrotta: la ricostruiamo
+
+    # Fingerprint prima del parse: se il file cambia durante la lettura
+    # la cache verra' invalidata al prossimo load
+    fingerprint = source_fingerprint(source)
+
+    with open(source, "rb") as f:
+        df, error = clean_export(f.read())
+
+    if error:
+        return None, error
+
+    df = to_cache_frame(df)
+
+    feather_path.parent.mkdir(parents=True, exist_ok=True)
+    write_cache(df, feather_path)
+    _write_fingerprint(fingerprint_path, fingerprint)
+
+    return df, None
+
+
+def _range_hasher(stream: BinaryIO, start: int, length: int, block: int, hasher=None):
+    """
+    Hash object fed with length bytes of stream starting at start, block
+    bytes at a time (hasher: continue this one instead of a new BLAKE2b).
+    """
+    if hasher is None:
+        hasher = hashlib.blake2b(digest_size=16)
+    stream.seek(start)
+
+    while length > 0:
+        data = stream.read(min(block, length))
+        if not data:
+            break
+        hasher.update(data)
+        length -= len(data)
+
+    return hasher
+
+
+def _byte_at(stream: BinaryIO, position: int) -> bytes:
+    stream.seek(position)
+    return stream.read(1)
+
+
+class IncrementalLoader:
+    """
+    Incremental ingestion of a growing export.
+
+    Exports only ever gain rows as the game goes on. The loader remembers
+    how many bytes it has already ingested, plus a checksum of all those
+    bytes. On refresh, if the file still contains the old content byte for
+    byte, only the new rows are parsed and folded into the stored
+    DailyLedger; otherwise (e.g. a row edited anywhere in the file)
+    everything is rebuilt. Checking hashes the old content once, read
+    window bytes at a time: far cheaper than parsing it again.
+
+    New rows are accepted both after the old content (appended) and before
+    it (newest-first exports). Only CSV exports can grow in place: workbooks
+    are rejected (load them with load_transactions).
+
+    State is kept in <export name>.incremental/ inside cache_dir:
+    state.json, the cleaned rows as Feather segments and the ledger tables.
+
+    Example:
+        loader = IncrementalLoader("Transactions.csv")
+        stats, error = loader.refresh()
+        pl_df = loader.profit_loss()
+    """
+
+    def __init__(self, path: PathLike, cache_dir: Optional[PathLike] = DATA_CACHE_DIR,
+                 window: int = INCREMENTAL_WINDOW):
+        self.source = Path(path)
+        directory = Path(cache_dir) if cache_dir is not None else self.source.parent
+        self.state_dir = directory / f"{self.source.name}.incremental"
+        self.window = window
+        self.state = self._read_state()
+        self.ledger = self._read_ledger() if self.state else DailyLedger()
+
+    # ------------------------------------------------------------------
+    # Stato su disco
+    # ------------------------------------------------------------------
+
+    @property
+    def _state_path(self) -> Path:
+        return self.state_dir / "state.json"
+
+    def _read_state(self) -> Optional[dict]:
+        state = _read_fingerprint(self._state_path)
+
+        if state is None or state.get("version") != CACHE_VERSION:
+            return None
+        if not all((self.state_dir / name).exists() for name in state.get("segments", [])):
+            return None
+
+        return state
+
+    def _read_ledger(self) -> DailyLedger:
+        try:
+            return DailyLedger(**{
+                table: read_cache(self.state_dir / f"ledger_{table}.feather")
+                for table in LEDGER_TABLES
+            })
+        except Exception:
+            # Ledger mancante o corrotto: si riparte da zero
+            self.state = None
+            return DailyLedger()
+
+    def _save(self, state: dict, ledger: DailyLedger):
+        for table in LEDGER_TABLES:
+            write_cache(getattr(ledger, table).reset_index(drop=True),
+                        self.state_dir / f"ledger_{table}.feather")
+
+        # state.json per ultimo: fino a qui lo stato precedente resta valido
+        _write_fingerprint(self._state_path, state)
+
+        self.state = state
+        self.ledger = ledger
+
+    def _write_segment(self, df: pd.DataFrame, state: dict) -> str:
+        """Write cleaned rows as a new segment, named from the counter in state."""
+        name = f"segment_{state['next_segment']:06d}.feather"
+        state["next_segment"] += 1
+        write_cache(to_cache_frame(df), self.state_dir / name)
+        return name
+
+    # ------------------------------------------------------------------
+    # Rilevamento del prefisso
+    # ------------------------------------------------------------------
+
+    def _boundary(self, stream: BinaryIO, offset: int) -> dict:
+        """Size and checksum of the first offset bytes of stream."""
+        return {"offset": offset, "digest": _range_hasher(stream, 0, offset, self.window).hexdigest()}
+
+    def _prefix_hasher(self, stream: BinaryIO, start: int):
+        """
+        Hash object of the state["offset"] bytes of stream from byte start,
+        or None if they differ from the ingested content.
+        """
+        hasher = _range_hasher(stream, start, self.state["offset"], self.window)
+        return hasher if hasher.hexdigest() == self.state["digest"] else None
+
+    def _detect_growth(self, stream: BinaryIO, size: int) -> Tuple[str, Optional[dict]]:
+        """
+        Compare the file with the ingested prefix.
+
+        Returns:
+            ("unchanged", "appended", "prepended" or "rebuild", boundary of
+            the whole file for the new state, or None for "rebuild")
+        """
+        if self.state is None:
+            return "rebuild", None
+
+        offset = self.state["offset"]
+        if size < offset:
+            return "rebuild", None
+
+        # Nuove righe in coda: la riga al confine deve essere completa
+        hasher = self._prefix_hasher(stream, 0)
+        if hasher is not None:
+            if size == offset:
+                return "unchanged", None
+            if offset == 0 or _byte_at(stream, offset - 1) in b"\r\n" or _byte_at(stream, offset) in b"\r\n":
+                # Il checksum del file intero continua quello del prefisso: una sola lettura
+                hasher = _range_hasher(stream, offset, size - offset, self.window, hasher)
+                return "appended", {"offset": size, "digest": hasher.hexdigest()}
+
+        # Nuove righe in testa (export dal piu' recente)
+        delta = size - offset
+        if delta > 0 and _byte_at(stream, delta - 1) == b"\n" and self._prefix_hasher(stream, delta) is not None:
+            return "prepended", self._boundary(stream, size)
+
+        return "rebuild", None
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Bring the stored state up to date with the export.
+
+        Returns:
+            Tuple[stats or None, error_message or None]; stats has mode
+            ("unchanged", "appended", "prepended", "rebuild"), new_rows,
+            parsed_bytes and total rows
+        """
+        if feather is None:
+            return None, "Incremental loading requires pyarrow"
+        if not self.source.exists():
+            return None, f"File not found: {self.source}"
+
+        with open(self.source, "rb") as stream:
+            if stream.read(len(WORKBOOK_SIGNATURE)) == WORKBOOK_SIGNATURE:
+                return None, "Incremental loading supports CSV exports only: load workbooks with load_transactions"
+
+            size = os.fstat(stream.fileno()).st_size
+            mode, boundary = self._detect_growth(stream, size)
+
+            if mode == "unchanged":
+                return {"mode": mode, "new_rows": 0, "parsed_bytes": 0, "rows": self.state["rows"]}, None
+
+            if mode == "rebuild":
+                return self._rebuild(stream, size)
+
+            # STEP 1: Parse solo dei byte nuovi
+            offset = self.state["offset"]
+            delta = size - offset
+            if mode == "appended":
+                stream.seek(offset)
+                chunks = list(iter_clean_chunks(stream))
+            else:
+                stream.seek(0)
+                chunks = list(iter_clean_chunks(io.BytesIO(stream.read(delta))))
+
+            state = dict(self.state, **boundary)
+
+        # STEP 2: Ledger delle nuove righe, unito a quello salvato
+        new_rows = sum(len(chunk) for chunk in chunks)
+        segments = list(self.state["segments"])
+        ledger = self.ledger
+
+        if new_rows:
+            new_df = pd.concat(chunks, ignore_index=True)
+            new_ledger = build_daily_ledger(new_df)
+            segment = self._write_segment(new_df, state)
+
+            # L'ordine delle righe nel file decide quale Wage vince nell'employee map
+            if mode == "appended":
+                ledger = ledger.append(new_ledger)
+                segments.append(segment)
+            else:
+                ledger = new_ledger.append(ledger)
+                segments.insert(0, segment)
+
+        state["rows"] = self.state["rows"] + new_rows
+        state["segments"] = segments
+        self._save(state, ledger)
+
+        if len(segments) > MAX_SEGMENTS:
+            self._compact()
+
+        return {"mode": mode, "new_rows": new_rows, "parsed_bytes": delta, "rows": state["rows"]}, None
+
+    def _rebuild(self, stream: BinaryIO, size: int) -> Tuple[Optional[dict], Optional[str]]:
+        """Parse the whole export and replace the stored state."""
+        stream.seek(0)
+        df, error = clean_big_ambitions_csv(stream.read())
+        if error:
+            return None, error
+
+        state = {"version": CACHE_VERSION, **self._boundary(stream, size)}
+
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        self.state_dir.mkdir(parents=True)
+
+        state["next_segment"] = 0
+        state["rows"] = len(df)
+        state["segments"] = [self._write_segment(df, state)]
+        self._save(state, build_daily_ledger(df))
+
+        return {"mode": "rebuild", "new_rows": len(df), "parsed_bytes": size, "rows": len(df)}, None
+
+    def _compact(self):
+        """Merge all segments into one."""
+        old_segments = self.state["segments"]
+        state = dict(self.state)
+        state["segments"] = [self._write_segment(self.transactions(), state)]
+        self._save(state, self.ledger)
+
+        for name in old_segments:
+            (self.state_dir / name).unlink(missing_ok=True)
+
+    def transactions(self) -> Optional[pd.DataFrame]:
+        """All ingested transactions, in file order (None before the first refresh)."""
+        if self.state is None:
+            return None
+
+        frames: List[pd.DataFrame] = [read_cache(self.state_dir / name) for name in self.state["segments"]]
+        return to_cache_frame(pd.concat(frames, ignore_index=True))
+
+    def profit_loss(self) -> pd.DataFrame:
+        """P&L of all ingested transactions, from the stored ledger."""
+        return self.ledger.profit_loss()
@@ -0,0 +1,179 @@
+"""
+core/data_merger.py
+Parse several overlapping exports concurrently and merge them into one timeline
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from core.data_cleaner import COLUMNS, apply_transaction_schema
+from core.data_loader import clean_export
+from core.data_validator import is_newest_first
+from utils.helpers import profiler
+
+
+class MergeResult(NamedTuple):
+    """
+    df: merged transactions, oldest first, index 0..n-1
+    duplicates: rows dropped because another export already had them
+    rows_per_export: rows each export contributed before deduplication
+    """
+    df: pd.DataFrame
+    duplicates: int
+    rows_per_export: List[int]
+
+
+def parse_exports(contents: Sequence[bytes], parse: Callable = clean_export,
+                  workers: Optional[int] = None, executor: Optional[Executor] = None) -> list:
+    """
+    Parse several exports on a process pool, one file per task.
+
+    Args:
+        contents: Raw file contents (CSV or workbook)
+        parse: Module-level function of the bytes (clean_export,
+            validate_export, ...), run in the worker processes
+        workers: Number of processes (None = one per file up to the
+            number of cores, 1 = in this process)
+        executor: Long-lived pool to run on instead of starting one
+            (workers is then ignored)
+
+    Returns:
+        parse(content) of every file, in the same order as contents
+    """
+    if executor is not None and len(contents) > 1:
+        return list(executor.map(parse, contents))
+
+    if workers is None:
+        workers = min(len(contents), os.cpu_count() or 1)
+
+    # Un solo core o un solo file: il pool costerebbe piu' del parallelismo
+    if workers <= 1 or len(contents) <= 1:
+        return [parse(content) for content in contents]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse, contents))
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of every (description, day, type, price, balance) row.
+
+    Categorical columns are hashed once per category, so the cost is a few
+    vectorized passes over the numeric columns; equal rows get equal hashes
+    whatever the categories of their frame.
+    """
+    return pd.util.hash_pandas_object(df[COLUMNS], index=False).to_numpy()
+
+
+def _occurrences(hashes: np.ndarray) -> np.ndarray:
+    """0 for the first row with a hash, 1 for the second, ... (vectorized)."""
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+
+    # Inizio di ogni gruppo di hash uguali, poi distanza dall'inizio
+    starts = np.ones(len(hashes), dtype=bool)
+    starts[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(len(hashes)), 0))
+
+    occurrences = np.empty(len(hashes), dtype=np.int64)
+    occurrences[order] = np.arange(len(hashes)) - group_start
+    return occurrences
+
+
+def _chronological(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows oldest first and sorted by day (stable: file order within a day)."""
+    if is_newest_first(df["day"].to_numpy()):
+        df = df.iloc[::-1]
+
+    day = df["day"].to_numpy()
+    if len(day) > 1 and (np.diff(day) < 0).any():
+        df = df.iloc[np.argsort(day, kind="stable")]
+
+    return df
+
+
+def merge_transactions(frames: Sequence[pd.DataFrame]) -> MergeResult:
+    """
+    Merge cleaned exports into one timeline without duplicate rows.
+
+    STEP 1: every export becomes a run sorted by day, oldest first.
+    STEP 2: the runs are concatenated and a stable argsort on day merges
+        them (timsort finds the k sorted runs and merges them, O(n log k));
+        within a day, rows keep the order of their file and files keep the
+        order given.
+    STEP 3: a row is a duplicate when an earlier file has the same row the
+        same number of times: the key is (row hash, occurrence number in
+        its file), so a transaction that really happens twice in one
+        export is kept twice.
+
+    Args:
+        frames: Cleaned DataFrames (clean_export), in priority order
+
+    Returns:
+        MergeResult
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return MergeResult(pd.DataFrame(columns=COLUMNS), 0, [])
+
+    with profiler.stage("merge", rows=sum(len(frame) for frame in frames)) as stage:
+        # STEP 1: Run cronologiche, hash e occorrenze per file
+        runs = [_chronological(frame[COLUMNS]) for frame in frames]
+        hashes = [row_hashes(run) for run in runs]
+        occurrences = [_occurrences(run_hashes) for run_hashes in hashes]
+
+        # STEP 2: Merge delle run per giorno
+        day = np.concatenate([run["day"].to_numpy() for run in runs])
+        order = np.argsort(day, kind="stable")
+
+        # STEP 3: Prima occorrenza di ogni (hash, occorrenza) nell'ordine delle run
+        keys = pd.DataFrame({
+            "hash": np.concatenate(hashes),
+            "occurrence": np.concatenate(occurrences),
+        })
+        first_seen = ~keys.duplicated().to_numpy()
+        order = order[first_seen[order]]
+
+        # Colonne per concatenazione: categorie unite senza ricodificare le stringhe
+        merged = pd.DataFrame({
+            column: (
+                union_categoricals([run[column] for run in runs], ignore_order=True).take(order)
+                if all(isinstance(run[column].dtype, pd.CategoricalDtype) for run in runs)
+                else np.concatenate([run[column].to_numpy() for run in runs])[order]
+            )
+            for column in COLUMNS
+        })
+        stage.rows = len(merged)
+
+    return MergeResult(
+        apply_transaction_schema(merged),
+        int((~first_seen).sum()),
+        [len(run) for run in runs],
+    )
+
+
+def merge_exports(contents: Sequence[bytes], workers: Optional[int] = None
+                  ) -> Tuple[Optional[MergeResult], Optional[str]]:
+    """
+    Clean several exports concurrently and merge them.
+
+    Args:
+        contents: Raw file contents, in priority order
+        workers: Number of processes (see parse_exports)
+
+    Returns:
+        Tuple[MergeResult or None, error_message or None]; the error names
+        the first export (1-based) that could not be cleaned
+    """
+    results = parse_exports(contents, clean_export, workers)
+
+    for position, (_, error) in enumerate(results, start=1):
+        if error:
+            return None, f"Export {position}: {error}"
+
+    return merge_transactions([df for df, _ in results]), None
@@ -1,7 +1,210 @@
 """
-data_validator module
-TODO: Implement functionality
+core/data_validator.py
+Vectorized checks of cleaned exports: quarantined rows, day order and balance continuity
 """
 
-# Implementation goes here
-pass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.data_cleaner import COLUMNS, INVALID_DAY, INVALID_PRICE, MALFORMED_LINE
+from core.data_loader import clean_export
+from utils.helpers import profiler
+
+
+# Gli export arrotondano il balance al dollaro: due arrotondamenti (riga e
+# riga precedente) spostano la differenza fino a 1, piu' il prezzo a 4 decimali
+BALANCE_TOLERANCE = 1.01
+
+# Limiti oltre i quali un valore e' considerato corrotto
+MAX_DAY = 100_000
+MAX_ABS_PRICE = 1e10
+
+DAY_OUT_OF_RANGE = "day_out_of_range"
+PRICE_OUT_OF_RANGE = "price_out_of_range"
+
+# Righe tolte dai dati (quarantine)
+REJECT_REASONS = {
+    MALFORMED_LINE: "Line does not split into description, day, type, price and balance",
+    INVALID_DAY: "Day is not a number",
+    INVALID_PRICE: "Price is not a number",
+    DAY_OUT_OF_RANGE: f"Day is negative or above {MAX_DAY:,}",
+    PRICE_OUT_OF_RANGE: f"Price is not finite or above {MAX_ABS_PRICE:,.0f} in absolute value",
+}
+
+DAY_ORDER = "day_order"
+BALANCE_GAP = "balance_gap"
+MISSING_BALANCE = "missing_balance"
+
+# Righe tenute ma segnalate (issues)
+ISSUE_REASONS = {
+    DAY_ORDER: "Day goes back in time with respect to the previous row",
+    BALANCE_GAP: "Balance does not follow from the previous balance and the price (rows missing before it)",
+    MISSING_BALANCE: "Balance is not a number",
+}
+
+QUARANTINE_COLUMNS = ["row", "reason"] + COLUMNS + ["raw"]
+
+ISSUE_COLUMNS = ["row", "reason", "day", "price", "balance", "expected_balance", "difference"]
+
+
+class ValidationReport(NamedTuple):
+    """
+    Result of validate_transactions.
+
+    df: rows that passed (index unchanged)
+    quarantine: rejected rows with row, reason and the raw values
+        (row = index of the row, or index of the next row for lines that
+        could not be parsed)
+    issues: kept rows with a day order or balance problem
+    newest_first: file order of the export
+    """
+    df: pd.DataFrame
+    quarantine: pd.DataFrame
+    issues: pd.DataFrame
+    newest_first: bool
+
+    @property
+    def is_clean(self) -> bool:
+        return self.quarantine.empty and self.issues.empty
+
+    def summary(self) -> Dict[str, int]:
+        """Rows per reason (quarantine and issues), plus the valid rows."""
+        counts = {"valid_rows": len(self.df)}
+        counts.update(self.quarantine["reason"].value_counts().to_dict())
+        counts.update(self.issues["reason"].value_counts().to_dict())
+        return counts
+
+    def missing_amount(self) -> float:
+        """Net amount of the rows missing at the balance gaps."""
+        return float(self.issues.loc[self.issues["reason"] == BALANCE_GAP, "difference"].sum())
+
+
+def is_newest_first(day: np.ndarray) -> bool:
+    """
+    Whether the rows go from the latest day to the earliest.
+
+    Decided by the majority of the day changes between consecutive rows,
+    so a few rows out of order do not flip the direction.
+    """
+    steps = np.sign(np.diff(np.asarray(day, dtype=np.int64)))
+    return bool((steps < 0).sum() > (steps > 0).sum())
+
+
+def quarantine_frame(rejected: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Rejected rows collected by the cleaner (rejected=...) as one frame, by row.
+
+    Columns other than QUARANTINE_COLUMNS (e.g. the export a row comes
+    from, when merging) are kept after them.
+    """
+    extra = [column for frame in rejected for column in frame.columns if column not in QUARANTINE_COLUMNS]
+    columns = QUARANTINE_COLUMNS + list(dict.fromkeys(extra))
+
+    frames = [frame.reindex(columns=columns).astype(object) for frame in rejected if not frame.empty]
+    if not frames:
+        frames = [pd.DataFrame(columns=columns)]
+
+    # Valori grezzi come testo (dal CSV sono stringhe, dal workbook anche numeri)
+    quarantine = pd.concat(frames, ignore_index=True)
+    quarantine = quarantine.astype({column: str for column in columns[1:]}).astype({"row": np.int64})
+
+    return quarantine.sort_values("row", kind="stable", ignore_index=True)
+
+
+def validate_transactions(df: pd.DataFrame, rejected: Optional[List[pd.DataFrame]] = None,
+                          tolerance: float = BALANCE_TOLERANCE) -> ValidationReport:
+    """
+    Check a cleaned transactions frame with whole-column mask operations.
+
+    STEP 1 moves rows with an impossible day or price to the quarantine.
+    The other checks only flag rows: days going back in time (against the
+    direction of the export) and balances that do not follow from the
+    previous balance and the price. A balance gap means rows are missing
+    (or were dropped) between the two rows; its difference is their net
+    amount.
+
+    Args:
+        df: Cleaned DataFrame (clean_export)
+        rejected: Rows the cleaner skipped (clean_export(..., rejected=...))
+        tolerance: Largest balance difference accepted as rounding
+
+    Returns:
+        ValidationReport
+    """
+    with profiler.stage("validate", rows=len(df)):
+        day = df["day"].to_numpy(dtype=np.int64)
+        price = df["price"].to_numpy(dtype=float)
+
+        # STEP 1: Valori fuori scala → quarantena
+        bad_day = (day < 0) | (day > MAX_DAY)
+        bad_price = ~np.isfinite(price) | (np.abs(price) > MAX_ABS_PRICE)
+        bad = bad_day | bad_price
+
+        rejected = list(rejected or [])
+        if bad.any():
+            rejected.append(df[bad].assign(
+                row=df.index[bad],
+                reason=np.where(bad_day[bad], DAY_OUT_OF_RANGE, PRICE_OUT_OF_RANGE),
+            ))
+            df = df[~bad]
+            day, price = day[~bad], price[~bad]
+
+        # STEP 2: Ordine cronologico (gli export possono essere dal piu' recente)
+        newest_first = is_newest_first(day)
+        order = np.arange(len(df))[::-1] if newest_first else np.arange(len(df))
+        day, price = day[order], price[order]
+        balance = df["balance"].to_numpy(dtype=float)[order]
+
+        # STEP 3: Giorni che tornano indietro
+        day_order = np.zeros(len(df), dtype=bool)
+        day_order[1:] = np.diff(day) < 0
+
+        # STEP 4: balance[i] = balance[i-1] + price[i], a meno dell'arrotondamento
+        expected = np.full(len(df), np.nan)
+        expected[1:] = balance[:-1] + price[1:]
+        difference = balance - expected
+        with np.errstate(invalid="ignore"):
+            gap = np.abs(difference) > tolerance
+        missing = np.isnan(balance)
+
+        # Motivo solo per le righe segnalate (poche): niente array di stringhe lungo quanto il frame
+        flagged = np.flatnonzero(missing | day_order | gap)
+        reason = np.select([missing[flagged], day_order[flagged]], [MISSING_BALANCE, DAY_ORDER], default=BALANCE_GAP)
+
+        issues = pd.DataFrame({
+            "row": df.index.to_numpy()[order[flagged]],
+            "reason": reason,
+            "day": day[flagged],
+            "price": price[flagged],
+            "balance": balance[flagged],
+            "expected_balance": expected[flagged],
+            "difference": difference[flagged],
+        }, columns=ISSUE_COLUMNS).sort_values("row", kind="stable", ignore_index=True)
+
+    return ValidationReport(df, quarantine_frame(rejected), issues, newest_first)
+
+
+def validate_export(file_content: bytes) -> Tuple[Optional[ValidationReport], Optional[str]]:
+    """
+    Clean an export (CSV or workbook) and validate it.
+
+    Same error convention as clean_export: on failure the report is None.
+
+    Args:
+        file_content: Raw file content as bytes
+
+    Returns:
+        Tuple[ValidationReport or None, error_message or None]
+    """
+    rejected: List[pd.DataFrame] = []
+    df, error = clean_export(file_content, rejected=rejected)
+    if error:
+        return None, error
+
+    report = validate_transactions(df, rejected)
+    if report.df.empty:
+        return None, "No valid data after validation"
+
+    return report, None
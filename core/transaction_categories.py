@@ -3,8 +3,15 @@ Centralized Transaction Category Management
 """
 
 import re
-from typing import Tuple, Optional
-from analysis.revenue_analyzer import extract_business_name_from_string
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple, Optional
+from analysis.revenue_analyzer import extract_business_name_from_string, extract_business_names
+from config.settings import DESCRIPTION_LOOKUP_MAX_ENTRIES
+from utils.constants import BUSINESS_DTYPE
+from utils.helpers import map_categories, profiler
 
 
 SHARED_REVENUE_BASED_TYPES = [
@@ -19,6 +26,43 @@ SHARED_EQUAL_SPLIT_TYPES = [
     "Interior Designer"
 ]
 
+
+EMPLOYEE_BENEFIT_TYPES = ["Health Insurance", "HR Training"]
+
+
+# Pattern vettoriali equivalenti agli split di extract_business_from_description
+BUSINESS_PATTERNS = {
+    # "John Smith (McDonald's Daily Wage)" → split("(")[1].split("Daily")[0]
+    'Wage': r"^[^(]*\(((?:(?!Daily)[^(])*)",
+    # "Replacement for Everett Beshears (Tech & Gift Wage)" → split("(")[-1].split("Wage")[0]
+    'Replacement Wage': r"^(?:.*\()?((?:(?!Wage).)*)",
+    # "Marketing campaigns for G&J" → split("for")[-1]
+    'Marketing': r"^(?:.*for)?(.*)$",
+    # "Business delivery from Supplier" → split("delivery")[0]
+    'Delivery Contract': r"^((?:(?!delivery).)*)",
+}
+
+
+# Nome del dipendente dalla description
+EMPLOYEE_PATTERNS = {
+    # "Kathleen Hinds (HQ Ray Daily Wage)" → split("(")[0]
+    'Wage': r"^([^(]*)",
+    # "Replacement for Everett Beshears (Tech & Gift Wage)" → split("for")[-1].split("(")[0]
+    'Replacement Wage': r"^(?:.*for)?([^(]*)",
+    # "Silver Health Insurance (James Rodriguez) - 20 Employees" → split("(")[1].split(")")[0]
+    'Health Insurance': r"^[^(]*\(([^()]*)",
+    # "Randy Haugen training costs" → split("training")[0]
+    'HR Training': r"^((?:(?!training).)*)",
+}
+
+WAGE_TYPES = ['Wage', 'Replacement Wage']
+
+# Fornitore dei Delivery Contract: "Business delivery from Supplier" → split("from")[-1]
+SUPPLIER_PATTERN = r"delivery\s+from\s+(.*)$"
+
+# Colonne restituite da DescriptionLookup.resolve
+LOOKUP_COLUMNS = ['category', 'business', 'employee', 'employer', 'supplier']
+
 def categorize_transaction(row) -> Tuple[str, Optional[str]]:
     """Categorizza una transazione."""
     trans_type = row['type']
@@ -79,3 +123,246 @@ def extract_business_from_description(description: str, trans_type: str) -> Opti
         business = description.split("delivery")[0].strip()
         return business    
     return None
+
+
+
+def extract_business_column(descriptions: pd.Series, trans_types: pd.Series) -> pd.Series:
+    """
+    Vectorized version of extract_business_from_description.
+
+    Args:
+        descriptions: Series of transaction descriptions
+        trans_types: Series of transaction types (same index)
+
+    Returns:
+        Categorical Series of business names, NaN where the type has no
+        business pattern
+    """
+    business = pd.Series(np.nan, index=descriptions.index, dtype=object)
+
+    # Pattern 1: Revenue
+    mask = (trans_types == 'Revenue').to_numpy()
+    if mask.any():
+        business[mask] = map_categories(
+            descriptions[mask], lambda values: extract_business_names(values.str.strip())
+        ).to_numpy()
+
+    # Pattern 2-5: Wage, Replacement Wage, Marketing, Delivery Contract
+    for trans_type, pattern in BUSINESS_PATTERNS.items():
+        mask = (trans_types == trans_type).to_numpy()
+        if mask.any():
+            extracted = map_categories(
+                descriptions[mask], lambda values: values.str.extract(pattern, expand=False).str.strip()
+            )
+            business[mask] = extracted.to_numpy()
+
+    return business.astype(BUSINESS_DTYPE)
+
+
+def _categorize_columns(descriptions: pd.Series, trans_type: pd.Series, price: pd.Series) -> pd.DataFrame:
+    """
+    Categorize rows with vectorized masks (same rules as categorize_transaction).
+
+    Returns:
+        DataFrame with category, business, employee, employer and
+        supplier columns: employee is the person named in Wage /
+        Replacement Wage / Health Insurance / HR Training rows, employer
+        the business of the wage rows, supplier the sender of Delivery
+        Contract rows
+    """
+    business = extract_business_column(descriptions, trans_type)
+
+    has_business = (business.notna() & (business != "")).to_numpy()
+    is_positive = (price > 0).to_numpy()
+    is_negative = (price < 0).to_numpy()
+
+    category = np.select(
+        [
+            is_positive,
+            is_negative & has_business,
+            is_negative & trans_type.isin(EMPLOYEE_BENEFIT_TYPES).to_numpy(),
+            is_negative & trans_type.isin(SHARED_REVENUE_BASED_TYPES).to_numpy(),
+            is_negative & trans_type.isin(SHARED_EQUAL_SPLIT_TYPES).to_numpy(),
+        ],
+        ["revenue", "direct_cost", "direct_cost", "shared_revenue_based", "shared_equal_split"],
+        default="personal"
+    )
+
+    # Il business resta solo per revenue e direct cost con business
+    keep_business = is_positive | (is_negative & has_business)
+
+    # Dipendente: stessi split di build_employee_mapping e del P&L
+    employee = pd.Series(np.nan, index=descriptions.index, dtype=object)
+    for employee_type, pattern in EMPLOYEE_PATTERNS.items():
+        mask = (trans_type == employee_type).to_numpy()
+        if mask.any():
+            extracted = descriptions[mask].str.extract(pattern, expand=False)
+            employee[mask] = extracted.str.strip().to_numpy()
+
+    # Solo le coppie dipendente → business valide delle righe Wage
+    is_wage = trans_type.isin(WAGE_TYPES).to_numpy()
+    valid_pair = is_wage & has_business & (employee.notna() & (employee != "")).to_numpy()
+
+    supplier = pd.Series(np.nan, index=descriptions.index, dtype=object)
+    mask = (trans_type == 'Delivery Contract').to_numpy()
+    if mask.any():
+        supplier[mask] = descriptions[mask].str.extract(SUPPLIER_PATTERN, expand=False).str.strip().to_numpy()
+
+    return pd.DataFrame({
+        'category': category,
+        'business': business.where(keep_business, None).astype(object).to_numpy(),
+        'employee': employee.where(is_wage | trans_type.isin(EMPLOYEE_BENEFIT_TYPES).to_numpy()).to_numpy(),
+        'employer': business.where(valid_pair, None).astype(object).to_numpy(),
+        'supplier': supplier.to_numpy(),
+    }, index=descriptions.index)
+
+
+class DescriptionLookup:
+    """
+    Memo of description → (category, business, employee, employer, supplier).
+
+    Exports repeat the same few thousand descriptions over and over, so the
+    string rules run once per distinct (description, type, price sign) and
+    the results are broadcast back to the rows. The table is a bounded LRU
+    shared by categorize_transactions and the employee mapping.
+    """
+
+    def __init__(self, max_entries: int = DESCRIPTION_LOOKUP_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Resolve every row of df through the table.
+
+        Args:
+            df: DataFrame with description, type and price columns
+
+        Returns:
+            DataFrame with LOOKUP_COLUMNS, same index as df; all but
+            category are categorical
+        """
+        # STEP 1: Chiavi distinte (description, type, segno del prezzo)
+        description_codes, descriptions = pd.factorize(df['description'], use_na_sentinel=False)
+        type_codes, types = pd.factorize(df['type'], use_na_sentinel=False)
+        sign = np.sign(df['price'].to_numpy()).astype(np.int64) + 1
+
+        row_keys = (description_codes.astype(np.int64) * len(types) + type_codes) * 3 + sign
+        unique_keys, inverse = np.unique(row_keys, return_inverse=True)
+
+        key_description = descriptions[unique_keys // 3 // len(types)]
+        key_type = types[unique_keys // 3 % len(types)]
+        key_sign = unique_keys % 3 - 1
+        keys = list(zip(key_description, key_type, key_sign.tolist()))
+
+        # STEP 2: Lookup nella tabella, calcolo vettoriale solo per le chiavi nuove
+        values = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for position, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(position)
+                else:
+                    self._entries.move_to_end(key)
+                    values[position] = value
+
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+            self.rows += len(df)
+
+        if missing:
+            computed = _categorize_columns(
+                pd.Series(key_description[missing]),
+                pd.Series(key_type[missing]),
+                pd.Series(key_sign[missing], dtype=float),
+            )
+            computed = computed.astype(object).where(computed.notna(), None)
+
+            with self._lock:
+                for position, value in zip(missing, computed.itertuples(index=False, name=None)):
+                    values[position] = value
+                    self._entries[keys[position]] = value
+
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        # STEP 3: Broadcast alle righe tramite i codici
+        table = pd.DataFrame(values, columns=LOOKUP_COLUMNS)
+        result = pd.DataFrame({'category': table['category'].to_numpy()[inverse]}, index=df.index)
+        for column in LOOKUP_COLUMNS[1:]:
+            codes, uniques = pd.factorize(table[column])
+            result[column] = pd.Categorical.from_codes(codes[inverse], categories=uniques.astype(object))
+
+        return result
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.rows = 0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters (per distinct key), rows resolved and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rows": self.rows,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# Tabella condivisa da tutto il processo
+description_lookup = DescriptionLookup()
+
+
+def categorize_transactions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categorize all transactions in one columnar pass.
+
+    Same rules as categorize_transaction, resolved once per distinct
+    description through description_lookup.
+
+    Args:
+        df: Cleaned DataFrame with transactions
+
+    Returns:
+        Copy of df with added 'category' and 'business' columns
+    """
+    with profiler.stage("categorization", rows=len(df)):
+        categorized = df.copy()
+        resolved = description_lookup.resolve(df)
+
+        categorized['category'] = resolved['category']
+        categorized['business'] = resolved['business'].astype(BUSINESS_DTYPE)
+
+    return categorized
+
+
+
+def ensure_categorized(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorize df only if it has no 'category'/'business' columns yet."""
+    if 'category' in df.columns and 'business' in df.columns:
+        return df
+    return categorize_transactions(df)
@@ -2,13 +2,12 @@
 Test script per TemporalAnalyzer
 """
 
-from core.data_cleaner import clean_big_ambitions_csv
+from core.data_loader import load_transactions
 from analysis.temporal_analyzer import TemporalAnalyzer
 
-# Carica i dati
+# Carica i dati (dalla cache Feather se il CSV non e' cambiato)
 print("📂 Caricamento dati...")
-with open("Transactions.csv", "rb") as f:
-    df, error = clean_big_ambitions_csv(f.read())
+df, error = load_transactions("Transactions.csv")
 
 if error:
     print(f"❌ Errore: {error}")
@@ -1,7 +1,352 @@
 """
-test_analyzer module
-TODO: Implement functionality
+Tests for analysis/ and core/transaction_categories.py
 """
 
-# Implementation goes here
-pass
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.cost_analyzer import CostAnalyzer
+from analysis.employees import EmployeeAssignmentIndex
+from analysis.forecasting import (
+    FORECAST_MODELS,
+    daily_profit_matrix,
+    daily_revenue_matrix,
+    forecast,
+    holt_winters,
+)
+from analysis.ledger import build_daily_ledger
+from analysis.profit_loss import (
+    build_employee_mapping,
+    calculate_profit_loss,
+    calculate_shared_costs,
+    extract_direct_costs,
+)
+from analysis.range_index import DayRangeIndex
+from analysis.session import AnalysisSession
+from analysis.temporal_analyzer import TemporalAnalyzer
+from analysis.trends import TrendAnalyzer
+from core.data_cleaner import clean_big_ambitions_csv
+from core.transaction_categories import (
+    DescriptionLookup,
+    categorize_transaction,
+    categorize_transactions,
+    description_lookup,
+)
+from utils.synthetic_data import generate_export
+
+
+def make_transactions(rows):
+    return pd.DataFrame(rows, columns=["description", "day", "type", "price", "balance"])
+
+
+@pytest.fixture
+def transactions():
+    return make_transactions([
+        ("HQ Ray Revenue", 1, "Revenue", 1000.0, 0),
+        ("Tech & Gift Revenue", 1, "Revenue", 3000.0, 0),
+        ("Kathleen Hinds (HQ Ray Daily Wage)", 1, "Wage", -100.0, 0),
+        ("Replacement for Everett Beshears (Tech & Gift Wage)", 1, "Replacement Wage", -50.0, 0),
+        ("Marketing campaigns for Tech & Gift", 2, "Marketing", -30.0, 0),
+        ("Silver Health Insurance (Kathleen Hinds) - 10 Employees", 2, "Health Insurance", -20.0, 0),
+        ("Everett Beshears training costs", 2, "HR Training", -10.0, 0),
+        ("Unknown Person training costs", 2, "HR Training", -99.0, 0),
+        ("HQ Ray delivery from Wholesale", 2, "Delivery Contract", -40.0, 0),
+        ("Rent", 2, "Rent", -400.0, 0),
+        ("Interior Designer", 2, "Interior Designer", -200.0, 0),
+        ("Taxi Ride", 2, "Taxi Ride", -5.0, 0),
+    ])
+
+
+def test_categorize_transactions_matches_row_wise(transactions):
+    categorized = categorize_transactions(transactions)
+
+    for (_, row), category, business in zip(transactions.iterrows(), categorized["category"], categorized["business"]):
+        expected_category, expected_business = categorize_transaction(row)
+        assert category == expected_category
+        assert (business if pd.notna(business) else None) == expected_business
+
+
+def test_description_lookup_resolves_each_key_once(transactions):
+    lookup = DescriptionLookup()
+    repeated = pd.concat([transactions] * 50, ignore_index=True)
+
+    first = lookup.resolve(repeated)
+    second = lookup.resolve(transactions.astype({"description": "category", "type": "category"}))
+
+    assert lookup.stats["misses"] == len(transactions)
+    assert lookup.stats["hits"] == len(transactions)
+    assert lookup.stats["rows"] == 51 * len(transactions)
+    assert first["category"].tolist() == 50 * second["category"].tolist()
+    assert first["employer"].iloc[2] == "HQ Ray"
+
+
+def test_description_lookup_is_bounded(transactions):
+    lookup = DescriptionLookup(max_entries=4)
+
+    resolved = lookup.resolve(transactions)
+
+    assert len(lookup) == 4
+    assert lookup.stats["evictions"] == len(transactions) - 4
+    assert resolved["category"].tolist() == categorize_transactions(transactions)["category"].tolist()
+
+
+def test_employee_mapping_reuses_lookup(transactions):
+    categorize_transactions(transactions)
+    misses = description_lookup.stats["misses"]
+
+    build_employee_mapping(transactions)
+
+    assert description_lookup.stats["misses"] == misses
+
+
+def test_build_employee_mapping(transactions):
+    assert build_employee_mapping(transactions) == {
+        "Kathleen Hinds": "HQ Ray",
+        "Everett Beshears": "Tech & Gift",
+    }
+
+
+@pytest.fixture
+def moved_employee():
+    # Kathleen passa da HQ Ray a Tech & Gift il giorno 5
+    return make_transactions([
+        ("HQ Ray Revenue", 1, "Revenue", 1000.0, 0),
+        ("Tech & Gift Revenue", 1, "Revenue", 3000.0, 0),
+        ("Silver Health Insurance (Kathleen Hinds) - 10 Employees", 1, "Health Insurance", -20.0, 0),
+        ("Kathleen Hinds (HQ Ray Daily Wage)", 2, "Wage", -100.0, 0),
+        ("Kathleen Hinds training costs", 3, "HR Training", -10.0, 0),
+        ("Kathleen Hinds (Tech & Gift Daily Wage)", 5, "Wage", -100.0, 0),
+        ("Kathleen Hinds (Tech & Gift Daily Wage)", 6, "Wage", -100.0, 0),
+        ("Silver Health Insurance (Kathleen Hinds) - 10 Employees", 7, "Health Insurance", -30.0, 0),
+    ])
+
+
+def test_employee_index_resolves_by_day(moved_employee):
+    employees = EmployeeAssignmentIndex.from_transactions(moved_employee)
+
+    assert employees.assignments.astype(object).values.tolist() == [
+        ["Kathleen Hinds", 2, "HQ Ray"], ["Kathleen Hinds", 5, "Tech & Gift"]
+    ]
+    resolved = employees.resolve(pd.Series(["Kathleen Hinds"] * 4 + ["Nobody"]), pd.Series([0, 2, 4, 9, 3]))
+    assert resolved.astype(object).tolist()[:4] == ["HQ Ray", "HQ Ray", "HQ Ray", "Tech & Gift"]
+    assert pd.isna(resolved.iloc[4])
+    assert build_employee_mapping(moved_employee) == {"Kathleen Hinds": "Tech & Gift"}
+
+
+def test_benefits_follow_employee_moves(moved_employee):
+    pl_df = calculate_profit_loss(moved_employee).set_index("business")
+
+    assert pl_df.loc["HQ Ray", "health_insurance"] == 20.0
+    assert pl_df.loc["HQ Ray", "hr_training"] == 10.0
+    assert pl_df.loc["Tech & Gift", "health_insurance"] == 30.0
+    pd.testing.assert_frame_equal(build_daily_ledger(moved_employee).profit_loss(), calculate_profit_loss(moved_employee))
+
+    first, second = build_daily_ledger(moved_employee.iloc[:5]), build_daily_ledger(moved_employee.iloc[5:])
+    pd.testing.assert_frame_equal(first.append(second).profit_loss(), calculate_profit_loss(moved_employee),
+                                  check_categorical=False)
+
+
+def test_extract_direct_costs(transactions):
+    costs = extract_direct_costs(transactions, build_employee_mapping(transactions))
+    costs = costs.set_index("business")
+
+    assert costs.loc["HQ Ray", "wages"] == 100.0
+    assert costs.loc["HQ Ray", "health_insurance"] == 20.0
+    assert costs.loc["Tech & Gift", "wages"] == 50.0
+    assert costs.loc["Tech & Gift", "marketing"] == 30.0
+    assert costs.loc["Tech & Gift", "hr_training"] == 10.0
+    assert costs.loc["Tech & Gift", "total_direct_costs"] == 90.0
+
+
+def test_calculate_shared_costs(transactions):
+    assert calculate_shared_costs(transactions) == (400.0, 200.0)
+
+
+def test_calculate_profit_loss(transactions):
+    pl_df = calculate_profit_loss(transactions).set_index("business")
+
+    assert pl_df.loc["HQ Ray", "shared_revenue_based"] == 100.0
+    assert pl_df.loc["Tech & Gift", "shared_revenue_based"] == 300.0
+    assert pl_df.loc["HQ Ray", "shared_equal_split"] == 100.0
+    assert pl_df.loc["HQ Ray", "profit"] == 1000.0 - 120.0 - 200.0
+    assert pl_df.loc["Tech & Gift", "margin_pct"] == pytest.approx((3000.0 - 90.0 - 400.0) / 30.0)
+
+
+def test_cost_analyzer_breakdowns(transactions):
+    costs = CostAnalyzer(transactions)
+
+    employees = costs.employee_costs().set_index("employee")
+    assert employees.loc["Kathleen Hinds", ["business", "wages", "health_insurance", "total_costs"]].tolist() == [
+        "HQ Ray", 100.0, 20.0, 120.0
+    ]
+    assert pd.isna(employees.loc["Unknown Person", "business"])
+    assert costs.supplier_costs().to_dict("records") == [
+        {"supplier": "Wholesale", "business": "HQ Ray", "spend": 40.0, "deliveries": 1}
+    ]
+    assert costs.daily_cost_matrix().loc[2, "Rent"] == 400.0
+    assert costs.shared_totals() == calculate_shared_costs(transactions)
+
+
+def test_profit_loss_from_cost_analyzer_matches():
+    df, _ = clean_big_ambitions_csv(generate_export(3000, seed=5, days=60))
+
+    expected = calculate_profit_loss(df).astype({"business": str}).sort_values("business", ignore_index=True)
+    actual = calculate_profit_loss(df, costs=CostAnalyzer(df)).astype({"business": str})
+
+    pd.testing.assert_frame_equal(actual.sort_values("business", ignore_index=True), expected)
+
+
+@pytest.mark.parametrize("granularity", ["daily", "weekly"])
+def test_aggregate_by_period_matches_per_period_pl(transactions, granularity):
+    df = pd.concat([
+        transactions,
+        transactions.assign(day=transactions["day"] + 8, price=transactions["price"] * 2),
+    ], ignore_index=True)
+    analyzer = TemporalAnalyzer(df)
+
+    result = analyzer.aggregate_by_period(granularity)
+
+    period = analyzer._assign_periods(granularity)
+    expected = []
+    for p in sorted(period.unique()):
+        pl_df = calculate_profit_loss(df[period == p], employees=analyzer.employees)
+        pl_df["period"] = p
+        expected.append(pl_df)
+    expected = pd.concat(expected, ignore_index=True).astype({"business": "category"})
+
+    pd.testing.assert_frame_equal(result.drop(columns="period_label"), expected, check_dtype=False, check_categorical=False)
+    assert result["period_label"].iloc[0] == ("Day 1" if granularity == "daily" else "Week 1 (Day 1---7)")
+
+
+@pytest.mark.parametrize("granularity", ["daily", "weekly"])
+def test_parallel_aggregate_by_period_matches_serial(granularity):
+    df, _ = clean_big_ambitions_csv(generate_export(3000, seed=8, days=40))
+    analyzer = TemporalAnalyzer(df.iloc[::-1])
+
+    expected = analyzer.aggregate_by_period(granularity)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        shared_pool = analyzer.aggregate_by_period(granularity, executor=executor)
+
+    pd.testing.assert_frame_equal(analyzer.aggregate_by_period(granularity, workers=2), expected, check_categorical=False)
+    pd.testing.assert_frame_equal(shared_pool, expected, check_categorical=False)
+
+
+def test_ledger_profit_loss_matches_full_calculation(transactions):
+    ledger = build_daily_ledger(transactions)
+
+    pd.testing.assert_frame_equal(ledger.profit_loss(), calculate_profit_loss(transactions))
+
+
+@pytest.mark.parametrize("split", [3, 8])
+def test_ledger_append_matches_single_ledger(transactions, split):
+    # Lo split a riga 8 divide il giorno 2 tra i due ledger
+    first = build_daily_ledger(transactions.iloc[:split])
+    second = build_daily_ledger(transactions.iloc[split:])
+
+    ledger = first.append(second)
+
+    pd.testing.assert_frame_equal(ledger.profit_loss(), calculate_profit_loss(transactions))
+
+
+def test_range_index_full_range_matches_profit_loss(transactions):
+    index = DayRangeIndex.from_transactions(transactions)
+
+    pd.testing.assert_frame_equal(index.profit_loss(-100, 100), calculate_profit_loss(transactions))
+
+
+def test_range_index_partial_ranges(transactions):
+    index = DayRangeIndex.from_transactions(transactions)
+
+    day_one = index.profit_loss(1, 1).set_index("business")
+    assert day_one.loc["HQ Ray", "total_costs"] == 100.0
+    assert day_one.loc["Tech & Gift", "profit"] == 3000.0 - 50.0
+
+    assert index.profit_loss(2, 2).empty
+    assert index.profit_loss(5, 1).empty
+    assert index.shared_totals(2, 9).tolist() == [400.0, 200.0]
+
+
+@pytest.mark.parametrize("window", [1, "weekly", 30])
+def test_rolling_profit_matches_range_pl(window):
+    df, _ = clean_big_ambitions_csv(generate_export(3000, seed=9, days=60))
+    trends = TrendAnalyzer.from_transactions(df)
+    index = DayRangeIndex.from_transactions(df)
+    days = 7 if window == "weekly" else window
+
+    rolling = trends.rolling(window)
+
+    for day in [1, 20, 60]:
+        expected = index.profit_loss(day - days + 1, day).set_index("business")
+        expected.index = expected.index.astype(str)
+        profit = rolling["profit"].loc[day].dropna()
+        pd.testing.assert_series_equal(profit.sort_index(), expected["profit"].sort_index(), check_names=False)
+
+
+def test_growth_and_ewm(transactions):
+    trends = TrendAnalyzer.from_transactions(transactions)
+
+    growth = trends.growth("revenue")
+    assert growth.loc[2, "HQ Ray"] == -100.0
+    assert trends.ewm("revenue", span=3).loc[2, "HQ Ray"] == pytest.approx(1000.0 / 3)
+    assert list(trends.rolling_table(7).columns) == ["day", "business", "revenue", "profit", "margin_pct"]
+
+
+def test_forecast_models_recover_simple_series():
+    days = np.arange(56)[:, None]
+    line = 100 + 2.0 * days * np.array([1.0, -0.5])
+    weekly = np.tile([10.0, 0, 0, 0, 0, 0, 50.0], 8)[:, None] * np.array([1.0, 2.0])
+    horizon_days = np.arange(56, 70)[:, None]
+
+    np.testing.assert_allclose(FORECAST_MODELS["linear_trend"](line, 14), 100 + 2.0 * horizon_days * np.array([1.0, -0.5]))
+    np.testing.assert_allclose(FORECAST_MODELS["seasonal_naive"](weekly, 14), weekly[:14])
+    np.testing.assert_allclose(holt_winters(weekly + line, 14), (weekly + line)[:14] + 2.0 * 56 * np.array([1.0, -0.5]),
+                               rtol=0.05)
+
+
+def test_holt_winters_batch_matches_single_series():
+    values = np.random.default_rng(0).normal(100, 20, (60, 5))
+
+    batch = holt_winters(values, 10)
+
+    for column in range(values.shape[1]):
+        np.testing.assert_allclose(batch[:, column], holt_winters(values[:, [column]], 10)[:, 0])
+
+
+def test_forecast_on_transactions(transactions):
+    revenue = daily_revenue_matrix(transactions)
+    profit = daily_profit_matrix(transactions)
+
+    predicted = forecast(revenue, "seasonal_naive", horizon=3)
+
+    assert revenue.sum().sum() == pytest.approx(transactions.loc[transactions["type"] == "Revenue", "price"].sum())
+    assert list(profit.columns) == list(revenue.columns.astype(str))
+    assert list(predicted.index) == [revenue.index[-1] + 1, revenue.index[-1] + 2, revenue.index[-1] + 3]
+    with pytest.raises(ValueError):
+        forecast(revenue, "arima")
+
+
+def test_analysis_session_memoizes_and_invalidates(transactions):
+    session = AnalysisSession(transactions)
+    assert session.computed == []
+
+    pd.testing.assert_frame_equal(session.profit_loss, calculate_profit_loss(transactions), check_categorical=False)
+    session.profit_loss
+    weekly = session.period_profit_loss("weekly")
+
+    assert session.period_profit_loss("weekly") is weekly
+    assert set(session.computations.values()) == {1}
+    assert "ledger" not in session.computed
+    graph = session.dependency_graph()
+    assert graph["profit_loss"] == ["direct_costs", "revenue_per_business", "shared_costs"]
+    assert graph["costs"] == ["categorized", "employees"]
+
+    session.invalidate("employees")
+    assert {"costs", "profit_loss", "temporal", "period_profit_loss[weekly]"}.isdisjoint(session.computed)
+    assert {"categorized", "revenue_per_business"} <= set(session.computed)
+
+    session.df = transactions.iloc[:3]
+    assert session.computed == []
+    assert list(session.revenue_per_business.index) == ["HQ Ray", "Tech & Gift"]
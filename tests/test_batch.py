@@ -0,0 +1,75 @@
+"""
+Tests for analysis/batch.py and batch_analyze.py
+"""
+
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from analysis.batch import combine_periods, combine_profit_loss, find_exports, run_batch, save_labels
+from analysis.profit_loss import calculate_profit_loss
+from core.data_cleaner import clean_big_ambitions_csv
+from utils.synthetic_data import generate_export
+
+
+@pytest.fixture
+def saves_dir(tmp_path):
+    for seed in range(3):
+        (tmp_path / f"save_{seed}.csv").write_bytes(generate_export(400, seed=seed))
+    (tmp_path / "broken.csv").write_bytes(b"not an export")
+    (tmp_path / "notes.txt").write_text("ignored")
+    return tmp_path
+
+
+def test_find_exports(saves_dir):
+    assert [p.name for p in find_exports([str(saves_dir)])] == ["broken.csv", "save_0.csv", "save_1.csv", "save_2.csv"]
+    assert [p.name for p in find_exports([str(saves_dir / "save_*.csv"), str(saves_dir / "save_1.csv")])] == [
+        "save_0.csv", "save_1.csv", "save_2.csv"
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_matches_single_file_analysis(saves_dir, workers):
+    paths = find_exports([str(saves_dir)])
+
+    results = run_batch(paths, granularity="weekly", workers=workers)
+
+    assert [r.save for r in results] == ["broken", "save_0", "save_1", "save_2"]
+    assert results[0].error == "No valid data after cleaning"
+
+    combined = combine_profit_loss(results)
+    df, _ = clean_big_ambitions_csv((saves_dir / "save_1.csv").read_bytes())
+    expected = calculate_profit_loss(df).astype({"business": str})
+    actual = combined[combined["save"] == "save_1"].drop(columns="save").reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert results[2].periods_df["period_label"].iloc[0].startswith("Week 1")
+
+
+def test_same_named_exports_get_distinct_saves(tmp_path):
+    for seed, name in enumerate(["a", "b"]):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "Transactions.csv").write_bytes(generate_export(300, seed=seed))
+
+    results = run_batch(find_exports([str(tmp_path / "*" / "Transactions.csv")]), granularity="weekly", workers=1)
+
+    assert [r.save for r in results] == ["a/Transactions", "b/Transactions"]
+    combined = combine_profit_loss(results)
+    df, _ = clean_big_ambitions_csv((tmp_path / "b" / "Transactions.csv").read_bytes())
+    expected = calculate_profit_loss(df).astype({"business": str})
+    actual = combined[combined["save"] == "b/Transactions"].drop(columns="save").reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected)
+    assert set(combine_periods(results)["save"]) == {"a/Transactions", "b/Transactions"}
+
+
+def test_save_labels_fall_back_to_suffix(tmp_path):
+    assert save_labels([tmp_path / "x" / "save.csv", tmp_path / "x" / "save.xlsx"]) == ["save.csv", "save.xlsx"]
+    assert save_labels([tmp_path / "a.csv", tmp_path / "b.csv"]) == ["a", "b"]
+
+
+def test_analysis_modules_do_not_import_streamlit():
+    code = "import sys, analysis.batch, core.data_loader; sys.exit('streamlit' in sys.modules)"
+
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
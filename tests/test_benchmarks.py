@@ -0,0 +1,211 @@
+"""
+Performance benchmarks (pytest-benchmark) on synthetic exports
+
+Run and save the results as JSON, one file per run in .benchmarks/:
+    python -m pytest tests/test_benchmarks.py --benchmark-autosave
+Compare with earlier runs:
+    pytest-benchmark compare --group-by=name
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.forecasting import FORECAST_MODELS, forecast
+from analysis.profit_loss import calculate_profit_loss
+from analysis.revenue_analyzer import extract_business_from_revenue
+from analysis.temporal_analyzer import PERIOD_DAYS, TemporalAnalyzer
+from analysis.trends import TREND_WINDOWS, TrendAnalyzer
+from core.data_cleaner import clean_big_ambitions_csv
+from core.data_exporter import EXPORT_FORMATS, export_bytes
+from core.data_loader import clean_export
+from core.data_merger import merge_transactions
+from core.data_validator import validate_transactions
+from core.transaction_categories import description_lookup
+from utils.synthetic_data import generate_export, generate_export_lines, generate_workbook
+from visualization import charts
+
+pytest.importorskip("pytest_benchmark")
+
+# Dimensione dell'export, sovrascrivibile per run piu' pesanti
+BENCHMARK_ROWS = int(os.environ.get("BENCHMARK_ROWS", 50_000))
+
+
+@pytest.fixture(scope="module")
+def export_content():
+    return generate_export(BENCHMARK_ROWS, seed=42, n_businesses=12, n_employees=120, days=365)
+
+
+@pytest.fixture(scope="module")
+def transactions(export_content):
+    df, error = clean_big_ambitions_csv(export_content)
+    assert error is None
+    return df
+
+
+def test_clean(benchmark, export_content):
+    benchmark.group = "cleaning"
+
+    df, error = benchmark(clean_big_ambitions_csv, export_content)
+
+    assert error is None
+    assert len(df) == BENCHMARK_ROWS
+
+
+def test_clean_workbook(benchmark):
+    # Stesse righe di test_clean come .xlsx: stesso gruppo, throughput confrontabile
+    benchmark.group = "cleaning"
+    content = generate_workbook(BENCHMARK_ROWS, seed=42, n_businesses=12, n_employees=120, days=365)
+
+    df, error = benchmark(clean_export, content)
+
+    assert error is None
+    assert len(df) == BENCHMARK_ROWS
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_export(benchmark, transactions, fmt):
+    benchmark.group = "export"
+
+    content = benchmark.pedantic(export_bytes, args=({"Transactions": transactions}, fmt), rounds=1 if fmt == "xlsx" else 3)
+
+    benchmark.extra_info["bytes"] = len(content)
+    assert content
+
+
+def test_validate(benchmark, transactions):
+    # Da confrontare con test_clean: la validazione deve restare una piccola frazione
+    benchmark.group = "cleaning"
+
+    report = benchmark(validate_transactions, transactions)
+
+    assert len(report.df) == BENCHMARK_ROWS
+
+
+@pytest.fixture(scope="module")
+def overlapping_exports():
+    # 10 export da BENCHMARK_ROWS righe, ognuno sovrapposto per meta' al successivo
+    step = BENCHMARK_ROWS // 2
+    lines = generate_export_lines(step * 11, seed=42, n_businesses=12, n_employees=120, days=365)
+    return ["\n".join(lines[i * step:i * step + BENCHMARK_ROWS]).encode() for i in range(10)]
+
+
+def test_merge_exports(benchmark, overlapping_exports):
+    # File gia' puliti (in cache nell'app): solo merge e deduplicazione
+    benchmark.group = "merge"
+    frames = [clean_export(content)[0] for content in overlapping_exports]
+
+    result = benchmark(merge_transactions, frames)
+
+    assert len(result.df) == BENCHMARK_ROWS // 2 * 11
+
+
+def test_reparse_combined_exports(benchmark, overlapping_exports):
+    # Riferimento: un solo file concatenato, ripulito e deduplicato
+    benchmark.group = "merge"
+
+    df = benchmark.pedantic(lambda: clean_export(b"\n".join(overlapping_exports))[0].drop_duplicates(), rounds=3)
+
+    assert len(df) <= BENCHMARK_ROWS // 2 * 11
+
+
+def test_extract_business_from_revenue(benchmark, transactions):
+    benchmark.group = "revenue"
+
+    business_names, _, _ = benchmark(extract_business_from_revenue, transactions)
+
+    assert len(business_names) == 12
+
+
+def test_profit_loss_cold_lookup(benchmark, transactions):
+    # Tabella delle description svuotata a ogni round: primo upload
+    benchmark.group = "profit_loss"
+
+    pl_df = benchmark.pedantic(
+        calculate_profit_loss, args=(transactions,), setup=description_lookup.clear, rounds=5
+    )
+
+    assert len(pl_df) == 12
+
+
+def test_profit_loss_warm_lookup(benchmark, transactions):
+    benchmark.group = "profit_loss"
+
+    pl_df = benchmark(calculate_profit_loss, transactions)
+
+    assert len(pl_df) == 12
+
+
+@pytest.mark.parametrize("granularity", list(PERIOD_DAYS))
+def test_aggregate_by_period(benchmark, transactions, granularity):
+    benchmark.group = "temporal"
+    analyzer = TemporalAnalyzer(transactions)
+
+    result = benchmark(analyzer.aggregate_by_period, granularity)
+
+    assert result["period"].nunique() == -(-365 // PERIOD_DAYS[granularity])
+
+
+def test_aggregate_by_period_daily_parallel(benchmark, transactions):
+    benchmark.group = "temporal"
+    analyzer = TemporalAnalyzer(transactions)
+
+    with ProcessPoolExecutor() as executor:
+        result = benchmark(analyzer.aggregate_by_period, "daily", executor=executor)
+
+    assert result["period"].nunique() == 365
+
+
+@pytest.mark.parametrize("window", list(TREND_WINDOWS))
+def test_rolling_trends(benchmark, transactions, window):
+    benchmark.group = "trends"
+    trends = TrendAnalyzer.from_transactions(transactions)
+
+    rolling = benchmark(trends.rolling, window)
+
+    assert rolling["profit"].shape == (365, 12)
+
+
+@pytest.mark.parametrize("model", list(FORECAST_MODELS))
+def test_forecast_500_businesses(benchmark, model):
+    # 500 business × 1000 giorni: il tempo si legge nel report del benchmark
+    benchmark.group = "forecasting"
+    days = np.arange(1000)[:, None]
+    rng = np.random.default_rng(42)
+    revenue = pd.DataFrame(1000 + days * rng.uniform(0, 5, 500) + rng.normal(0, 50, (1000, 500)))
+
+    predicted = benchmark(forecast, revenue, model, 30)
+
+    assert predicted.shape == (30, 500)
+
+
+@pytest.mark.parametrize("n_businesses, n_days", [(10, 365), (1_000, 100_000)])
+def test_pl_charts(benchmark, n_businesses, n_days):
+    # Build time e payload non devono crescere con business e giorni
+    benchmark.group = "charts"
+    rng = np.random.default_rng(0)
+    pl = pd.DataFrame({
+        "business": [f"Business {i}" for i in range(n_businesses)],
+        **{field: rng.uniform(0, 1_000, n_businesses) for field in
+           ["revenue", "profit", "margin_pct", "wages", "shared_revenue_based", "marketing", "health_insurance",
+            "hr_training", "total_direct_costs", "total_shared_costs", "total_costs"]},
+    })
+    daily = pd.DataFrame({column: rng.normal(size=n_days).cumsum() for column in ["revenue", "profit", "balance"]},
+                         index=pd.RangeIndex(1, n_days + 1, name="day"))
+
+    def build():
+        return [
+            charts.bar_chart(pl, "business", "profit", "Profit"),
+            charts.cost_breakdown_chart(pl),
+            charts.waterfall_chart(pl),
+            charts.time_series_chart(daily, "Daily"),
+        ]
+
+    figures = benchmark(build)
+
+    payload = sum(charts.figure_payload_bytes(fig) for fig in figures)
+    benchmark.extra_info["payload_bytes"] = payload
+    assert payload < 250_000
@@ -0,0 +1,105 @@
+"""
+Tests for visualization/charts.py
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from visualization.charts import (
+    MAX_BARS,
+    MAX_POINTS,
+    bar_chart,
+    cost_breakdown_chart,
+    downsample,
+    figure_payload_bytes,
+    time_series_chart,
+    waterfall_chart,
+)
+
+
+def make_pl(n_businesses: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    revenue = rng.uniform(1_000, 100_000, n_businesses)
+    direct = revenue * rng.uniform(0.2, 0.9, n_businesses)
+    shared = revenue * 0.1
+
+    pl = pd.DataFrame({
+        "business": [f"Business {i}" for i in range(n_businesses)],
+        "revenue": revenue,
+        "wages": direct * 0.5,
+        "marketing": direct * 0.2,
+        "health_insurance": direct * 0.2,
+        "hr_training": direct * 0.1,
+        "shared_revenue_based": shared,
+        "total_direct_costs": direct,
+        "total_shared_costs": shared,
+        "total_costs": direct + shared,
+    })
+    pl["profit"] = pl["revenue"] - pl["total_costs"]
+    pl["margin_pct"] = pl["profit"] / pl["revenue"] * 100
+    return pl
+
+
+def make_daily(n_days: int) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {column: rng.normal(size=n_days).cumsum() for column in ["revenue", "profit", "balance"]},
+        index=pd.RangeIndex(1, n_days + 1, name="day"),
+    )
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_keeps_endpoints_and_spikes(method):
+    values = np.zeros(10_000)
+    values[5_000], values[7_777] = 100.0, -50.0
+
+    points = downsample(pd.Series(values), max_points=100, method=method)
+
+    assert len(points) <= 100
+    assert points.index[0] == 0 and points.index[-1] == 9_999
+    assert points.max() == 100.0 and points.min() == -50.0
+    assert points.index.is_monotonic_increasing
+
+
+def test_short_series_is_not_downsampled():
+    series = pd.Series([1.0, 2.0, np.nan, 4.0])
+
+    assert downsample(series).tolist() == [1.0, 2.0, 4.0]
+    with pytest.raises(ValueError):
+        downsample(series, method="random")
+
+
+def test_time_series_payload_is_bounded():
+    small = time_series_chart(make_daily(500), "Daily")
+    large = time_series_chart(make_daily(500_000), "Daily")
+
+    assert all(isinstance(trace, go.Scattergl) and len(trace.x) <= MAX_POINTS for trace in large.data)
+    assert isinstance(small.data[0], go.Scatter)
+    assert figure_payload_bytes(large) < 2 * figure_payload_bytes(time_series_chart(make_daily(MAX_POINTS), "Daily"))
+
+
+def test_waterfall_is_one_trace_whatever_the_businesses():
+    small, large = make_pl(5), make_pl(1_000)
+
+    fig = waterfall_chart(large, "Business 42")
+    row = large.iloc[42]
+
+    assert len(fig.data) == 1
+    assert list(fig.data[0].y) == pytest.approx([row["revenue"], -row["total_direct_costs"],
+                                                 -row["total_shared_costs"], row["profit"]])
+    assert figure_payload_bytes(fig) < 1.1 * figure_payload_bytes(waterfall_chart(small))
+
+
+def test_bar_charts_show_top_businesses():
+    pl = make_pl(500)
+
+    fig = bar_chart(pl, "business", "profit", "Profit")
+    costs = cost_breakdown_chart(pl)
+
+    assert len(fig.data[0].x) == MAX_BARS
+    assert set(fig.data[0].x) == set(pl.loc[pl["profit"].abs().nlargest(MAX_BARS).index, "business"])
+    assert "top 40 of 500" in fig.layout.title.text
+    assert all(len(trace.x) == MAX_BARS for trace in costs.data)
+    assert len(bar_chart(make_pl(5), "business", "profit", "Profit").data[0].x) == 5
@@ -1,7 +1,98 @@
 """
-test_cleaner module
-TODO: Implement functionality
+Tests for core/data_cleaner.py
 """
 
-# Implementation goes here
-pass
+import io
+
+import pandas as pd
+import pytest
+
+from core.data_cleaner import apply_transaction_schema, clean_big_ambitions_csv, iter_clean_chunks
+from utils.constants import TRANSACTION_DTYPES
+from utils.synthetic_data import generate_export
+
+
+REAL_SAMPLE = b'''"Tax Payment,""180"",""Tax Payment"",""-284156.2"",""2049546"""\r
+"Taxi Ride,""180"",""Taxi Ride"",""-32.77972"",""2333702"""\r
+"Silver Health Insurance (Joseph Halliday) - 10 Employees,""179"",""Health Insurance"",""-128.3533"",""2333735"""\r
+"Kathleen Hinds (HQ Ray Daily Wage),""179"",""Wage"",""-325.8668"",""2134567"""'''
+
+
+def test_real_sample():
+    df, error = clean_big_ambitions_csv(REAL_SAMPLE)
+
+    assert error is None
+    assert list(df.columns) == ["description", "day", "type", "price", "balance"]
+    assert len(df) == 4
+    assert df["description"].iloc[2] == "Silver Health Insurance (Joseph Halliday) - 10 Employees"
+    assert df["day"].iloc[0] == 180
+    assert df["price"].iloc[3] == -325.8668
+
+
+@pytest.mark.parametrize("content", [
+    REAL_SAMPLE,
+    generate_export(2000, seed=7),
+    # Righe senza wrapper esterno
+    b'Tax Payment,"180","Tax Payment","-284156.2","2049546"\nSimple,"100","Type","-50","500"',
+    # Formati misti, header, righe vuote e valori non numerici
+    REAL_SAMPLE + b'\r\n\r\nDescription,Day,Type,Price,Balance\r\n"Bad,""x"",""Wage"",""-1"",""2"""',
+    # Apici nella description e balance vuoto
+    b'"Joe ""The"" Shop Revenue,""5"",""Revenue"",""10"",""20"""\n"Rent,""5"",""Rent"",""-10"","""""',
+])
+def test_fast_engine_matches_legacy(content):
+    fast_df, fast_error = clean_big_ambitions_csv(content, engine="fast")
+    legacy_df, legacy_error = clean_big_ambitions_csv(content, engine="legacy")
+
+    assert fast_error == legacy_error
+    pd.testing.assert_frame_equal(fast_df, legacy_df, check_exact=True)
+
+
+def test_compact_schema():
+    df, _ = clean_big_ambitions_csv(generate_export(300, seed=2))
+
+    assert df.dtypes.astype(str).to_dict() == TRANSACTION_DTYPES
+
+
+def test_description_with_embedded_comma():
+    content = b'"Silver Health Insurance (John, Doe),""179"",""Health Insurance"",""-128.35"",""1000"""'
+
+    df, error = clean_big_ambitions_csv(content)
+
+    assert error is None
+    assert df["description"].tolist() == ["Silver Health Insurance (John, Doe)"]
+    assert df["price"].tolist() == [-128.35]
+
+
+def test_empty_content():
+    df, error = clean_big_ambitions_csv(b"  \r\n")
+
+    assert df is None
+    assert error == "No valid data after cleaning"
+
+
+def test_unknown_engine():
+    df, error = clean_big_ambitions_csv(REAL_SAMPLE, engine="turbo")
+
+    assert df is None
+    assert "Unknown engine" in error
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 500, 100_000])
+def test_chunks_concatenate_to_full_frame(chunk_rows):
+    content = REAL_SAMPLE + b"\r\nnot a row\r\n" + generate_export(300, seed=3)
+    full_df, _ = clean_big_ambitions_csv(content)
+
+    chunks = list(iter_clean_chunks(io.BytesIO(content), chunk_rows=chunk_rows))
+
+    assert all(len(chunk) <= chunk_rows for chunk in chunks)
+    pd.testing.assert_frame_equal(apply_transaction_schema(pd.concat(chunks)), full_df, check_exact=True)
+
+
+def test_chunks_from_path(tmp_path):
+    path = tmp_path / "Transactions.csv"
+    path.write_bytes(REAL_SAMPLE)
+
+    chunks = list(iter_clean_chunks(path, chunk_rows=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    assert chunks[1].index.tolist() == [2, 3]
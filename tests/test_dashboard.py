@@ -0,0 +1,75 @@
+"""
+Tests for visualization/dashboard.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualization.dashboard import TableView
+
+
+@pytest.fixture
+def table():
+    df = pd.DataFrame({
+        "description": pd.Categorical(["b", "a", None, "c", "a", "b"], categories=["c", "b", "a"]),
+        "day": np.array([3, 1, 2, 2, 5, 4], dtype=np.int32),
+        "type": pd.Categorical(["Wage", "Revenue", "Wage", "Rent", "Revenue", "Wage"]),
+        "price": [-10.0, 50.0, np.nan, -30.0, 20.0, -10.0],
+    }, index=range(10, 16))
+    return df, TableView(df)
+
+
+def test_filter_matches_boolean_indexing(table):
+    df, view = table
+
+    positions = view.filter(["Wage", "Unknown"], (2, 4))
+    expected = df[df["type"].isin(["Wage"]) & df["day"].between(2, 4)]
+
+    assert view.page(positions, page_size=10).equals(expected)
+    assert len(view.filter()) == len(df)
+    assert view.types() == ["Rent", "Revenue", "Wage"]
+
+
+@pytest.mark.parametrize("column", ["description", "day", "price"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sort_matches_pandas(table, column, ascending):
+    df, view = table
+    subset = view.filter(day_range=(2, 5))
+
+    rows = view.page(view.sort(subset, column, ascending), page_size=10)
+    expected = df.iloc[subset].astype({"description": str}).sort_values(column, ascending=ascending,
+                                                                         na_position="last")
+
+    assert rows[column].astype(str).tolist() == expected[column].astype(str).tolist()
+    assert rows[column].isna().tolist()[-1] == expected[column].isna().any()
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sort_keeps_file_order_within_ties(ascending):
+    df = pd.DataFrame({
+        "price": [1.0, 5.0, 5.0, 2.0, np.nan, 2.0],
+        "type": pd.Categorical(["Wage", "Rent", "Wage", "Rent", "Wage", "Rent"]),
+    })
+    view = TableView(df)
+
+    for column in df.columns:
+        positions = view.sort(view.filter(), column, ascending)
+        expected = df.sort_values(column, ascending=ascending, kind="stable", na_position="last")
+
+        assert positions.tolist() == expected.index.tolist()
+
+    if not ascending:
+        assert view.sort(np.arange(4), "price", False).tolist() == [1, 2, 3, 0]
+
+
+def test_pages_and_memoized_selection(table):
+    df, view = table
+
+    positions = view.select(sort_by="day")
+
+    assert view.page_count(positions, page_size=4) == 2
+    assert view.page(positions, page=1, page_size=4)["day"].tolist() == [4, 5]
+    assert view.page(positions, page=99, page_size=4)["day"].tolist() == [4, 5]
+    assert view.select(sort_by="day") is positions
+    assert view.page(view.select(types=[]), page=0).empty
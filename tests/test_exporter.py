@@ -0,0 +1,64 @@
+"""
+Tests for core/data_exporter.py
+"""
+
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import data_exporter
+from core.data_exporter import export_bytes, iter_csv_chunks, write_csv
+from core.data_loader import clean_export
+from utils.synthetic_data import generate_export
+
+
+@pytest.fixture(scope="module")
+def transactions():
+    df, error = clean_export(generate_export(2_000, seed=3))
+    assert error is None
+    return df
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_chunked_csv_matches_to_csv(transactions, tmp_path, compress):
+    path = tmp_path / "export.csv"
+    write_csv(transactions, path, compress=compress, chunk_rows=300)
+
+    content = path.read_bytes()
+    if compress:
+        content = gzip.decompress(content)
+
+    assert content == transactions.to_csv(index=False).encode("utf-8")
+    assert len(list(iter_csv_chunks(transactions, chunk_rows=300))) == 7
+
+
+def test_parquet_round_trip(transactions):
+    pytest.importorskip("pyarrow")
+
+    back = pd.read_parquet(io.BytesIO(export_bytes({"Transactions": transactions}, "parquet", chunk_rows=300)))
+
+    pd.testing.assert_frame_equal(back, transactions.reset_index(drop=True), check_categorical=False)
+    assert isinstance(back["type"].dtype, pd.CategoricalDtype)
+
+
+def test_excel_report_sheets(transactions, monkeypatch):
+    pytest.importorskip("openpyxl")
+    monkeypatch.setattr(data_exporter, "EXCEL_MAX_ROWS", 1_500)
+
+    pl = pd.DataFrame({"business": ["Shop", "Bar"], "profit": [10.5, np.nan]})
+    content = export_bytes({"Transactions": transactions, "P&L": pl}, "xlsx", chunk_rows=400)
+    sheets = pd.read_excel(io.BytesIO(content), sheet_name=None)
+
+    assert list(sheets) == ["Transactions", "Transactions (2)", "P&L"]
+    rows = pd.concat([sheets["Transactions"], sheets["Transactions (2)"]], ignore_index=True)
+    assert rows["price"].tolist() == pytest.approx(transactions["price"].tolist())
+    assert rows["description"].tolist() == transactions["description"].astype(str).tolist()
+    assert sheets["P&L"]["profit"].isna().tolist() == [False, True]
+
+
+def test_unknown_format(transactions):
+    with pytest.raises(ValueError):
+        export_bytes({"Transactions": transactions}, "json")
@@ -0,0 +1,311 @@
+"""
+Tests for core/data_loader.py
+"""
+
+import io
+import os
+import zipfile
+from xml.sax.saxutils import escape
+
+import pandas as pd
+import pytest
+
+import core.data_loader as data_loader
+from core.data_cleaner import clean_big_ambitions_csv
+from analysis.profit_loss import calculate_profit_loss
+from core.data_loader import IncrementalLoader, clean_export, iter_clean_workbook_chunks, load_transactions
+from utils.synthetic_data import generate_export, generate_export_lines, generate_export_rows, generate_workbook
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def export_path(tmp_path):
+    path = tmp_path / "Transactions.csv"
+    path.write_bytes(generate_export(500, seed=1))
+    return path
+
+
+def count_parses(monkeypatch):
+    calls = []
+
+    def counting_cleaner(content, **kwargs):
+        calls.append(len(content))
+        return clean_big_ambitions_csv(content, **kwargs)
+
+    monkeypatch.setattr(data_loader, "clean_big_ambitions_csv", counting_cleaner)
+    return calls
+
+
+def test_first_load_writes_cache(export_path):
+    df, error = load_transactions(export_path)
+
+    assert error is None
+    assert (export_path.parent / "Transactions.csv.feather").exists()
+    assert (export_path.parent / "Transactions.csv.fingerprint.json").exists()
+    assert df["type"].dtype == "category"
+    assert df["description"].dtype == "category"
+
+
+def test_cached_load_matches_parse(export_path, monkeypatch):
+    first, _ = load_transactions(export_path)
+    calls = count_parses(monkeypatch)
+
+    cached, error = load_transactions(export_path)
+
+    assert error is None
+    assert calls == []
+    pd.testing.assert_frame_equal(cached, first)
+
+    expected, _ = clean_big_ambitions_csv(export_path.read_bytes())
+    assert cached["price"].tolist() == expected["price"].tolist()
+
+
+def test_touched_file_keeps_cache(export_path, monkeypatch):
+    load_transactions(export_path)
+    stat = os.stat(export_path)
+    os.utime(export_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    calls = count_parses(monkeypatch)
+
+    load_transactions(export_path)
+
+    assert calls == []
+
+
+def test_changed_file_rebuilds_cache(export_path, monkeypatch):
+    load_transactions(export_path)
+    export_path.write_bytes(generate_export(600, seed=2))
+    calls = count_parses(monkeypatch)
+
+    df, _ = load_transactions(export_path)
+
+    assert len(calls) == 1
+    assert len(df) == 600
+
+
+def test_missing_file(tmp_path):
+    df, error = load_transactions(tmp_path / "missing.csv")
+
+    assert df is None
+    assert "File not found" in error
+
+
+def write_lines(path, lines):
+    path.write_bytes("\r\n".join(lines).encode("utf-8"))
+
+
+def assert_matches_full_parse(loader, path):
+    expected, _ = clean_big_ambitions_csv(path.read_bytes())
+
+    pd.testing.assert_frame_equal(loader.profit_loss(), calculate_profit_loss(expected))
+    assert loader.transactions()["price"].tolist() == expected["price"].tolist()
+
+
+def test_incremental_parses_only_appended_rows(tmp_path, monkeypatch):
+    path = tmp_path / "Transactions.csv"
+    lines = generate_export_lines(900, seed=4)
+    write_lines(path, lines[:600])
+    IncrementalLoader(path, window=1024).refresh()
+
+    write_lines(path, lines)
+    loader = IncrementalLoader(path, window=1024)
+    calls = count_parses(monkeypatch)
+    stats, error = loader.refresh()
+
+    assert error is None
+    assert calls == []
+    assert stats["mode"] == "appended"
+    assert stats["new_rows"] == 300
+    assert stats["rows"] == 900
+    assert_matches_full_parse(loader, path)
+
+    stats, _ = loader.refresh()
+    assert stats["mode"] == "unchanged"
+
+
+def test_incremental_prepended_rows(tmp_path):
+    path = tmp_path / "Transactions.csv"
+    lines = generate_export_lines(500, seed=5)
+    write_lines(path, lines[100:])
+    loader = IncrementalLoader(path, window=1024)
+    loader.refresh()
+
+    write_lines(path, lines)
+    stats, error = loader.refresh()
+
+    assert error is None
+    assert stats["mode"] == "prepended"
+    assert stats["new_rows"] == 100
+    assert_matches_full_parse(loader, path)
+
+
+def test_incremental_rewritten_file_rebuilds(tmp_path):
+    path = tmp_path / "Transactions.csv"
+    lines = generate_export_lines(400, seed=6)
+    write_lines(path, lines)
+    loader = IncrementalLoader(path, window=1024)
+    loader.refresh()
+
+    write_lines(path, lines[:200] + generate_export_lines(300, seed=7))
+    stats, error = loader.refresh()
+
+    assert error is None
+    assert stats["mode"] == "rebuild"
+    assert stats["rows"] == 500
+    assert_matches_full_parse(loader, path)
+
+
+def test_incremental_edit_in_the_middle_rebuilds(tmp_path):
+    path = tmp_path / "Transactions.csv"
+    lines = generate_export_lines(600, seed=8)
+    write_lines(path, lines[:500])
+    loader = IncrementalLoader(path, window=1024)
+    loader.refresh()
+
+    # Riga modificata a meta' file, stessa lunghezza (inizio e fine del prefisso invariati), poi righe aggiunte
+    edited = list(lines)
+    description = edited[250].split(",")[0]
+    edited[250] = edited[250].replace(description, "X" * len(description), 1)
+    write_lines(path, edited)
+    stats, error = loader.refresh()
+
+    assert error is None
+    assert stats["mode"] == "rebuild"
+    assert_matches_full_parse(loader, path)
+    assert "X" * len(description) in set(loader.transactions()["description"].astype(str))
+
+
+def test_incremental_rejects_workbooks(tmp_path):
+    path = tmp_path / "Transactions.xlsx"
+    path.write_bytes(b"PK\x03\x04" + b"\0" * 100)
+
+    stats, error = IncrementalLoader(path).refresh()
+
+    assert stats is None
+    assert "CSV exports only" in error
+
+
+# === Workbook (XLSX/XLSM) ===
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def excel_workbook(rows) -> bytes:
+    """Minimal workbook laid out as Excel saves it: shared strings, styled cells, dimension."""
+    strings = {}
+
+    def cell(ref, value):
+        if isinstance(value, str):
+            return f'<c r="{ref}" s="1" t="s"><v>{strings.setdefault(value, len(strings))}</v></c>'
+        return f'<c r="{ref}" s="2"><v>{value}</v></c>'
+
+    sheet_rows = "".join(
+        f'<row r="{r}">' + "".join(cell(f"{'ABCDE'[c]}{r}", value) for c, value in enumerate(row)) + "</row>"
+        for r, row in enumerate(rows, start=1)
+    )
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '</Types>'
+        ),
+        "_rels/.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIPS_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        "xl/workbook.xml": (
+            f'<workbook xmlns="{SPREADSHEET_NS}" xmlns:r="{RELATIONSHIPS_NS}">'
+            '<sheets><sheet name="Transactions" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{RELATIONSHIPS_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{RELATIONSHIPS_NS}/sharedStrings" Target="sharedStrings.xml"/>'
+            '</Relationships>'
+        ),
+        "xl/worksheets/sheet1.xml": (
+            f'<worksheet xmlns="{SPREADSHEET_NS}"><dimension ref="A1:E{len(rows)}"/>'
+            f'<sheetData>{sheet_rows}</sheetData></worksheet>'
+        ),
+        "xl/sharedStrings.xml": (
+            f'<sst xmlns="{SPREADSHEET_NS}" count="{len(strings)}" uniqueCount="{len(strings)}">'
+            + "".join(f"<si><t>{escape(text)}</t></si>" for text in strings) + "</sst>"
+        ),
+    }
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in parts.items():
+            archive.writestr(name, xml)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def csv_transactions():
+    df, error = clean_big_ambitions_csv(generate_export(2000, seed=3, days=30))
+    assert error is None
+    return df
+
+
+@pytest.mark.parametrize("header", [True, False])
+def test_workbook_matches_csv(csv_transactions, header):
+    df, error = clean_export(generate_workbook(2000, seed=3, header=header, days=30))
+
+    assert error is None
+    pd.testing.assert_frame_equal(df, csv_transactions)
+
+
+def test_excel_shared_strings_workbook(csv_transactions):
+    rows = [("Description", "Day", "Type", "Price", "Balance")] + generate_export_rows(2000, seed=3, days=30)
+
+    df, error = clean_export(excel_workbook(rows))
+
+    assert error is None
+    pd.testing.assert_frame_equal(df, csv_transactions)
+
+
+def test_workbook_falls_back_to_openpyxl(csv_transactions, monkeypatch):
+    # Blocchi piccoli; dal terzo il lettore bulk "non riconosce" il layout
+    monkeypatch.setattr(data_loader, "WORKBOOK_READ_BYTES", 16_384)
+    read_block = data_loader._read_sheet_block
+    calls = []
+
+    def rejecting_reader(*args):
+        calls.append(1)
+        return None if len(calls) >= 3 else read_block(*args)
+
+    monkeypatch.setattr(data_loader, "_read_sheet_block", rejecting_reader)
+    content = generate_workbook(2000, seed=3, days=30)
+
+    chunks = list(iter_clean_workbook_chunks(io.BytesIO(content), chunk_rows=300))
+    df, error = clean_export(content)
+
+    assert len(chunks) > 2
+    assert error is None
+    pd.testing.assert_frame_equal(df, csv_transactions)
+    pd.testing.assert_frame_equal(data_loader.apply_transaction_schema(pd.concat(chunks)), csv_transactions)
+
+
+def test_load_transactions_reads_workbook(tmp_path, csv_transactions):
+    path = tmp_path / "Transactions.xlsx"
+    path.write_bytes(generate_workbook(2000, seed=3, days=30))
+
+    first, error = load_transactions(path)
+    cached, _ = load_transactions(path)
+
+    assert error is None
+    pd.testing.assert_frame_equal(first, csv_transactions)
+    pd.testing.assert_frame_equal(cached, first)
+
+
+def test_broken_workbook_returns_error():
+    df, error = clean_export(b"PK\x03\x04 not really a zip")
+
+    assert df is None
+    assert error.startswith("Cleaning error")
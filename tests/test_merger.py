@@ -0,0 +1,74 @@
+"""
+Tests for core/data_merger.py
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from core.data_loader import clean_export
+from core.data_merger import merge_exports, merge_transactions, parse_exports
+from utils.synthetic_data import generate_export_lines
+
+
+@pytest.fixture(scope="module")
+def lines():
+    return generate_export_lines(5_000, seed=11)
+
+
+def export(lines) -> bytes:
+    return "\n".join(lines).encode("utf-8")
+
+
+def test_overlapping_exports_merge_into_the_full_timeline(lines):
+    full, _ = clean_export(export(lines))
+    # Finestre sovrapposte, una esportata dal piu' recente, in ordine sparso
+    contents = [export(lines[2_000:4_500][::-1]), export(lines[:3_000]), export(lines[4_000:])]
+
+    result, error = merge_exports(contents)
+
+    assert error is None
+    pd.testing.assert_frame_equal(result.df, full.reset_index(drop=True), check_categorical=False)
+    assert result.rows_per_export == [2_500, 3_000, 1_000]
+    assert result.duplicates == 2_500 + 3_000 + 1_000 - 5_000
+
+
+def test_repeated_rows_are_kept_as_often_as_one_export_has_them(lines):
+    repeated = lines[:10] + [lines[9]] + lines[10:20]
+    first, _ = clean_export(export(repeated))
+    second, _ = clean_export(export(repeated[5:]))
+
+    merged = merge_transactions([first, second])
+
+    assert len(merged.df) == len(repeated)
+    assert merged.duplicates == len(repeated) - 5
+    assert merged.df.duplicated().sum() == 1
+
+
+def test_parse_exports_on_a_pool_matches_in_process(lines):
+    contents = [export(lines[:1_000]), export(lines[1_000:2_000])]
+
+    pooled = parse_exports(contents, workers=2)
+    local = parse_exports(contents, workers=1)
+
+    for (pooled_df, _), (local_df, _) in zip(pooled, local):
+        pd.testing.assert_frame_equal(pooled_df, local_df)
+
+
+def test_parse_exports_reuses_a_given_pool(lines):
+    contents = [export(lines[:500]), export(lines[500:1_000])]
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        first = parse_exports(contents, executor=executor)
+        second = parse_exports(contents[::-1], executor=executor)
+
+    pd.testing.assert_frame_equal(first[0][0], second[1][0])
+    pd.testing.assert_frame_equal(first[0][0], parse_exports(contents[:1])[0][0])
+
+
+def test_merge_exports_names_the_broken_export(lines):
+    result, error = merge_exports([export(lines[:100]), b"not an export"], workers=1)
+
+    assert result is None
+    assert error.startswith("Export 2:")
@@ -0,0 +1,176 @@
+"""
+Tests for utils/
+"""
+
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from core.data_cleaner import clean_big_ambitions_csv
+from core.transaction_categories import categorize_transactions
+from utils.cache import ResultCache, content_hash, make_key
+from utils.helpers import StageProfiler, map_categories
+from utils.synthetic_data import generate_export, generate_export_lines
+
+
+def test_content_hash_is_stable():
+    assert content_hash(b"abc") == content_hash(b"abc")
+    assert content_hash(b"abc") != content_hash(b"abd")
+
+
+def test_make_key_ignores_param_order():
+    assert make_key("h", a=1, b=2) == make_key("h", b=2, a=1)
+    assert make_key("h", a=1) != make_key("h", a=2)
+
+
+def test_result_cache_hits_and_misses():
+    cache = ResultCache(max_entries=2)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_compute("k", compute) == "value"
+    assert cache.get_or_compute("k", compute) == "value"
+
+    assert len(calls) == 1
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("c", lambda: 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats["evictions"] == 1
+    assert len(cache) == 2
+
+
+def test_result_cache_reserved_restores_the_limit():
+    cache = ResultCache(max_entries=2)
+
+    # Merge di 5 file: tutti restano in cache finche' dura il calcolo
+    with cache.reserved(5, limit=10) as entries:
+        for i in range(5):
+            cache.get_or_compute(i, lambda: i)
+        assert entries == 5
+        assert len(cache) == 5 and cache.evictions == 0
+
+    assert cache.max_entries == 2
+    assert len(cache) == 2 and 4 in cache and 3 in cache
+
+    # Richiesta oltre il massimo configurato; prenotazioni annidate
+    with cache.reserved(50, limit=4) as entries:
+        with cache.reserved(3):
+            assert cache.max_entries == 4
+        assert entries == 4 and cache.max_entries == 4
+    assert cache.max_entries == 2
+
+
+def test_result_cache_rejects_zero_size():
+    with pytest.raises(ValueError):
+        ResultCache(max_entries=0)
+
+
+def test_map_categories_runs_once_per_category():
+    values = pd.Series(["HQ Ray Revenue", None, "G&J Revenue", "HQ Ray Revenue"], index=[5, 6, 7, 8])
+    calls = []
+
+    def strip_suffix(series):
+        calls.append(len(series))
+        return series.str.replace(" Revenue", "")
+
+    result = map_categories(values.astype("category"), strip_suffix)
+
+    assert calls == [2]
+    assert result.dtype == "category"
+    assert result.index.tolist() == [5, 6, 7, 8]
+    assert result.astype(object).where(result.notna(), None).tolist() == ["HQ Ray", None, "G&J", "HQ Ray"]
+
+
+def test_synthetic_export_is_deterministic_and_tunable():
+    assert generate_export_lines(200, seed=1) == generate_export_lines(200, seed=1)
+
+    df, error = clean_big_ambitions_csv(generate_export(5000, seed=1, n_businesses=9, n_employees=40, days=30))
+    categorized = categorize_transactions(df)
+
+    assert error is None
+    assert len(df) == 5000
+    assert (df["day"].min(), df["day"].max()) == (1, 30)
+    assert categorized["business"].nunique() == 9
+    assert set(categorized["category"]) == {
+        "revenue", "direct_cost", "shared_revenue_based", "shared_equal_split", "personal"
+    }
+
+
+def test_stage_profiler_records_nested_stages():
+    profiler = StageProfiler()
+
+    # Disattivo: nessun record, la funzione decorata funziona uguale
+    @profiler.timed("double", rows=len)
+    def double(values):
+        return values * 2
+
+    with profiler.stage("ignored"):
+        assert double([1]) == [1, 1]
+    assert profiler.records == []
+
+    profiler.enable(track_memory=True)
+    try:
+        with profiler.stage("outer", rows=10) as outer:
+            double([1, 2])
+            double([3])
+            outer.rows = 20
+    finally:
+        profiler.disable()
+
+    assert [record["stage"] for record in profiler.records] == ["double", "double", "outer"]
+    assert [record["depth"] for record in profiler.records] == [1, 1, 0]
+
+    summary = profiler.summary().set_index("stage")
+    assert list(summary.columns) == ["calls", "total_s", "mean_ms", "rows", "peak_mb"]
+    assert summary.loc["double", "calls"] == 2
+    assert summary.loc["double", "rows"] == 6
+    assert summary.loc["outer", "rows"] == 20
+    assert summary.loc["outer", "total_s"] >= summary.loc["double", "total_s"]
+
+    exported = json.loads(profiler.to_json())
+    assert len(exported["records"]) == 3
+    assert exported["summary"][0]["stage"] == "double"
+
+    profiler.reset()
+    assert profiler.summary().empty
+
+
+def test_installed_profiler_receives_stages_of_its_thread():
+    shared = StageProfiler()
+    sessions = [StageProfiler(), StageProfiler()]
+    sessions[0].enable()
+
+    def run(session_profiler, name):
+        with session_profiler.installed():
+            with shared.stage(name):
+                pass
+
+    threads = [threading.Thread(target=run, args=(p, f"stage_{i}")) for i, p in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Solo la sessione attiva registra, e solo i propri stage; il profiler condiviso resta spento
+    assert [record["stage"] for record in sessions[0].records] == ["stage_0"]
+    assert sessions[1].records == [] and shared.records == []
+
+    with shared.stage("outside"):
+        pass
+    assert len(sessions[0].records) == 1
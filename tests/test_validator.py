@@ -0,0 +1,109 @@
+"""
+Tests for core/data_validator.py
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data_validator import (
+    BALANCE_GAP,
+    DAY_ORDER,
+    DAY_OUT_OF_RANGE,
+    validate_export,
+    validate_transactions,
+)
+from utils.synthetic_data import generate_export_lines, generate_export_rows
+
+
+@pytest.fixture(scope="module")
+def lines():
+    return generate_export_lines(3_000, seed=5)
+
+
+def export(lines) -> bytes:
+    return "\n".join(lines).encode("utf-8")
+
+
+@pytest.mark.parametrize("newest_first", [False, True])
+def test_synthetic_export_is_clean(lines, newest_first):
+    report, error = validate_export(export(lines[::-1] if newest_first else lines))
+
+    assert error is None
+    assert report.is_clean
+    assert report.newest_first == newest_first
+    assert report.summary() == {"valid_rows": len(lines)}
+
+
+def test_dropped_rows_leave_a_balance_gap(lines):
+    rows = generate_export_rows(3_000, seed=5)
+    kept = lines[:1_000] + lines[1_004:]
+
+    report, _ = validate_export(export(kept))
+
+    assert report.issues["reason"].tolist() == [BALANCE_GAP]
+    assert report.issues["row"].tolist() == [1_000]
+    missing = sum(row[3] for row in rows[1_000:1_004])
+    assert report.missing_amount() == pytest.approx(missing, abs=1.0)
+
+
+def test_rejected_lines_go_to_quarantine(lines):
+    bad = list(lines)
+    bad[20] = bad[20].replace(',""', ',""day', 1)
+    bad.insert(30, "not an export line")
+
+    report, _ = validate_export(export(bad))
+    quarantine = report.quarantine.set_index("row")["reason"]
+
+    # row: indice della riga (o della successiva, per le righe non parsabili)
+    assert quarantine.to_dict() == {20: "invalid_day", 30: "malformed_line"}
+    assert "not an export line" in report.quarantine["raw"].tolist()
+    assert len(report.df) + len(report.quarantine) == len(bad)
+
+
+def test_out_of_range_values_and_day_order():
+    df = pd.DataFrame({
+        "description": ["a", "b", "c", "d", "e"],
+        "day": np.array([1, 2, -4, 1, 3], dtype=np.int32),
+        "type": ["Rent"] * 5,
+        "price": [-10.0, -10.0, -10.0, -10.0, np.inf],
+        "balance": [90.0, 80.0, 70.0, 70.0, 60.0],
+    })
+
+    report = validate_transactions(df)
+
+    assert report.quarantine["row"].tolist() == [2, 4]
+    assert report.quarantine["reason"].tolist() == [DAY_OUT_OF_RANGE, "price_out_of_range"]
+    assert report.df.index.tolist() == [0, 1, 3]
+    assert report.issues.set_index("row")["reason"].to_dict() == {3: DAY_ORDER}
+
+
+def test_incomplete_workbook_rows_are_quarantined():
+    openpyxl = pytest.importorskip("openpyxl")
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Transactions"
+    sheet.append(["Description", "Day", "Type", "Price", "Balance"])
+    for row in generate_export_rows(20, seed=2):
+        sheet.append(list(row))
+    sheet.append(["Taxi Ride", 3, "Taxi Ride", -12.0, None])
+    sheet.append([None] * 5)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    report, error = validate_export(buffer.getvalue())
+
+    assert error is None
+    assert report.quarantine["reason"].tolist() == ["malformed_line"]
+    assert report.quarantine["description"].tolist() == ["Taxi Ride"]
+    assert len(report.df) == 20
+
+
+def test_invalid_export_returns_error():
+    report, error = validate_export(b"nothing to see here\n")
+
+    assert report is None
+    assert error
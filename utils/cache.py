@@ -0,0 +1,144 @@
+"""
+Result cache
+Bounded LRU cache for analysis results, keyed by content hash and parameters
+"""
+
+import contextlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Hash file content for use in cache keys.
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        Hex digest (BLAKE2b, 128 bit)
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def make_key(data_hash: str, **params) -> Tuple[Hashable, ...]:
+    """
+    Build a cache key from a content hash and analysis parameters.
+
+    Examples:
+        >>> make_key("ab12", engine="fast", granularity="weekly")
+        ('ab12', ('engine', 'fast'), ('granularity', 'weekly'))
+    """
+    return (data_hash,) + tuple(sorted(params.items()))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with hit/miss counters.
+
+    When the cache is full, the least recently used entry is evicted.
+    Safe to share between Streamlit sessions (one instance per process).
+    reserved() raises the limit for the duration of one computation.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self._base_entries = max_entries
+        self._reservations: List[int] = []
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        The computation runs outside the lock, so a slow analysis does not
+        block cache hits from other sessions.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            self._evict()
+
+        return value
+
+    def _evict(self):
+        """Drop least recently used entries down to max_entries (lock held)."""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @contextlib.contextmanager
+    def reserved(self, entries: int, limit: Optional[int] = None) -> Iterator[int]:
+        """
+        Keep room for at least entries entries inside a with block.
+
+        Used while one computation needs more entries alive at once than
+        the cache normally holds (e.g. every file of a merge). On exit the
+        limit goes back to its value before the block (other reservations
+        still running keep theirs) and the extra entries are evicted.
+
+        Args:
+            entries: Entries that must fit
+            limit: Largest reservation granted (None = no limit)
+
+        Yields:
+            The entries actually reserved
+        """
+        if limit is not None:
+            entries = min(entries, limit)
+
+        with self._lock:
+            self._reservations.append(entries)
+            self.max_entries = max([self._base_entries] + self._reservations)
+
+        try:
+            yield entries
+        finally:
+            with self._lock:
+                self._reservations.remove(entries)
+                self.max_entries = max([self._base_entries] + self._reservations)
+                self._evict()
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
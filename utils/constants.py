@@ -1,7 +1,20 @@
 """
 constants module
-TODO: Implement functionality
+Shared constants: dtype schema of the cleaned transactions
 """
 
-# Implementation goes here
-pass
+# Schema compatto del DataFrame pulito.
+# description/type hanno poche migliaia di valori distinti → category.
+# price/balance restano float64: float32 ha solo ~7 cifre significative
+# (un balance di 2.049.546,25 perde i centesimi) e i prezzi hanno 4
+# decimali, quindi gli int64 in centesimi non sarebbero esatti.
+TRANSACTION_DTYPES = {
+    "description": "category",
+    "day": "int32",
+    "type": "category",
+    "price": "float64",
+    "balance": "float64",
+}
+
+# Colonna 'business' derivata da categorize_transactions
+BUSINESS_DTYPE = "category"
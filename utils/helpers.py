@@ -1,7 +1,282 @@
 """
 helpers module
-TODO: Implement functionality
+Small pandas utilities and stage profiling shared across modules
 """
 
-# Implementation goes here
-pass
+import contextlib
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def map_categories(values: pd.Series, func: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Apply a vectorized function once per distinct value of a categorical Series.
+
+    func runs on the categories instead of on every row and the result is
+    expanded back through the codes, so it stays categorical. Non-categorical
+    input is passed to func unchanged.
+
+    Args:
+        values: Series to transform
+        func: Function from a Series to a Series of the same length
+
+    Returns:
+        Transformed Series, same index as values
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return func(values)
+
+    mapped = func(pd.Series(values.cat.categories))
+    inverse, uniques = pd.factorize(mapped)
+
+    # Il codice -1 (NaN) seleziona il -1 aggiunto in coda
+    codes = np.append(inverse, -1)[values.cat.codes.to_numpy()]
+
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=uniques),
+        index=values.index,
+        name=values.name
+    )
+
+
+
+class _Stage:
+    """One running stage: set .rows inside the with block to record a row count."""
+
+    def __init__(self, profiler: "StageProfiler", name: str, rows: Optional[int]):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+    def __enter__(self) -> "_Stage":
+        stack = self.profiler._stack()
+        self.depth = len(stack)
+        stack.append(self)
+
+        self.memory = self.profiler.track_memory and tracemalloc.is_tracing()
+        if self.memory:
+            self.start_memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+
+        peak = None
+        if self.memory:
+            # reset_peak azzera anche il picco dello stage esterno: lo si
+            # ricostruisce dai picchi assoluti degli stage interni
+            _, absolute_peak = tracemalloc.get_traced_memory()
+            absolute_peak = max(absolute_peak, self.child_peak)
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, absolute_peak)
+            peak = max(absolute_peak - self.start_memory, 0)
+
+        self.profiler._record({
+            "stage": self.name,
+            "seconds": seconds,
+            "rows": self.rows,
+            "peak_mb": peak / 2**20 if peak is not None else None,
+            "depth": self.depth,
+        })
+        return False
+
+
+class _NullStage:
+    """Stage returned while profiling is disabled: does nothing."""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+# Profiler installato per il thread / contesto corrente (install): riceve gli
+# stage registrati attraverso qualsiasi StageProfiler, compreso quello di modulo
+_INSTALLED: ContextVar[Optional["StageProfiler"]] = ContextVar("installed_profiler", default=None)
+
+# tracemalloc e' globale: lo si avvia col primo profiler che traccia la
+# memoria e lo si ferma con l'ultimo (se non era gia' attivo)
+_memory_lock = threading.Lock()
+_memory_users = 0
+_started_tracemalloc = False
+
+
+def _track_memory(start: bool):
+    global _memory_users, _started_tracemalloc
+
+    with _memory_lock:
+        _memory_users += 1 if start else -1
+        if start and _memory_users == 1 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        elif not start and _memory_users == 0 and _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+class StageProfiler:
+    """
+    Wall time, row count and peak memory of named pipeline stages.
+
+    Disabled by default: stage() then returns a shared no-op context, so
+    the instrumented code pays one attribute check per stage. Stages can
+    be nested; peak memory (tracemalloc, only with track_memory) is the
+    peak above the memory in use when the stage started. tracemalloc is
+    process-wide: while any profiler tracks memory every thread is
+    slowed down, and concurrent stages count each other's allocations.
+
+    The instrumented modules record through the module-level profiler.
+    A profiler can be installed for the current thread (install): the
+    stages recorded there then go to it, so e.g. every Streamlit session
+    keeps its own records and on/off state.
+
+    Example:
+        profiler.enable()
+        with profiler.stage("parse") as stage:
+            df = parse(...)
+            stage.rows = len(df)
+        profiler.summary()
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, track_memory: bool = False):
+        """Start recording; track_memory also traces allocations (slower, process-wide)."""
+        if track_memory != self.track_memory:
+            _track_memory(track_memory)
+            self.track_memory = track_memory
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording (the records are kept)."""
+        self.enabled = False
+        if self.track_memory:
+            _track_memory(False)
+            self.track_memory = False
+
+    def install(self) -> Token:
+        """
+        Send the stages recorded in the current thread (context) to this
+        profiler, whichever profiler they are recorded through.
+
+        Returns:
+            Token for uninstall
+        """
+        return _INSTALLED.set(self)
+
+    @staticmethod
+    def uninstall(token: Token):
+        """Undo install()."""
+        _INSTALLED.reset(token)
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator["StageProfiler"]:
+        """install() for the duration of a with block."""
+        token = self.install()
+        try:
+            yield self
+        finally:
+            self.uninstall(token)
+
+    def _target(self) -> "StageProfiler":
+        return _INSTALLED.get() or self
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, record: Dict):
+        with self._lock:
+            self.records.append(record)
+
+    def stage(self, name: str, rows: Optional[int] = None):
+        """Context manager timing one stage (recorded by the installed profiler, if any)."""
+        target = self._target()
+        if not target.enabled:
+            return _NULL_STAGE
+        return _Stage(target, name, rows)
+
+    def timed(self, name: str, rows: Optional[Callable] = None):
+        """
+        Decorator timing every call of a function as a stage.
+
+        Args:
+            name: Stage name
+            rows: Function of the return value giving the row count
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self._target().enabled:
+                    return func(*args, **kwargs)
+                with self.stage(name) as stage:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        stage.rows = rows(result)
+                return result
+            return wrapper
+        return decorator
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-stage totals, in order of first appearance.
+
+        Returns:
+            DataFrame with stage, calls, total_s, mean_ms, rows and peak_mb
+        """
+        with self._lock:
+            records = pd.DataFrame(self.records, columns=["stage", "seconds", "rows", "peak_mb", "depth"])
+
+        grouped = records.groupby("stage", sort=False)
+        summary = pd.DataFrame({
+            "calls": grouped.size(),
+            "total_s": grouped["seconds"].sum(),
+            "mean_ms": grouped["seconds"].mean() * 1000,
+            "rows": grouped["rows"].sum(min_count=1),
+            "peak_mb": grouped["peak_mb"].max(),
+        })
+
+        return summary.reset_index()
+
+    def to_json(self) -> str:
+        """All records and the summary as JSON."""
+        with self._lock:
+            records = list(self.records)
+        summary = self.summary()
+
+        return json.dumps({
+            "records": records,
+            "summary": json.loads(summary.to_json(orient="records")),
+        }, indent=2)
+
+
+# Profiler di modulo usato dal codice strumentato (disattivo finche' non si
+# chiama enable); gli stage vanno al profiler installato nel thread, se c'e'
+profiler = StageProfiler()
@@ -0,0 +1,193 @@
+"""
+Synthetic Big Ambitions exports
+Deterministic generator of transaction exports for tests and benchmarks
+"""
+
+import io
+import random
+from typing import List, Optional, Tuple
+
+
+BUSINESSES = ["HQ Ray", "Tech & Gift", "G&J", "McDonald's", "Warehouse"]
+
+EMPLOYEES = [
+    "Kathleen Hinds",
+    "Everett Beshears",
+    "Joseph Halliday",
+    "Randy Haugen",
+    "James Rodriguez",
+]
+
+# Usati per generare nomi oltre le liste sopra
+_FIRST_NAMES = ["Anna", "Marco", "Lucy", "Omar", "Priya", "Tom", "Chen", "Sofia", "Ivan", "Nadia"]
+_LAST_NAMES = ["Rossi", "Baker", "Okafor", "Lindqvist", "Tanaka", "Moreau", "Silva", "Novak", "Kaur", "Walsh"]
+
+SUPPLIERS = ["Wholesale Store", "NY Distro Inc", "Total Produce Trading", "Lunar Tech"]
+
+INSURANCE_TIERS = ["Bronze", "Silver", "Gold"]
+
+PERSONAL_TYPES = ["Taxi Ride", "Food", "Clothing", "Gym Membership"]
+
+# Peso di ogni tipo nel mix di righe (somma 1)
+TYPE_WEIGHTS = {
+    "Revenue": 0.44,
+    "Wage": 0.22,
+    "Replacement Wage": 0.02,
+    "Marketing": 0.07,
+    "Delivery Contract": 0.05,
+    "Health Insurance": 0.06,
+    "HR Training": 0.02,
+    "Rent": 0.03,
+    "Tax Payment": 0.01,
+    "Loan Payment": 0.01,
+    "Interior Designer": 0.01,
+    "Personal": 0.06,  # Taxi Ride, Food, ... (categoria personal)
+}
+
+# Righe per giorno quando days non e' indicato
+ROWS_PER_DAY = 200
+
+
+def _make_names(base: List[str], count: int, extra) -> List[str]:
+    """First count names: the base list, then generated ones."""
+    names = list(base[:count])
+    i = 0
+    while len(names) < count:
+        names.append(extra(i))
+        i += 1
+    return names
+
+
+def _employee_name(i: int) -> str:
+    first = _FIRST_NAMES[i % len(_FIRST_NAMES)]
+    last = _LAST_NAMES[(i // len(_FIRST_NAMES)) % len(_LAST_NAMES)]
+    suffix = i // (len(_FIRST_NAMES) * len(_LAST_NAMES))
+    return f"{first} {last}" + (f" {suffix + 1}" if suffix else "")
+
+
+def _format_line(description: str, day: int, trans_type: str, price: float, balance: float) -> str:
+    """Format one row in the double-wrapped export layout."""
+    return f'"{description},""{day}"",""{trans_type}"",""{price:.4f}"",""{balance:.0f}"""'
+
+
+def _make_row(rng: random.Random, trans_type: str, businesses: List[str], employees: List[str]):
+    """Description, exported type and price of one transaction."""
+    # Ogni dipendente lavora sempre per lo stesso business
+    index = rng.randrange(len(employees))
+    employee = employees[index]
+    employer = businesses[index % len(businesses)]
+    business = rng.choice(businesses)
+
+    if trans_type == "Revenue":
+        return f"{business} Revenue", trans_type, rng.uniform(100, 5000)
+    if trans_type == "Wage":
+        return f"{employee} ({employer} Daily Wage)", trans_type, -rng.uniform(100, 400)
+    if trans_type == "Replacement Wage":
+        return f"Replacement for {employee} ({employer} Wage)", trans_type, -rng.uniform(150, 500)
+    if trans_type == "Marketing":
+        return f"Marketing campaigns for {business}", trans_type, -rng.uniform(50, 500)
+    if trans_type == "Delivery Contract":
+        return f"{business} delivery from {rng.choice(SUPPLIERS)}", trans_type, -rng.uniform(200, 3000)
+    if trans_type == "Health Insurance":
+        tier = rng.choice(INSURANCE_TIERS)
+        description = f"{tier} Health Insurance ({employee}) - {rng.choice([10, 20, 50])} Employees"
+        return description, trans_type, -rng.uniform(50, 200)
+    if trans_type == "HR Training":
+        return f"{employee} training costs", trans_type, -rng.uniform(100, 600)
+    if trans_type == "Rent":
+        return "Rent", trans_type, -rng.uniform(1000, 3000)
+    if trans_type == "Tax Payment":
+        return "Tax Payment", trans_type, -rng.uniform(5000, 50000)
+    if trans_type == "Loan Payment":
+        return "Loan Payment", trans_type, -rng.uniform(500, 5000)
+    if trans_type == "Interior Designer":
+        return "Interior Designer", trans_type, -rng.uniform(1000, 10000)
+
+    personal = rng.choice(PERSONAL_TYPES)
+    return personal, personal, -rng.uniform(5, 80)
+
+
+def generate_export_rows(n_rows: int, seed: int = 42, n_businesses: int = len(BUSINESSES),
+                         n_employees: int = len(EMPLOYEES), days: Optional[int] = None) -> List[Tuple]:
+    """
+    Generate export rows covering every transaction type.
+
+    Args:
+        n_rows: Number of rows to generate
+        seed: Random seed, same seed and parameters give the same export
+        n_businesses: Number of distinct businesses
+        n_employees: Number of distinct employees
+        days: Number of in-game days the rows are spread over
+            (default: ROWS_PER_DAY rows per day)
+
+    Returns:
+        List of (description, day, type, price, balance), oldest day first,
+        with price and balance rounded as in the exported file
+    """
+    rng = random.Random(seed)
+    businesses = _make_names(BUSINESSES, n_businesses, lambda i: f"Business {i + 1}")
+    employees = _make_names(EMPLOYEES, n_employees, _employee_name)
+    types = list(TYPE_WEIGHTS)
+    weights = list(TYPE_WEIGHTS.values())
+
+    rows = []
+    balance = 1_000_000.0
+
+    for i, trans_type in enumerate(rng.choices(types, weights=weights, k=n_rows)):
+        day = 1 + (i * days // n_rows if days else i // ROWS_PER_DAY)
+        description, exported_type, price = _make_row(rng, trans_type, businesses, employees)
+
+        balance += price
+        rows.append((description, day, exported_type, float(f"{price:.4f}"), float(f"{balance:.0f}")))
+
+    return rows
+
+
+def generate_export_lines(n_rows: int, seed: int = 42, **params) -> List[str]:
+    """
+    Generate export lines covering every transaction type.
+
+    Keyword arguments are passed to generate_export_rows.
+
+    Returns:
+        List of lines in the Big Ambitions export layout, oldest day first
+    """
+    return [_format_line(*row) for row in generate_export_rows(n_rows, seed, **params)]
+
+
+def generate_export(n_rows: int, seed: int = 42, **params) -> bytes:
+    """
+    Generate a full export file as bytes (CRLF line endings, like the game).
+
+    Keyword arguments are passed to generate_export_lines.
+    """
+    return "\r\n".join(generate_export_lines(n_rows, seed, **params)).encode("utf-8")
+
+
+def generate_workbook(n_rows: int, seed: int = 42, header: bool = True, **params) -> bytes:
+    """
+    Generate the same export as generate_export as an .xlsx workbook.
+
+    One sheet "Transactions" with the columns Description, Day, Type,
+    Price and Balance (numbers as numeric cells). Written as Excel does,
+    with a shared string table and the sheet dimension.
+
+    Args:
+        n_rows: Number of rows
+        seed: Random seed
+        header: Write the column names in the first row
+        **params: Passed to generate_export_rows
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Transactions"
+    if header:
+        sheet.append(["Description", "Day", "Type", "Price", "Balance"])
+    for row in generate_export_rows(n_rows, seed, **params):
+        sheet.append(row)
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -1,7 +1,296 @@
 """
-charts module
-TODO: Implement functionality
+Charts Module
+Plotly figures from pre-aggregated frames, with payloads that do not grow with the data
 """
 
-# Implementation goes here
-pass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+# Punti massimi per traccia di una serie giornaliera (oltre si ricampiona)
+MAX_POINTS = 2_000
+
+# Da questa lunghezza le serie usano Scattergl (WebGL) invece di SVG
+WEBGL_MIN_POINTS = 1_000
+
+# Business mostrati nei grafici a barre (quelli con il valore assoluto piu' alto)
+MAX_BARS = 40
+
+COST_BREAKDOWN_COLORS = {
+    "wages": "#e7f316",
+    "shared_revenue_based": "#bc2210",
+    "marketing": "#225ae6",
+    "health_insurance": "#0cc05a",
+    "hr_training": "#14bcc2",
+}
+
+WATERFALL_STEPS = ["Revenue", "Direct Costs", "Shared Costs", "Profit"]
+
+
+# === Ricampionamento ===
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of n_out points that keep the shape of y.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point
+    kept before it and the average of the next bucket, so spikes survive.
+
+    Args:
+        x: Sorted x values
+        y: Values (same length)
+        n_out: Points to keep
+
+    Returns:
+        Sorted integer positions into x and y
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Media di ogni bucket in un colpo solo (l'ultimo "bucket successivo" e' l'ultimo punto)
+    sizes = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        area = np.abs(
+            (x[previous] - mean_x[bucket + 1]) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max decimation: the lowest and highest point of n_out / 2 equal buckets.
+
+    Cheaper than LTTB (fully vectorized) and keeps every extreme, at the
+    cost of a more jagged line. The first and last points are kept too.
+
+    Returns:
+        Sorted integer positions into x and y
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    size = -(-n // n_buckets)
+    padding = n_buckets * size - n
+
+    # Padding fuori scala: non vince mai ne' il minimo ne' il massimo
+    low = np.append(y, np.full(padding, np.inf)).reshape(n_buckets, size)
+    high = np.append(y, np.full(padding, -np.inf)).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+
+    positions = np.concatenate([[0, n - 1], offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)])
+    return np.unique(positions[positions < n])
+
+
+DOWNSAMPLERS: Dict[str, Callable[[np.ndarray, np.ndarray, int], np.ndarray]] = {
+    "lttb": lttb_indices,
+    "minmax": minmax_indices,
+}
+
+
+def downsample(series: pd.Series, max_points: int = MAX_POINTS, method: str = "lttb") -> pd.Series:
+    """
+    At most max_points points of a series indexed by day.
+
+    Args:
+        series: Values indexed by a sorted numeric index (NaN are dropped)
+        max_points: Points to keep
+        method: Name in DOWNSAMPLERS
+
+    Returns:
+        The series itself if it is short enough, else a subset of its rows
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown method '{method}', expected one of {list(DOWNSAMPLERS)}")
+
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+
+    positions = DOWNSAMPLERS[method](series.index.to_numpy(), series.to_numpy(), max_points)
+    return series.iloc[positions]
+
+
+# === Serie temporali ===
+
+def _compact(values: np.ndarray) -> np.ndarray:
+    """Narrowest dtype that plots the same (the arrays are sent base64-encoded)."""
+    if values.dtype.kind in "iu":
+        return values.astype(np.int32)
+    return values.astype(np.float32)
+
+
+def line_trace(series: pd.Series, name: str, max_points: int = MAX_POINTS, method: str = "lttb",
+               **trace_args) -> go.Scatter:
+    """Line trace of a daily series, downsampled and WebGL-rendered when long."""
+    points = downsample(series, max_points, method)
+    trace_type = go.Scattergl if len(points) >= WEBGL_MIN_POINTS else go.Scatter
+
+    return trace_type(x=_compact(points.index.to_numpy()), y=_compact(points.to_numpy(dtype=float)),
+                      name=name, mode="lines", **trace_args)
+
+
+def time_series_chart(frame: pd.DataFrame, title: str, y_title: str = "", max_points: int = MAX_POINTS,
+                      method: str = "lttb") -> go.Figure:
+    """
+    One line per column of a day-indexed frame (e.g. revenue, profit, balance).
+
+    Args:
+        frame: DataFrame indexed by day, one column per series
+        title: Figure title
+        y_title: Y axis title
+        max_points: Points kept per series
+        method: Name in DOWNSAMPLERS
+
+    Returns:
+        Figure with len(frame.columns) traces of at most max_points points
+    """
+    fig = go.Figure([
+        line_trace(frame[column], str(column).replace("_", " ").title(), max_points, method)
+        for column in frame.columns
+    ])
+    fig.update_layout(title=title, xaxis_title="Day", yaxis_title=y_title, hovermode="x unified")
+
+    return fig
+
+
+def forecast_chart(history: pd.Series, predicted: pd.Series, max_points: int = MAX_POINTS) -> go.Figure:
+    """Daily history with the forecast continuing it as a dashed line."""
+    fig = go.Figure([
+        line_trace(history, "Revenue", max_points),
+        line_trace(predicted, "Forecast", max_points, line={"dash": "dash"}),
+    ])
+    fig.update_layout(title="Total daily revenue", xaxis_title="Day", yaxis_title="Revenue ($)")
+
+    return fig
+
+
+# === Grafici per business ===
+
+def top_businesses(frame: pd.DataFrame, column: str, max_bars: int = MAX_BARS) -> pd.DataFrame:
+    """The max_bars rows with the largest |column|, sorted by column (descending)."""
+    if len(frame) > max_bars:
+        frame = frame.loc[frame[column].abs().nlargest(max_bars).index]
+
+    return frame.sort_values(column, ascending=False)
+
+
+def _bars_title(title: str, shown: int, total: int) -> str:
+    return f"{title} (top {shown} of {total})" if shown < total else title
+
+
+def bar_chart(frame: pd.DataFrame, x: str, y: str, title: str, colorscale=None, tickformat: Optional[str] = None,
+              max_bars: int = MAX_BARS) -> go.Figure:
+    """
+    One bar per business, at most max_bars (largest |y|).
+
+    Args:
+        frame: One row per business (e.g. the P&L)
+        x: Business column
+        y: Value column
+        title: Figure title
+        colorscale: Color the bars by value on this scale (None = single color)
+        tickformat: Y axis tick format (e.g. '$,.0f')
+        max_bars: Bars shown at most
+
+    Returns:
+        Figure with one Bar trace
+    """
+    shown = top_businesses(frame, y, max_bars)
+    values = shown[y].to_numpy(dtype=float)
+
+    marker = {"color": values, "colorscale": colorscale, "showscale": True} if colorscale is not None else {}
+    fig = go.Figure(go.Bar(x=shown[x].astype(str).to_numpy(), y=values, marker=marker))
+    fig.update_layout(title=_bars_title(title, len(shown), len(frame)), showlegend=False, xaxis_title="")
+    if tickformat:
+        fig.update_yaxes(tickformat=tickformat)
+
+    return fig
+
+
+def cost_breakdown_chart(pl_df: pd.DataFrame, fields: Dict[str, str] = COST_BREAKDOWN_COLORS,
+                         max_bars: int = MAX_BARS) -> go.Figure:
+    """Stacked cost fields per business (the max_bars businesses with the highest total_costs)."""
+    shown = top_businesses(pl_df, "total_costs", max_bars)
+    businesses = shown["business"].astype(str).to_numpy()
+
+    fig = go.Figure([
+        go.Bar(x=businesses, y=shown[field].to_numpy(dtype=float), name=field, marker_color=color)
+        for field, color in fields.items()
+    ])
+    fig.update_layout(barmode="stack", height=500, legend_title_text="Category",
+                      title=_bars_title("Cost Breakdown", len(shown), len(pl_df)))
+    fig.update_yaxes(tickformat="$,.0f", title_text="Amount ($)")
+
+    return fig
+
+
+def waterfall_chart(pl_df: pd.DataFrame, business: Optional[str] = None) -> go.Figure:
+    """
+    Revenue → direct costs → shared costs → profit of one business.
+
+    A single Waterfall trace: the caller rebuilds the figure for the
+    selected business, so the payload is the same for 5 or 500 businesses
+    (no hidden trace and dropdown button per business).
+
+    Args:
+        pl_df: P&L (calculate_profit_loss)
+        business: Business to show (default: first row)
+
+    Returns:
+        Figure with one Waterfall trace
+    """
+    if business is None:
+        row = pl_df.iloc[0]
+    else:
+        row = pl_df[(pl_df["business"].astype(str) == str(business)).to_numpy()].iloc[0]
+
+    values = [
+        row["revenue"],
+        -row["total_direct_costs"],
+        -row["total_shared_costs"],
+        row["profit"],
+    ]
+
+    fig = go.Figure(go.Waterfall(
+        x=WATERFALL_STEPS,
+        y=values,
+        measure=["relative", "relative", "relative", "total"],
+        textposition="outside",
+        texttemplate="$%{y:,.0f}",
+        name=str(row["business"]),
+        increasing={"marker": {"color": "#2ecc71"}},
+        decreasing={"marker": {"color": "#e74c3c"}},
+        totals={"marker": {"color": "#3498db"}},
+    ))
+    fig.update_layout(title=f"<b>P&L Waterfall - {row['business']}</b>", height=500)
+
+    return fig
+
+
+def figure_payload_bytes(fig: go.Figure) -> int:
+    """Size of the figure JSON sent to the browser."""
+    return len(fig.to_json().encode("utf-8"))
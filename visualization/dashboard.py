@@ -1,7 +1,259 @@
 """
-dashboard module
-TODO: Implement functionality
+Dashboard Module
+Server-side pagination, filtering and sorting of the transaction table
 """
 
-# Implementation goes here
-pass
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+DEFAULT_PAGE_SIZE = 100
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+# Risultati (filtro + ordinamento) tenuti per vista: bastano per paginare e
+# tornare indietro di un passo senza ricalcolare
+MAX_CACHED_SELECTIONS = 8
+
+
+class TableView:
+    """
+    A DataFrame seen through filters, sorting and pages.
+
+    A selection is an int64 array of row positions, never a copied frame:
+    filtering builds a mask on the raw arrays (category codes for type,
+    int32 day), sorting walks the stable argsort of the column (computed
+    once per column and direction, and cached) keeping only the selected
+    rows, and a page
+    is df.iloc of one slice of the selection. Only the visible page is
+    materialized, so paging and sorting cost O(rows) integer work at most.
+
+    The last selections are memoized, so moving between pages of the same
+    filter does no work at all. The view is thread-safe and can be cached
+    with the dataset it wraps.
+
+    Example:
+        view = TableView(df)
+        rows = view.select(types=["Wage"], day_range=(10, 20), sort_by="price", ascending=False)
+        view.page(rows, page=0, page_size=100)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._orders: Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]] = {}
+        self._selections: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._types: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.df.columns)
+
+    def types(self) -> List[str]:
+        """Transaction types present in the data, sorted (computed once)."""
+        if self._types is None:
+            types = self.df["type"]
+            if isinstance(types.dtype, pd.CategoricalDtype):
+                present = np.unique(types.cat.codes.to_numpy())
+                self._types = sorted(types.cat.categories[present[present >= 0]].astype(str))
+            else:
+                self._types = sorted(types.dropna().astype(str).unique())
+
+        return self._types
+
+    # === Filtro e ordinamento ===
+
+    def filter(self, types: Optional[Iterable[str]] = None,
+               day_range: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        Positions of the rows matching all the given filters, in file order.
+
+        Args:
+            types: Transaction types to keep (None = all)
+            day_range: (first, last) day, both included (None = all)
+
+        Returns:
+            Sorted int64 positions into df
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+
+        if types is not None:
+            column = self.df["type"]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Confronto sui codici: niente stringhe riga per riga
+                codes = column.cat.categories.get_indexer(list(types))
+                mask &= np.isin(column.cat.codes.to_numpy(), codes[codes >= 0])
+            else:
+                mask &= column.isin(list(types)).to_numpy()
+
+        if day_range is not None:
+            day = self.df["day"].to_numpy()
+            mask &= (day >= day_range[0]) & (day <= day_range[1])
+
+        return np.flatnonzero(mask)
+
+    def _order(self, column: str, ascending: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (positions of the non-null values in sort order, positions of the nulls), cached.
+
+        Both directions are stable: rows with equal values stay in file order.
+        """
+        with self._lock:
+            if (column, ascending) in self._orders:
+                return self._orders[(column, ascending)]
+
+        values = self.df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Ordine alfabetico delle categorie, poi argsort sui codici
+            codes = values.cat.codes.to_numpy()
+            rank = np.empty(len(values.cat.categories), dtype=np.int64)
+            rank[values.cat.categories.astype(str).argsort()] = np.arange(len(rank))
+            valid = codes >= 0
+            keys = rank[codes[valid]]
+        else:
+            valid = values.notna().to_numpy()
+            keys = values.to_numpy()[valid]
+
+        positions = np.flatnonzero(valid)
+        sorted_order = np.argsort(keys, kind="stable")
+        ordered = positions[sorted_order]
+
+        if not ascending:
+            # Blocchi di valori uguali in ordine inverso, ma ogni blocco resta in ordine di file
+            sorted_keys = keys[sorted_order]
+            block = np.zeros(len(sorted_keys), dtype=np.int64)
+            block[1:] = np.cumsum(sorted_keys[1:] != sorted_keys[:-1])
+            ordered = ordered[np.argsort(-block, kind="stable")]
+
+        order = (ordered, np.flatnonzero(~valid))
+
+        with self._lock:
+            self._orders[(column, ascending)] = order
+        return order
+
+    def sort(self, positions: np.ndarray, column: Optional[str] = None, ascending: bool = True) -> np.ndarray:
+        """
+        Reorder a selection by column (nulls last).
+
+        The cached argsort of the whole column is filtered by membership,
+        so no sort runs on the selection itself.
+
+        Args:
+            positions: Selection from filter()
+            column: Column to sort by (None = keep file order)
+            ascending: Sort direction
+
+        Returns:
+            The same positions, sorted
+        """
+        if column is None:
+            return positions
+
+        ordered, nulls = self._order(column, ascending)
+        selected = np.zeros(len(self.df), dtype=bool)
+        selected[positions] = True
+
+        ordered = ordered[selected[ordered]]
+
+        return np.concatenate([ordered, nulls[selected[nulls]]])
+
+    def select(self, types: Optional[Iterable[str]] = None, day_range: Optional[Tuple[int, int]] = None,
+               sort_by: Optional[str] = None, ascending: bool = True) -> np.ndarray:
+        """filter() followed by sort(), memoized on the arguments."""
+        key = (None if types is None else tuple(sorted(types)),
+               None if day_range is None else tuple(int(day) for day in day_range),
+               sort_by, ascending)
+
+        with self._lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+
+        positions = self.sort(self.filter(types, day_range), sort_by, ascending)
+
+        with self._lock:
+            self._selections[key] = positions
+            while len(self._selections) > MAX_CACHED_SELECTIONS:
+                self._selections.popitem(last=False)
+        return positions
+
+    # === Pagine ===
+
+    @staticmethod
+    def page_count(positions: np.ndarray, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        """Number of pages of a selection (at least 1)."""
+        return max(1, -(-len(positions) // page_size))
+
+    def page(self, positions: np.ndarray, page: int = 0, page_size: int = DEFAULT_PAGE_SIZE) -> pd.DataFrame:
+        """
+        Rows of one page of a selection.
+
+        Args:
+            positions: Selection from select()
+            page: Page number, from 0 (clipped to the last page)
+            page_size: Rows per page
+
+        Returns:
+            DataFrame with at most page_size rows, keeping the original index
+        """
+        page = min(max(page, 0), self.page_count(positions, page_size) - 1)
+        start = page * page_size
+
+        return self.df.iloc[positions[start:start + page_size]]
+
+
+def render_table(view: TableView, key: str, types: Optional[Iterable[str]] = None,
+                 day_range: Optional[Tuple[int, int]] = None, height: int = 400) -> np.ndarray:
+    """
+    Sort and page controls plus the visible page of a filtered view.
+
+    Only the page is sent to the browser; the selection is memoized in
+    the view, so changing page or rerunning with the same filters and
+    sort does not filter or sort again.
+
+    Args:
+        view: TableView of the dataset
+        key: Widget key prefix (unique per table)
+        types: Transaction types to keep (None = all)
+        day_range: (first, last) day, both included (None = all)
+        height: Table height in pixels
+
+    Returns:
+        The selection shown (positions into view.df)
+    """
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by:", [None] + view.columns, key=f"{key}_sort",
+                               format_func=lambda column: "(file order)" if column is None else column)
+    with col2:
+        ascending = st.toggle("Ascending", value=True, key=f"{key}_ascending")
+    with col3:
+        page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                                 key=f"{key}_page_size")
+
+    positions = view.select(types, day_range, sort_by, ascending)
+    pages = view.page_count(positions, page_size)
+
+    # Il filtro puo' aver ridotto le pagine: la pagina corrente resta valida
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+
+    with col4:
+        page = st.number_input(f"Page (of {pages:,}):", min_value=1, max_value=pages, value=1, key=page_key) - 1
+
+    rows = view.page(positions, page, page_size)
+    st.dataframe(rows, use_container_width=True, height=height)
+
+    first = page * page_size + 1 if len(rows) else 0
+    st.caption(f"Rows {first:,}–{max(first + len(rows) - 1, 0):,} of {len(positions):,}")
+
+    return positions